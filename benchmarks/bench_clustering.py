@@ -0,0 +1,74 @@
+# benchmarks/bench_clustering.py
+"""
+Clusters synthetic news items with planted topics and reports vectorizing and clustering
+time, plus purity (share of items whose theme's majority topic is their own topic).
+
+    python -m benchmarks.bench_clustering
+    python -m benchmarks.bench_clustering --items 50000 --topics 40 --repeat 5
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+
+import numpy as np
+
+from modules.clustering import HashingVectorizer, cluster_items, default_cluster_count, spherical_minibatch_kmeans
+from modules.content import ContentItem
+
+FILLER = ("company announced researchers released update startup funding open source tool users team "
+          "launch report latest version platform customers build faster").split()
+
+def synthetic_items(count: int, topics: int, seed: int = 0):
+    """Items whose title and summary mix words from one planted topic with shared filler words."""
+    rng = random.Random(seed)
+    vocabularies = [[f"t{topic}w{word}" for word in range(12)] for topic in range(topics)]
+    items = []
+    for i in range(count):
+        topic = rng.randrange(topics)
+        words = vocabularies[topic]
+        title = " ".join(rng.sample(words, 3) + rng.sample(FILLER, 3))
+        summary = " ".join(rng.choices(words, k=6) + rng.choices(FILLER, k=12))
+        items.append(ContentItem(source="rss", title=title, url=f"https://news{i % 200}.example/{i}",
+                                 summary=summary, feed=f"topic-{topic}"))
+    return items
+
+def purity(themes) -> float:
+    clustered = sum(len(theme.items) for theme in themes)
+    majority = sum(Counter(item.feed for item in theme.items).most_common(1)[0][1] for theme in themes)
+    return majority / max(clustered, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--topics", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.items, args.topics)
+    k = default_cluster_count(len(items))
+    print(f"{len(items):,} items, {args.topics} planted topics, k={k}")
+
+    vectorize_times, cluster_times, total_times = [], [], []
+    for run in range(args.repeat):
+        start = time.perf_counter()
+        matrix = HashingVectorizer().fit_transform(items)
+        matrix = matrix[:, np.unique(matrix.indices)]  # As cluster_items does
+        vectorized = time.perf_counter()
+        spherical_minibatch_kmeans(matrix, k, seed=run)
+        vectorize_times.append(vectorized - start)
+        cluster_times.append(time.perf_counter() - vectorized)
+
+        start = time.perf_counter()
+        themes = cluster_items(items, seed=run)
+        total_times.append(time.perf_counter() - start)
+
+    print(f"  matrix: {matrix.shape[0]:,} x {matrix.shape[1]:,}, {matrix.nnz:,} non-zeros")
+    print(f"  vectorize      median {statistics.median(vectorize_times):6.3f}s")
+    print(f"  k-means        median {statistics.median(cluster_times):6.3f}s")
+    print(f"  cluster_items  median {statistics.median(total_times):6.3f}s")
+    print(f"  {len(themes)} themes, purity {purity(themes):.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_db.py
+"""
+Seeds a throwaway database with a production-sized dataset and reports seed throughput,
+query latency and the query plan of every hot query.
+
+    python -m benchmarks.bench_db --database-url sqlite:///out/bench.db
+    python -m benchmarks.bench_db --database-url postgresql://... --subscribers 1000000 --issues 10000
+
+Never point --database-url at the production database: the tables are filled with fake rows.
+"""
+import argparse
+import datetime
+import os
+import statistics
+import time
+
+import zstandard
+from sqlalchemy import insert, select, func
+from sqlalchemy.orm import Session
+
+from modules.storage import Subscriber, Issue, IssueBody, NewsletterItem, create_db_engine, init_db
+
+BASE_TIME = datetime.datetime(2024, 1, 1)
+
+def seed(engine, subscribers: int, issues: int, items_per_issue: int, batch_size: int) -> None:
+    """Bulk-inserts fake rows with executemany in fixed-size batches."""
+    def insert_batches(table, total, make_row):
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            for offset in range(0, total, batch_size):
+                rows = [make_row(i) for i in range(offset, min(offset + batch_size, total))]
+                connection.execute(insert(table), rows)
+        elapsed = time.perf_counter() - start
+        print(f"  seeded {total:>10,} {table.name:<18} in {elapsed:7.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    insert_batches(Subscriber.__table__, subscribers, lambda i: {
+        "email": f"student{i}@example.edu",
+        "is_active": i % 10 != 0,
+        "subscribed_at": BASE_TIME + datetime.timedelta(seconds=i),
+    })
+    compressor = zstandard.ZstdCompressor(level=3)
+    insert_batches(IssueBody.__table__, issues, lambda i: {
+        "content_hash": f"{i:064x}",
+        "body": compressor.compress(f"<html>{i}".encode() + b"x" * 1024 + b"</html>"),
+        "size": 1024,
+        "created_at": BASE_TIME + datetime.timedelta(hours=i),
+    })
+    insert_batches(Issue.__table__, issues, lambda i: {
+        "subject": f"AI Weekly #{i}",
+        "body_hash": f"{i:064x}",
+        "created_at": BASE_TIME + datetime.timedelta(hours=i),
+    })
+    insert_batches(NewsletterItem.__table__, issues * items_per_issue, lambda i: {
+        "issue_id": i // items_per_issue + 1,
+        "title": f"Item {i}",
+        "url": f"https://example.com/item/{i}",
+        "summary": "Lorem ipsum dolor sit amet.",
+        "category": ("Big Story of the Week", "Top Research Paper", "Top GitHub Repo")[i % 3],
+    })
+
+def explain(session: Session, statement) -> str:
+    """Returns the backend's query plan for a statement as text."""
+    dialect = session.get_bind().dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+    rows = session.connection().exec_driver_sql(prefix + sql).fetchall()
+    return "\n".join("    " + " | ".join(str(col) for col in row) for row in rows)
+
+def time_query(session: Session, statement, repeat: int) -> float:
+    """Median wall time in milliseconds of fetching every row of the statement."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        session.execute(statement).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the newsletter database schema.")
+    parser.add_argument("--database-url", default="sqlite:///out/bench.db")
+    parser.add_argument("--subscribers", type=int, default=1_000_000)
+    parser.add_argument("--issues", type=int, default=10_000)
+    parser.add_argument("--items-per-issue", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse rows from a previous run.")
+    args = parser.parse_args()
+
+    os.makedirs("out", exist_ok=True)
+    engine = create_db_engine(args.database_url)
+    init_db(bind=engine)
+
+    with Session(engine) as session:
+        if not args.skip_seed:
+            if session.scalar(select(func.count()).select_from(Subscriber)):
+                parser.error("Database already has rows; use --skip-seed or a fresh --database-url.")
+            print("Seeding...")
+            seed(engine, args.subscribers, args.issues, args.items_per_issue, args.batch_size)
+
+        queries = {
+            "get_all_active_subscribers": select(Subscriber).where(Subscriber.is_active == True),
+            "get_last_issue_body": select(IssueBody).join(Issue, Issue.body_hash == IssueBody.content_hash)
+                .where(Issue.is_dry_run == False).order_by(Issue.created_at.desc()).limit(1),
+            "Issue.items": select(NewsletterItem).where(NewsletterItem.issue_id == max(1, args.issues // 2)),
+        }
+        print("\nQueries (median of %d runs):" % args.repeat)
+        for name, statement in queries.items():
+            print(f"  {name:<28} {time_query(session, statement, args.repeat):10.2f} ms")
+            print(explain(session, statement))
+
+if __name__ == "__main__":
+    main()
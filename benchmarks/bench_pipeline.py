@@ -0,0 +1,261 @@
+# benchmarks/bench_pipeline.py
+"""
+Runs the newsletter pipeline (fetch -> parse -> store -> load -> cluster -> summarize ->
+categorize -> render -> save_issue) on synthetic feeds at several scale points and reports,
+per stage, wall time, Python allocations (tracemalloc) and the process's peak RSS so far.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --feeds 10 100 1000 --entries 10 100 1000 --gemini-latency 0.5
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json --tolerance 0.25
+
+Feeds are served by a local HTTP stub and Gemini is replaced by a stub with a fixed latency,
+so runs are deterministic and never leave the machine. Each scale point runs in a fresh
+process with its own throwaway SQLite database. Before save_issue, the issue archive is
+seeded with as many past items as were collected (--archive-ratio), so stages whose cost
+grows with history show it.
+
+Results are written as JSON (--output). The log-log slope of time against items is printed
+per stage: ~1 is linear, ~2 quadratic, and stages that should not depend on volume
+(summarize, render, save_issue) should stay near 0. With --baseline, the exit status is 1
+when a stage got slower or allocates more than the tolerance allows.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.synthetic import StubGemini, feed_url, start_feed_server
+
+STAGES = ("fetch", "parse", "store", "load", "cluster", "summarize", "categorize", "render", "save_issue")
+# Differences below these are noise, whatever the relative change
+MIN_SECONDS = 0.05
+MIN_MB = 1.0
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # Bytes on macOS, KB on Linux
+
+class StageTimer:
+    """Measures one stage at a time. tracemalloc slows allocation-heavy code, so it can be turned off."""
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict] = {}
+
+    def run(self, name: str, stage: Callable):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = stage()
+        seconds = time.perf_counter() - start
+        stats = {"seconds": round(seconds, 4)}
+        if self.trace_memory:
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stats.update(alloc_peak_mb=round(peak / 1e6, 2), alloc_retained_mb=round(retained / 1e6, 2))
+        stats["rss_peak_mb"] = peak_rss_mb()
+        self.stages[name] = stats
+        return result
+
+def seed_archive(count: int) -> None:
+    """Past issues' items, so lookups over the archive cost what they would in production."""
+    from sqlalchemy import insert
+    from modules.storage import Issue, NewsletterItem, engine
+
+    with engine.begin() as connection:
+        issue_id = connection.execute(insert(Issue).values(subject="Archive")).inserted_primary_key[0]
+        for offset in range(0, count, 10_000):
+            connection.execute(insert(NewsletterItem), [
+                {"issue_id": issue_id, "title": f"Past item {i}", "url": f"https://archive.example/{i}",
+                 "summary": "", "category": "General"}
+                for i in range(offset, min(offset + 10_000, count))
+            ])
+
+def run_point(feeds: int, entries: int, base_url: str, gemini_latency: float, archive_ratio: float,
+              trace_memory: bool) -> Dict:
+    """One scale point, in this process. Must run in a fresh process whose DATABASE_URL is a throwaway database."""
+    import logging
+    logging.disable(logging.WARNING)
+
+    # Imported here so the child's DATABASE_URL is the one the storage engine binds to
+    from config import settings
+    from modules import summarizer
+    from modules.categorizer import select_and_categorize
+    from modules.clustering import cluster_items, select_themes
+    from modules.collector import collect_weekly_content, guarded_get, parse_feed_items
+    from modules.storage import init_db, save_issue, upsert_collected_items
+    from modules.templater import render_email
+    from tasks.run_weekly import summary_candidates
+
+    init_db()
+    gemini = StubGemini(gemini_latency)
+    summarizer.gemini_model = gemini
+    summarizer.GEMINI_AVAILABLE = True
+    urls = [feed_url(base_url, index, entries) for index in range(feeds)]
+    timer = StageTimer(trace_memory)
+
+    bodies = timer.run("fetch", lambda: [guarded_get(url, url).content for url in urls])
+    parsed = timer.run("parse", lambda: [item for body in bodies for item in parse_feed_items(body, feed="blogs")])
+    del bodies
+    timer.run("store", lambda: upsert_collected_items(parsed))
+    items = timer.run("load", collect_weekly_content)
+    themes = timer.run("cluster", lambda: cluster_items(items, seed=0))
+    timer.run("summarize", lambda: {
+        item.url: summarizer.get_summary(item)
+        for item in summary_candidates(themes, items, settings.SUMMARY_LIMIT)
+    })
+    content = timer.run("categorize", lambda: select_and_categorize(items, rng=random.Random(0)))
+    assigned = {item.canonical_url for section in content.values() for item in section}
+    shown_themes = select_themes(themes, 3, exclude_urls=assigned)
+    email = timer.run("render", lambda: render_email(content, themes=shown_themes, max_bytes=0))
+
+    seed_archive(int(len(items) * archive_ratio))
+    shown = [item for section in content.values() for item in section]
+    shown += [item for theme in shown_themes for item in theme.items]
+    timer.run("save_issue", lambda: save_issue("Benchmark issue", email.html, shown))
+
+    return {"feeds": feeds, "entries": entries, "items": len(items), "themes": len(themes),
+            "gemini_calls": gemini.calls, "stages": timer.stages}
+
+def run_point_subprocess(feeds: int, entries: int, base_url: str, args: argparse.Namespace) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        result_file = os.path.join(tmp, "result.json")
+        command = [sys.executable, "-m", "benchmarks.bench_pipeline", "--point", str(feeds), str(entries),
+                   "--feed-url", base_url, "--result-file", result_file,
+                   "--gemini-latency", str(args.gemini_latency), "--archive-ratio", str(args.archive_ratio)]
+        if args.no_tracemalloc:
+            command.append("--no-tracemalloc")
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}"}
+        subprocess.run(command, env=env, check=True)
+        with open(result_file, encoding="utf-8") as f:
+            return json.load(f)
+
+def scaling_exponents(points: List[Dict]) -> Dict[str, Optional[float]]:
+    """Least-squares slope of log(seconds) against log(items), per stage."""
+    exponents = {}
+    for stage in STAGES:
+        samples = [(math.log(point["items"]), math.log(point["stages"][stage]["seconds"]))
+                   for point in points if point["items"] and point["stages"][stage]["seconds"] > 0]
+        if len({x for x, _ in samples}) < 2:
+            exponents[stage] = None
+            continue
+        mean_x = sum(x for x, _ in samples) / len(samples)
+        mean_y = sum(y for _, y in samples) / len(samples)
+        exponents[stage] = round(sum((x - mean_x) * (y - mean_y) for x, y in samples)
+                                 / sum((x - mean_x) ** 2 for x, _ in samples), 2)
+    return exponents
+
+def find_regressions(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """Stages at scale points present in both runs whose time or peak allocations grew beyond `tolerance`."""
+    previous = {(point["feeds"], point["entries"]): point for point in baseline["points"]}
+    regressions = []
+    for point in current["points"]:
+        before = previous.get((point["feeds"], point["entries"]))
+        if before is None:
+            continue
+        for stage, stats in point["stages"].items():
+            old = before["stages"].get(stage, {})
+            for metric, floor in (("seconds", MIN_SECONDS), ("alloc_peak_mb", MIN_MB)):
+                if metric not in stats or metric not in old:
+                    continue
+                if stats[metric] > old[metric] * (1 + tolerance) and stats[metric] - old[metric] > floor:
+                    regressions.append(f"{point['feeds']}x{point['entries']} {stage}: {metric} "
+                                       f"{old[metric]} -> {stats[metric]}")
+    return regressions
+
+def print_table(points: List[Dict]) -> None:
+    print(f"\n{'feeds x entries':>16} {'items':>8} " + " ".join(f"{stage:>10}" for stage in STAGES))
+    for point in points:
+        print(f"{point['feeds']:>7} x {point['entries']:<6} {point['items']:>8,} "
+              + " ".join(f"{point['stages'][stage]['seconds']:>9.3f}s" for stage in STAGES))
+    if "alloc_peak_mb" in points[0]["stages"][STAGES[0]]:
+        print(f"\n{'peak alloc MB':>16} {'':>8} " + " ".join(f"{stage:>10}" for stage in STAGES))
+        for point in points:
+            print(f"{point['feeds']:>7} x {point['entries']:<6} {point['items']:>8,} "
+                  + " ".join(f"{point['stages'][stage]['alloc_peak_mb']:>10.1f}" for stage in STAGES))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="Seconds per stub Gemini call.")
+    parser.add_argument("--archive-ratio", type=float, default=1.0,
+                        help="Past issue items seeded before save_issue, per collected item.")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip allocation tracking; times are then closer to production.")
+    parser.add_argument("--output", default="out/bench_pipeline.json")
+    parser.add_argument("--baseline", help="Earlier --output to check for regressions against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative growth before failing.")
+    # Internal: one scale point, run by the parent in a fresh process
+    parser.add_argument("--point", type=int, nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--feed-url", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.point:
+        result = run_point(*args.point, args.feed_url, args.gemini_latency, args.archive_ratio,
+                           not args.no_tracemalloc)
+        with open(args.result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    base_url, server = start_feed_server()
+    points = []
+    try:
+        for feeds in sorted(args.feeds):
+            for entries in sorted(args.entries):
+                print(f"Running {feeds} feeds x {entries} entries...", flush=True)
+                points.append(run_point_subprocess(feeds, entries, base_url, args))
+    finally:
+        server.terminate()
+
+    results = {
+        "created_at": datetime.datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"gemini_latency": args.gemini_latency, "archive_ratio": args.archive_ratio,
+                     "tracemalloc": not args.no_tracemalloc},
+        "points": points,
+        "scaling_exponents": scaling_exponents(points),
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print_table(points)
+    print("\nScaling exponent (time ~ items^k):")
+    for stage, exponent in results["scaling_exponents"].items():
+        print(f"  {stage:<12} {'n/a' if exponent is None else f'{exponent:.2f}'}")
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("settings") != results["settings"]:
+            print("Warning: baseline was recorded with different settings; comparisons may be meaningless.")
+        regressions = find_regressions(baseline, results, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}.")
+
+if __name__ == "__main__":
+    main()
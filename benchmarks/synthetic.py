@@ -0,0 +1,101 @@
+# benchmarks/synthetic.py
+"""
+Deterministic stand-ins for the outside world, for benchmarks: RSS feeds of any size served
+over local HTTP, and a Gemini model with a fixed latency. Nothing here touches the database.
+"""
+import hashlib
+import multiprocessing
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Tuple
+from xml.sax.saxutils import escape
+
+# Each entry mixes words from one topic with shared filler, so clustering has real structure to find
+TOPICS = {
+    "llm": "language model gpt reasoning tokens context benchmark llama gemini inference".split(),
+    "robotics": "robot humanoid gripper manipulation warehouse locomotion sensors autonomy".split(),
+    "vision": "image diffusion video generation pixels segmentation camera multimodal".split(),
+    "policy": "regulation act government safety law compliance copyright lawsuit".split(),
+    "chips": "nvidia gpu chip semiconductor tsmc datacenter accelerator export".split(),
+    "health": "medical diagnosis hospital drug protein clinical radiology patients".split(),
+    "research": "paper arxiv dataset training transformer attention reinforcement learning".split(),
+    "funding": "startup raises series valuation investors acquisition billion round".split(),
+}
+FILLER = "company announced researchers released update open source tool users team launch report new".split()
+FEED_PATH = re.compile(r"^/feeds/(\d+)/(\d+)\.xml$")
+
+def feed_url(base_url: str, index: int, entries: int) -> str:
+    return f"{base_url}/feeds/{entries}/{index}.xml"
+
+def render_feed(index: int, entries: int, now: datetime) -> bytes:
+    """RSS 2.0 document for feed `index`: `entries` items spread over the last 7 days, newest first."""
+    rng = random.Random(index)
+    step = timedelta(days=7) / (entries + 1)
+    items = []
+    for entry in range(entries):
+        words = TOPICS[rng.choice(list(TOPICS))]
+        title = " ".join(rng.sample(words, 4) + rng.sample(FILLER, 2)).capitalize()
+        summary = " ".join(rng.choices(words, k=12) + rng.choices(FILLER, k=20)).capitalize() + "."
+        items.append(
+            f"<item><title>{escape(title)}</title>"
+            f"<link>https://news{index}.example/{index}/{entry}?utm_source=rss</link>"
+            f"<description>&lt;p&gt;{escape(summary)}&lt;/p&gt;</description>"
+            f"<pubDate>{format_datetime(now - step * (entry + 1))}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Synthetic feed {index}</title><link>https://news{index}.example/</link>"
+        f"<description>Benchmark feed</description>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves /feeds/<entries>/<index>.xml, rendered on request."""
+    now = datetime.now(timezone.utc)
+
+    def do_GET(self):
+        match = FEED_PATH.match(self.path)
+        if not match:
+            self.send_error(404)
+            return
+        entries, index = int(match.group(1)), int(match.group(2))
+        body = render_feed(index, entries, self.now)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _serve(server: ThreadingHTTPServer) -> None:
+    server.serve_forever()
+
+def start_feed_server() -> Tuple[str, multiprocessing.Process]:
+    """
+    Starts the feed server in its own process, so rendering feeds never shows up in the
+    benchmarked process's time or memory. Returns its base URL and the process to terminate.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    process = multiprocessing.get_context("fork").Process(target=_serve, args=(server,), daemon=True)
+    process.start()
+    server.server_close()  # The child owns the listening socket now
+    return f"http://127.0.0.1:{server.server_address[1]}", process
+
+class StubGemini:
+    """Stands in for genai.GenerativeModel: a fixed latency, and output that depends only on the prompt."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> SimpleNamespace:
+        self.calls += 1
+        time.sleep(self.latency)
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=4).hexdigest()
+        return SimpleNamespace(text=f"A short student-friendly summary ({digest}) of why this matters.")
@@ -1,6 +1,6 @@
 # config.py
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     """Loads and validates application settings from environment variables."""
@@ -11,6 +11,36 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # Seconds; keeps connections younger than hosted Postgres idle limits
+    SQLITE_WAL: bool = True
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    
+    # Engagement tracking. Links and the open pixel are only rewritten when PUBLIC_BASE_URL is set.
+    PUBLIC_BASE_URL: Optional[str] = None  # e.g. https://ai-weekly.example.com
+    TRACKING_FLUSH_SECONDS: float = 5.0
+    TRACKING_CACHE_SIZE: int = 10000
+    CLICK_SCORE_DAYS: int = 90
+    
+    # Card thumbnails, also only when PUBLIC_BASE_URL is set (emails need absolute image URLs).
+    # Served from /static/thumbs; the directory must outlive deploys or sent emails lose their images.
+    THUMBNAIL_DIR: str = "web/static/thumbs"
+    THUMBNAIL_CACHE_MAX_MB: int = 500
+    
+    # Gemini summaries per run; theme representatives are summarized first
+    SUMMARY_LIMIT: int = 6
+    
+    # Issue archive. Bodies are zstd-compressed; the dictionary (tasks/train_issue_dictionary.py) shrinks them
+    # further, but /last can then no longer send them to browsers still compressed.
+    ISSUE_ZSTD_DICTIONARY: bool = False
+    DRY_RUN_ISSUES_KEPT: int = 5  # Per edition; older dry runs are pruned after each new one
+    
+    # Email size. Gmail clips messages over ~102 KB; the margin leaves room for Mailchimp's own additions.
+    EMAIL_MAX_BYTES: int = 95000
+    EMAIL_OVER_BUDGET: str = "drop"  # "drop" low-priority sections, or "fail" the edition
     
     # Mailchimp
     MAILCHIMP_API_KEY: str
@@ -18,12 +48,15 @@ class Settings(BaseSettings):
     MAILCHIMP_LIST_ID: str
     MAILCHIMP_FROM_NAME: str = "AI Weekly Newsletter"
     MAILCHIMP_REPLY_TO: str
+    # Extra editions to generate, as JSON: {"india": "<list id>", "research": "<list id>"}
+    MAILCHIMP_EDITION_LISTS: Dict[str, str] = {}
     
     # Gemini
     GEMINI_API_KEY: str
 
-    # X/Twitter
+    # X/Twitter. The X source is only polled when a bearer token is set.
     X_BEARER_TOKEN: Optional[str] = None
+    X_API_BASE_URL: str = "https://api.twitter.com/2"
 
     # GitHub
     GITHUB_PAT: Optional[str] = None # <-- ADD THIS LINE
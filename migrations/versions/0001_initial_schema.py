@@ -0,0 +1,105 @@
+"""Initial schema
+
+Databases created before migrations existed already have these tables from
+Base.metadata.create_all, so each table is only created when it is missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "subscribers" not in existing:
+        op.create_table(
+            "subscribers",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("subscribed_at", sa.DateTime(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+        )
+        op.create_index("ix_subscribers_id", "subscribers", ["id"])
+        op.create_index("ix_subscribers_email", "subscribers", ["email"], unique=True)
+
+    if "issues" not in existing:
+        op.create_table(
+            "issues",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("subject", sa.String(), nullable=False),
+            sa.Column("content_html", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.Column("mailchimp_campaign_id", sa.String(), nullable=True),
+        )
+        op.create_index("ix_issues_id", "issues", ["id"])
+
+    if "newsletter_items" not in existing:
+        op.create_table(
+            "newsletter_items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("issue_id", sa.Integer(), sa.ForeignKey("issues.id"), nullable=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("url", sa.String(), nullable=False, unique=True),
+            sa.Column("summary", sa.Text(), nullable=False),
+            sa.Column("category", sa.String(), nullable=False),
+        )
+        op.create_index("ix_newsletter_items_id", "newsletter_items", ["id"])
+
+    if "collected_items" not in existing:
+        op.create_table(
+            "collected_items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("canonical_url", sa.String(), nullable=False, unique=True),
+            sa.Column("url", sa.String(), nullable=False),
+            sa.Column("feed", sa.String(), nullable=True),
+            sa.Column("source", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("summary", sa.Text(), nullable=False),
+            sa.Column("company", sa.String(), nullable=True),
+            sa.Column("published", sa.DateTime(), nullable=False),
+            sa.Column("first_seen_at", sa.DateTime(), nullable=True),
+            sa.Column("last_seen_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_collected_items_id", "collected_items", ["id"])
+        op.create_index("ix_collected_items_published", "collected_items", ["published"])
+
+    if "feed_state" not in existing:
+        op.create_table(
+            "feed_state",
+            sa.Column("feed_key", sa.String(), primary_key=True),
+            sa.Column("high_water_mark", sa.DateTime(), nullable=True),
+            sa.Column("etag", sa.String(), nullable=True),
+            sa.Column("last_modified", sa.String(), nullable=True),
+            sa.Column("last_polled_at", sa.DateTime(), nullable=True),
+            sa.Column("next_poll_at", sa.DateTime(), nullable=True),
+            sa.Column("items_seen", sa.Integer(), nullable=True),
+        )
+
+    if "source_health" not in existing:
+        op.create_table(
+            "source_health",
+            sa.Column("source_key", sa.String(), primary_key=True),
+            sa.Column("state", sa.String(), nullable=False),
+            sa.Column("consecutive_failures", sa.Integer(), nullable=False),
+            sa.Column("recent_outcomes", sa.String(), nullable=False),
+            sa.Column("recent_latencies", sa.Text(), nullable=False),
+            sa.Column("opened_at", sa.DateTime(), nullable=True),
+            sa.Column("last_success_at", sa.DateTime(), nullable=True),
+            sa.Column("last_failure_at", sa.DateTime(), nullable=True),
+            sa.Column("last_error", sa.String(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    for table in ("source_health", "feed_state", "collected_items", "newsletter_items", "issues", "subscribers"):
+        op.drop_table(table)
@@ -0,0 +1,29 @@
+"""Indexes for the hot query paths
+
+- subscribers(is_active, subscribed_at): get_all_active_subscribers
+- issues(created_at): get_last_issue
+- newsletter_items(issue_id, category): the Issue.items relationship
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_subscribers_is_active_subscribed_at", "subscribers", ["is_active", "subscribed_at"])
+    op.create_index("ix_issues_created_at", "issues", ["created_at"])
+    op.create_index("ix_newsletter_items_issue_id_category", "newsletter_items", ["issue_id", "category"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_newsletter_items_issue_id_category", table_name="newsletter_items")
+    op.drop_index("ix_issues_created_at", table_name="issues")
+    op.drop_index("ix_subscribers_is_active_subscribed_at", table_name="subscribers")
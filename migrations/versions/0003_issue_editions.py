@@ -0,0 +1,28 @@
+"""Issue editions
+
+Existing issues belong to the main "weekly" edition.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.add_column(sa.Column("edition", sa.String(), nullable=False, server_default="weekly"))
+    op.create_index("ix_issues_edition_created_at", "issues", ["edition", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_issues_edition_created_at", table_name="issues")
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.drop_column("edition")
@@ -0,0 +1,50 @@
+"""Engagement tracking: tracked links, issue opens and issue tracking keys
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.add_column(sa.Column("tracking_key", sa.String(), nullable=True))
+    op.create_index("ix_issues_tracking_key", "issues", ["tracking_key"])
+
+    op.create_table(
+        "tracked_links",
+        sa.Column("item_id", sa.String(), primary_key=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("host", sa.String(), nullable=False),
+        sa.Column("tracking_key", sa.String(), nullable=False),
+        sa.Column("clicks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_clicked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_tracked_links_tracking_key", "tracked_links", ["tracking_key"])
+    op.create_index("ix_tracked_links_host", "tracked_links", ["host"])
+
+    op.create_table(
+        "issue_opens",
+        sa.Column("tracking_key", sa.String(), primary_key=True),
+        sa.Column("opens", sa.Integer(), nullable=False),
+        sa.Column("last_opened_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("issue_opens")
+    op.drop_index("ix_tracked_links_host", table_name="tracked_links")
+    op.drop_index("ix_tracked_links_tracking_key", table_name="tracked_links")
+    op.drop_table("tracked_links")
+    op.drop_index("ix_issues_tracking_key", table_name="issues")
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.drop_column("tracking_key")
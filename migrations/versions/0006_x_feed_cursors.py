@@ -0,0 +1,26 @@
+"""X source cursors: since_id and cached user ID per account in feed_state
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("feed_state") as batch_op:
+        batch_op.add_column(sa.Column("since_id", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("external_id", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("feed_state") as batch_op:
+        batch_op.drop_column("external_id")
+        batch_op.drop_column("since_id")
@@ -0,0 +1,30 @@
+"""Thumbnails: cached card image per item
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "thumbnails",
+        sa.Column("canonical_url", sa.String(), primary_key=True),
+        sa.Column("source_url", sa.String(), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_thumbnails_filename", "thumbnails", ["filename"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_thumbnails_filename", table_name="thumbnails")
+    op.drop_table("thumbnails")
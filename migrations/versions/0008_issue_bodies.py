@@ -0,0 +1,106 @@
+"""Issue bodies: zstd-compressed, deduplicated issue HTML and dry-run flag
+
+Moves issues.content_html into issue_bodies, one compressed row per distinct HTML.
+Existing issues without a Mailchimp campaign were dry runs.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+ZSTD_LEVEL = 19
+
+issues = sa.table(
+    "issues",
+    sa.column("id", sa.Integer()),
+    sa.column("content_html", sa.Text()),
+    sa.column("body_hash", sa.String()),
+    sa.column("mailchimp_campaign_id", sa.String()),
+    sa.column("is_dry_run", sa.Boolean()),
+)
+issue_bodies = sa.table(
+    "issue_bodies",
+    sa.column("content_hash", sa.String()),
+    sa.column("body", sa.LargeBinary()),
+    sa.column("dictionary_id", sa.Integer()),
+    sa.column("size", sa.Integer()),
+    sa.column("created_at", sa.DateTime()),
+)
+compression_dictionaries = sa.table(
+    "compression_dictionaries",
+    sa.column("id", sa.Integer()),
+    sa.column("data", sa.LargeBinary()),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "compression_dictionaries",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        "issue_bodies",
+        sa.Column("content_hash", sa.String(), primary_key=True),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("dictionary_id", sa.Integer(), sa.ForeignKey("compression_dictionaries.id"), nullable=True),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.add_column(sa.Column("body_hash", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("is_dry_run", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    connection = op.get_bind()
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, write_checksum=True)
+    stored = set()
+    for issue_id, html in connection.execute(sa.select(issues.c.id, issues.c.content_html)).all():
+        data = (html or "").encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        if content_hash not in stored:
+            connection.execute(issue_bodies.insert().values(
+                content_hash=content_hash, body=compressor.compress(data), dictionary_id=None, size=len(data),
+                created_at=sa.func.now(),
+            ))
+            stored.add(content_hash)
+        connection.execute(issues.update().where(issues.c.id == issue_id).values(body_hash=content_hash))
+    connection.execute(issues.update().where(issues.c.mailchimp_campaign_id.is_(None)).values(is_dry_run=True))
+
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.drop_column("content_html")
+        batch_op.create_foreign_key("fk_issues_body_hash", "issue_bodies", ["body_hash"], ["content_hash"])
+    op.create_index("ix_issues_body_hash", "issues", ["body_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_issues_body_hash", table_name="issues")
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.drop_constraint("fk_issues_body_hash", type_="foreignkey")
+        batch_op.add_column(sa.Column("content_html", sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    dictionaries = dict(connection.execute(sa.select(compression_dictionaries.c.id, compression_dictionaries.c.data)).all())
+    bodies = sa.select(issue_bodies.c.content_hash, issue_bodies.c.body, issue_bodies.c.dictionary_id)
+    for content_hash, body, dictionary_id in connection.execute(bodies).all():
+        dictionary = zstandard.ZstdCompressionDict(dictionaries[dictionary_id]) if dictionary_id is not None else None
+        html = zstandard.ZstdDecompressor(dict_data=dictionary).decompress(body).decode("utf-8")
+        connection.execute(issues.update().where(issues.c.body_hash == content_hash).values(content_html=html))
+
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.alter_column("content_html", existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column("is_dry_run")
+        batch_op.drop_column("body_hash")
+    op.drop_table("issue_bodies")
+    op.drop_table("compression_dictionaries")
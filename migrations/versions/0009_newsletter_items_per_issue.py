@@ -0,0 +1,50 @@
+"""Newsletter items per issue
+
+newsletter_items.url was unique across all issues, so an item that had appeared in one issue
+(or another edition of the same week) was left out of every later one. URLs are now unique
+within an issue.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# SQLite reports the original constraint without a name; the batch copy names it by this convention
+NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+newsletter_items = sa.table(
+    "newsletter_items",
+    sa.column("id", sa.Integer()),
+    sa.column("url", sa.String()),
+)
+
+
+def _url_constraint_name() -> str:
+    for constraint in sa.inspect(op.get_bind()).get_unique_constraints("newsletter_items"):
+        if constraint["column_names"] == ["url"]:
+            return constraint["name"] or "uq_newsletter_items_url"
+    return "uq_newsletter_items_url"
+
+
+def upgrade() -> None:
+    name = _url_constraint_name()
+    with op.batch_alter_table("newsletter_items", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_="unique")
+        batch_op.create_unique_constraint("uq_newsletter_items_issue_url", ["issue_id", "url"])
+
+
+def downgrade() -> None:
+    # Only the first issue to include a URL keeps it
+    first = sa.select(sa.func.min(newsletter_items.c.id)).group_by(newsletter_items.c.url)
+    op.execute(newsletter_items.delete().where(newsletter_items.c.id.not_in(first)))
+    with op.batch_alter_table("newsletter_items") as batch_op:
+        batch_op.drop_constraint("uq_newsletter_items_issue_url", type_="unique")
+        batch_op.create_unique_constraint("uq_newsletter_items_url", ["url"])
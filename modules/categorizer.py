@@ -1,91 +1,102 @@
 # modules/categorizer.py
-from typing import Dict, List
+from dataclasses import replace
+from typing import Dict, List, Optional
 import logging
 import random
 import time
 
+from modules.content import ContentBatch, ContentItem
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of items per section. Editions override this to reshape the newsletter;
+# a section with a limit of 0 is left empty and skipped by the template.
+DEFAULT_SECTION_LIMITS = {
+    "Big Story of the Week": 1,
+    "Indian_AI_News": 2,
+    "Top Research Paper": 1,
+    "Top GitHub Repo": 1,
+    "AI_Job_Spotlight": 2,
+    "Quote_of_the_Week": 1,
+}
+
 # modules/categorizer.py
 
-def select_and_categorize(items: List[Dict]) -> Dict[str, List[Dict]]:
+INDIAN_NEWS_HOSTS = ("livemint.com", "timesofindia.indiatimes.com")
+PRIORITY_KEYWORDS = ("openai", "google", "deepmind", "anthropic", "aws")
+
+def select_and_categorize(items: List[ContentItem], section_limits: Optional[Dict[str, int]] = None,
+                          rng: Optional[random.Random] = None,
+                          click_scores: Optional[Dict[str, float]] = None) -> Dict[str, List[ContentItem]]:
     """
     Selects and categorizes items for the newsletter with a final, robust logic
-    to ensure all sections are populated correctly.
+    to ensure all sections are populated correctly. Pass a seeded `rng` for a
+    reproducible quote choice. `click_scores` (average clicks per link by host,
+    see modules/tracking.py) moves items from well-clicked hosts to the front of
+    each section; ties keep their original order.
     """
     logger.info("Categorizing and selecting top items...")
+    limits = DEFAULT_SECTION_LIMITS if section_limits is None else section_limits
 
     # --- Step 1: Initialize categories and a set to track used URLs ---
     assigned_urls = set()
-    categorized_content = {
-        "Big Story of the Week": [],
-        "Indian_AI_News": [],
-        "Top Research Paper": [],
-        "Top GitHub Repo": [],
-        "AI_Job_Spotlight": [],
-        "Quote_of_the_Week": [],
-    }
+    categorized_content = {section: [] for section in DEFAULT_SECTION_LIMITS}
 
     # --- Step 2: Correctly separate all items into exclusive lists ---
-    papers = [item for item in items if "arxiv.org" in item.get("url", "")]
-    repos = [item for item in items if item.get("source") == "github"]
-    jobs = [item for item in items if "weworkremotely.com" in item.get("url", "")]
-    
-    all_blogs = [
-        item for item in items 
-        if item.get("source") == "rss" 
-        and "arxiv.org" not in item.get("url", "")
-        and "weworkremotely.com" not in item.get("url", "")
-    ]
+    # Site checks run once per distinct host on the columnar batch. Priority keywords are matched
+    # against the whole URL: a techcrunch.com article with "openai" in its path is a priority story
+    batch = ContentBatch(items)
+    is_paper = batch.host_mask(lambda host: "arxiv.org" in host)
+    is_job = batch.host_mask(lambda host: "weworkremotely.com" in host)
+    is_blog = batch.source_mask("rss") & ~is_paper & ~is_job
+    is_indian = is_blog & batch.host_mask(lambda host: any(name in host for name in INDIAN_NEWS_HOSTS))
+    is_general = is_blog & ~is_indian
+    is_priority = is_general & batch.url_mask(lambda url: any(key in url for key in PRIORITY_KEYWORDS))
+
+    scores = batch.host_values(click_scores) if click_scores else None
 
-    indian_news_urls = ["livemint.com", "timesofindia.indiatimes.com"]
-    indian_news = []
-    general_blogs = []
-    for blog in all_blogs:
-        if any(url in blog.get("url", "") for url in indian_news_urls):
-            indian_news.append(blog)
-        else:
-            general_blogs.append(blog)
+    papers = batch.select(is_paper, scores)
+    repos = batch.select(batch.source_mask("github"), scores)
+    jobs = batch.select(is_job, scores)
+    indian_news = batch.select(is_indian, scores)
+    general_blogs = batch.select(is_general, scores)
+    priority_blogs = batch.select(is_priority, scores)
 
     # --- Step 3: Define a helper function to safely add items ---
-    def add_item(section, item_list, max_items=1):
+    def add_item(section, item_list):
+        max_items = limits.get(section, 0)
         added_count = 0
         for item in item_list:
-            if item.get('url') and item['url'] not in assigned_urls and added_count < max_items:
+            if item.url and item.canonical_url not in assigned_urls and added_count < max_items:
                 categorized_content[section].append(item)
-                assigned_urls.add(item['url'])
+                assigned_urls.add(item.canonical_url)
                 added_count += 1
 
     # --- Step 4: Fill categories with priority content first ---
-    priority_keywords = ["openai", "google", "deepmind", "anthropic", "aws"]
-    priority_blogs = [b for b in general_blogs if any(key in b.get('url', '') for key in priority_keywords)]
-    
     add_item("Big Story of the Week", priority_blogs)
-    add_item("Indian_AI_News", indian_news, 2)
+    add_item("Indian_AI_News", indian_news)
     add_item("Top Research Paper", papers)
     add_item("Top GitHub Repo", repos)
 
     # --- Step 5: Use Fallbacks to fill any remaining empty sections ---
-    remaining_blogs = [b for b in general_blogs if b.get('url') and b['url'] not in assigned_urls]
-    remaining_papers = [p for p in papers if p.get('url') and p['url'] not in assigned_urls]
+    remaining_blogs = [b for b in general_blogs if b.url and b.canonical_url not in assigned_urls]
+    remaining_papers = [p for p in papers if p.url and p.canonical_url not in assigned_urls]
 
     if not categorized_content["Big Story of the Week"]:
         add_item("Big Story of the Week", remaining_blogs)
     if not categorized_content["Indian_AI_News"]:
-        add_item("Indian_AI_News", remaining_blogs, 2)
+        add_item("Indian_AI_News", remaining_blogs)
     if not categorized_content["Top Research Paper"]:
         add_item("Top Research Paper", remaining_papers)
 
     # --- Step 6: Add static and job sections ---
-    if jobs:
+    if jobs and limits.get("AI_Job_Spotlight", 0):
         formatted_jobs = []
-        for job in jobs[:2]:
-            parts = job['title'].split(':', 1)
+        for job in jobs[:limits["AI_Job_Spotlight"]]:
+            parts = job.title.split(':', 1)
             company = parts[0].strip()
             title = parts[1].strip() if len(parts) > 1 else "Software Engineer"
-            formatted_jobs.append({
-                "title": title, "company": company, "url": job['url'], "description": job['summary']
-            })
+            formatted_jobs.append(replace(job, title=title, company=company))
         categorized_content["AI_Job_Spotlight"] = formatted_jobs
 
     # --- THIS IS THE UPDATED QUOTES LIST ---
@@ -113,10 +124,13 @@ def select_and_categorize(items: List[Dict]) -> Dict[str, List[Dict]]:
         {"quote": "In the long run, I think we will evolve in partnership with our machinery.", "author": "Kevin Kelly"},
         {"quote": "Everything we love about civilization is a product of intelligence, so amplifying our human intelligence with artificial intelligence has the potential of helping civilization flourish like never before.", "author": "Max Tegmark"},
     ]
-    chosen_quote = random.choice(quotes)
-    # The URL needs to be unique for the database, but the title and summary can be from the chosen quote
-    chosen_quote['url'] = f"#/quote-{int(time.time())}"
-    categorized_content["Quote_of_the_Week"].append(chosen_quote)
+    if limits.get("Quote_of_the_Week", 0):
+        chosen_quote = (rng or random).choice(quotes)
+        # The URL needs to be unique for the database, but the title and summary can be from the chosen quote
+        categorized_content["Quote_of_the_Week"].append(ContentItem(
+            source="quote", title=chosen_quote["quote"], author=chosen_quote["author"],
+            url=f"#/quote-{int(time.time())}",
+        ))
 
     logger.info("Finished categorizing content with final robust logic.")
     return categorized_content
\ No newline at end of file
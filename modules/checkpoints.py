@@ -0,0 +1,56 @@
+# modules/checkpoints.py
+import datetime
+import json
+import logging
+import secrets
+from typing import Any, Callable, Optional
+
+from modules.clustering import Theme
+from modules.content import ContentItem
+from modules.storage import get_checkpoint, save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+def new_run_id() -> str:
+    """Sortable, unique run ID such as 20250105-043000-a1b2c3."""
+    return f"{datetime.datetime.utcnow():%Y%m%d-%H%M%S}-{secrets.token_hex(3)}"
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (ContentItem, Theme)):
+        return value.to_dict()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot checkpoint value of type {type(value).__name__}")
+
+class Checkpointer:
+    """
+    Persists each pipeline stage's output under a run ID. Re-running with the same
+    run ID returns stored outputs instead of redoing the work.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+
+    def get(self, stage: str) -> Optional[Any]:
+        payload = get_checkpoint(self.run_id, stage)
+        return None if payload is None else json.loads(payload)
+
+    def save(self, stage: str, value: Any) -> None:
+        save_checkpoint(self.run_id, stage, json.dumps(value, default=_json_default))
+
+    def done(self, stage: str) -> bool:
+        return get_checkpoint(self.run_id, stage) is not None
+
+    def run(self, stage: str, compute: Callable[[], Any], decode: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Returns the stored output of `stage`, or computes and stores it.
+        `decode` rebuilds typed values (e.g. ContentItems) from the stored JSON.
+        """
+        stored = self.get(stage)
+        if stored is not None:
+            logger.info(f"[{self.run_id}] Reusing checkpoint for stage '{stage}'.")
+            return decode(stored) if decode else stored
+        value = compute()
+        if value is not None:
+            self.save(stage, value)
+        return value
@@ -0,0 +1,221 @@
+# modules/clustering.py
+import logging
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from modules.content import ContentItem
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space. 2**15 columns keeps dense centroids small (64 x 32768 floats = 16 MB)
+# while collisions stay rare for a week of news.
+N_FEATURES = 2 ** 15
+MAX_CLUSTERS = 64
+MIN_THEME_SIZE = 2
+MAX_RELATED = 3  # Related links shown under each theme's representative
+THEMES_SECTION = "This_Weeks_Themes"
+TITLE_WEIGHT = 2  # Title terms count double: they carry the topic, summaries carry boilerplate
+
+TOKEN = re.compile(r"[a-z0-9]+(?:[+#.-][a-z0-9+#]+)*")
+HTML_TAG = re.compile(r"<[^>]+>")
+STOPWORDS = frozenset("""
+    a about after all also an and any are as at be been but by can could do does for from had has have how
+    i if in into is it its just more most new no not of on one or our out over so some such than that the
+    their them then there these they this to up us was we were what when which who will with would you your
+    via per vs read post appeared first continue reading article blog news week today
+""".split())
+
+@dataclass
+class Theme:
+    """A group of related items. The first item is the one closest to the group's centre."""
+    label: str
+    items: List[ContentItem]
+    cohesion: float  # Mean cosine similarity of members to the centre
+
+    @property
+    def representative(self) -> ContentItem:
+        return self.items[0]
+
+    @property
+    def related(self) -> List[ContentItem]:
+        return self.items[1:]
+
+    def to_dict(self) -> Dict:
+        return {"label": self.label, "items": [item.to_dict() for item in self.items], "cohesion": self.cohesion}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Theme":
+        return cls(label=data["label"], items=[ContentItem.from_dict(item) for item in data["items"]],
+                   cohesion=data["cohesion"])
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN.findall(HTML_TAG.sub(" ", text).lower())
+            if token not in STOPWORDS and len(token) > 1]
+
+class HashingVectorizer:
+    """
+    Unigram + bigram TF-IDF over a fixed hashed feature space, built straight into a CSR matrix.
+    Remembers one term per column so cluster labels can be read back.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.n_features = n_features
+        self._columns: Dict[str, int] = {}
+        self.terms: Dict[int, str] = {}
+
+    def _column(self, term: str) -> int:
+        column = self._columns.get(term)
+        if column is None:
+            # crc32 rather than hash(): stable across processes, so results are reproducible
+            column = zlib.crc32(term.encode("utf-8")) & (self.n_features - 1)
+            self._columns[term] = column
+            self.terms.setdefault(column, term)
+        return column
+
+    def _terms(self, item: ContentItem) -> List[Tuple[str, int]]:
+        weighted = []
+        for text, weight in ((item.title, TITLE_WEIGHT), (item.summary, 1)):
+            tokens = tokenize(text or "")
+            weighted.extend((token, weight) for token in tokens)
+            weighted.extend((f"{a} {b}", weight) for a, b in zip(tokens, tokens[1:]))
+        return weighted
+
+    def fit_transform(self, items: Sequence[ContentItem]) -> sparse.csr_matrix:
+        rows, columns, values = [], [], []
+        for row, item in enumerate(items):
+            for term, weight in self._terms(item):
+                rows.append(row)
+                columns.append(self._column(term))
+                values.append(weight)
+        matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float64), (np.asarray(rows, dtype=np.int32), np.asarray(columns, dtype=np.int32))),
+            shape=(len(items), self.n_features),
+        )
+        matrix.sum_duplicates()
+
+        # Sublinear TF, smoothed IDF, then unit-length rows so dot products are cosine similarities
+        matrix.data = 1.0 + np.log(matrix.data)
+        document_frequency = np.bincount(matrix.indices, minlength=self.n_features)
+        idf = np.log((1.0 + len(items)) / (1.0 + document_frequency)) + 1.0
+        matrix.data *= idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+def _normalize_columns(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=0, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def _kmeans_plus_plus(matrix: sparse.csr_matrix, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Greedy k-means++ on a sample of rows: each step draws a few candidates in proportion to their
+    squared cosine distance and keeps the one that brings the sample closest to its centres.
+    """
+    sample = rng.choice(matrix.shape[0], size=min(matrix.shape[0], max(20 * k, 2000)), replace=False)
+    points = matrix[sample]
+    trials = 2 + int(np.log(k))
+    chosen = [int(rng.integers(points.shape[0]))]
+    distance = 1.0 - (points @ points[chosen[0]].T).toarray().ravel()
+    for _ in range(1, k):
+        weights = np.clip(distance, 0, None) ** 2
+        total = weights.sum()
+        if total <= 0:
+            candidates = rng.integers(points.shape[0], size=trials)
+        else:
+            candidates = rng.choice(points.shape[0], size=trials, p=weights / total)
+        distances = np.minimum(distance[:, None], 1.0 - (points @ points[candidates].T).toarray())
+        best = int(distances.sum(axis=0).argmin())
+        chosen.append(int(candidates[best]))
+        distance = distances[:, best]
+    return points[chosen].T.toarray()
+
+def spherical_minibatch_kmeans(matrix: sparse.csr_matrix, k: int, seed: int = 0, batch_size: int = 1024,
+                               max_iter: int = 100, tol: float = 1e-4) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mini-batch k-means on unit vectors (cosine similarity). Each step assigns one batch with a single
+    sparse-dense product and moves every centre towards its batch mean with a per-centre learning rate.
+    Inputs no larger than one batch get full Lloyd steps instead. Centres are kept as contiguous
+    columns (features x k), so the products never copy them.
+    Returns (labels, similarity of each row to its centre, centres).
+    """
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    centers = _kmeans_plus_plus(matrix, k, rng)
+    counts = np.zeros(k)
+    for _ in range(max_iter):
+        batch = rng.choice(n, size=batch_size, replace=False) if n > batch_size else np.arange(n)
+        points = matrix[batch]
+        labels = (points @ centers).argmax(axis=1)
+        batch_counts = np.bincount(labels, minlength=k)
+        hit = np.flatnonzero(batch_counts)
+        membership = sparse.csr_matrix((np.ones(len(batch)), (labels, np.arange(len(batch)))), shape=(k, len(batch)))
+        means = (membership[hit] @ points).T.toarray() / batch_counts[hit]
+        counts[hit] += batch_counts[hit]
+        # When the batch is the whole input this is a plain (Lloyd) step
+        rate = batch_counts[hit] / counts[hit] if n > batch_size else 1.0
+        previous = centers[:, hit]
+        moved = _normalize_columns((1 - rate) * previous + rate * means)
+        centers[:, hit] = moved
+        if float(np.max(1.0 - np.sum(moved * previous, axis=0))) < tol:
+            break
+    similarity = matrix @ centers
+    labels = similarity.argmax(axis=1)
+    return labels, similarity[np.arange(n), labels], centers
+
+def default_cluster_count(n_items: int) -> int:
+    return max(1, min(MAX_CLUSTERS, n_items // 2, int(round(np.sqrt(n_items / 2)))))
+
+def cluster_items(items: Sequence[ContentItem], k: Optional[int] = None, seed: int = 0,
+                  min_size: int = MIN_THEME_SIZE) -> List[Theme]:
+    """
+    Groups items into themes, most substantial first (size x cohesion). Items are ordered by
+    closeness to their theme's centre, so the first one is the natural pick to summarize.
+    Clusters smaller than `min_size` are left out.
+    """
+    items = list(items)
+    if len(items) < max(2, min_size):
+        return []
+    vectorizer = HashingVectorizer()
+    matrix = vectorizer.fit_transform(items)
+    # Centres are dense, so they only span the feature columns that actually occur
+    active = np.unique(matrix.indices)
+    matrix = matrix[:, active]
+    k = min(k or default_cluster_count(len(items)), len(items))
+    labels, similarity, centers = spherical_minibatch_kmeans(matrix, k, seed=seed)
+
+    themes = []
+    order = np.lexsort((-similarity, labels))  # Grouped by cluster, most central first
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    for members in np.split(order, boundaries):
+        if len(members) < min_size:
+            continue
+        top_columns = np.argsort(-centers[:, labels[members[0]]])[:3]
+        label = ", ".join(vectorizer.terms[column] for column in active[top_columns] if column in vectorizer.terms)
+        themes.append(Theme(label=label, items=[items[i] for i in members],
+                            cohesion=round(float(similarity[members].mean()), 4)))
+    themes.sort(key=lambda theme: len(theme.items) * theme.cohesion, reverse=True)
+    logger.info(f"Clustered {len(items)} items into {k} groups, {len(themes)} themes of {min_size}+ items.")
+    return themes
+
+def select_themes(themes: Sequence[Theme], limit: int, accepts: Callable[[ContentItem], bool] = lambda item: True,
+                  exclude_urls: Optional[Set[str]] = None, min_size: int = MIN_THEME_SIZE) -> List[Theme]:
+    """
+    Narrows themes for one edition: only items it `accepts`, none already used in another
+    section, and at most `limit` themes that still have `min_size` items. Each theme keeps its
+    representative plus up to MAX_RELATED related items.
+    """
+    exclude_urls = exclude_urls or set()
+    selected = []
+    for theme in themes:
+        if len(selected) >= limit:
+            break
+        members = [item for item in theme.items if accepts(item) and item.canonical_url not in exclude_urls]
+        if len(members) >= min_size:
+            selected.append(Theme(label=theme.label, items=members[:1 + MAX_RELATED], cohesion=theme.cohesion))
+    return selected
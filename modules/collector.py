@@ -2,14 +2,19 @@
 import feedparser
 import requests
 from requests.adapters import HTTPAdapter, Retry
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Optional
 import logging
 import os
+import time
 from datetime import datetime, timedelta
-import tweepy
 from config import settings
 # We need BeautifulSoup to parse the HTML
 from bs4 import BeautifulSoup
+from modules.content import ContentItem
+from modules.source_health import (
+    SourceUnavailable, load_health, allow_request, adaptive_timeout, record_latency, record_success, record_failure,
+    save_health,
+)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -29,6 +34,55 @@ retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 50
 session.mount('http://', HTTPAdapter(max_retries=retries))
 session.mount('https://', HTTPAdapter(max_retries=retries))
 
+# guarded_get() retries by itself within the source's timeout budget, so its session has no retries
+guarded_session = requests.Session()
+guarded_session.headers.update(session.headers)
+GUARDED_ATTEMPTS = 3
+GUARDED_BACKOFF = 0.5  # Seconds before the first retry, doubling after that
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+GITHUB_SOURCE_KEY = "github:trending"
+
+def guarded_get(source_key: str, url: str, headers: Optional[Dict] = None) -> requests.Response:
+    """
+    GET through the source's circuit breaker with a timeout adapted to its observed latency.
+    Raises SourceUnavailable without touching the network while the circuit is open.
+
+    Connection errors and 5xx answers are retried, but every attempt and backoff comes out of
+    one adaptive_timeout() budget, so a slow source costs at most that long per call. A
+    half-open circuit gets a single probe.
+    """
+    health = load_health(source_key)
+    if not allow_request(health):
+        raise SourceUnavailable(f"circuit open for {source_key} since {health.opened_at:%Y-%m-%d %H:%M}")
+
+    attempts = 1 if health.state == "half_open" else GUARDED_ATTEMPTS
+    deadline = time.monotonic() + adaptive_timeout(health)
+    try:
+        for attempt in range(attempts):
+            backoff = GUARDED_BACKOFF * 2 ** attempt
+            start = time.monotonic()
+            try:
+                response = guarded_session.get(url, headers=headers, timeout=deadline - start)
+            except requests.ConnectionError:
+                if attempt + 1 == attempts or time.monotonic() + backoff >= deadline:
+                    raise
+            else:
+                latency = time.monotonic() - start
+                if response.status_code not in RETRY_STATUSES or attempt + 1 == attempts \
+                        or time.monotonic() + backoff >= deadline:
+                    response.raise_for_status()
+                    break
+                record_latency(health, latency)
+            time.sleep(backoff)
+    except Exception as e:
+        record_failure(health, str(e))
+        save_health(health)
+        raise
+    record_success(health, latency)
+    save_health(health)
+    return response
+
 # --- Configuration for Content Sources ---
 # modules/collector.py
 
@@ -47,39 +101,55 @@ SOURCES = {
     "jobs": "https://weworkremotely.com/categories/remote-programming-jobs.rss", # <-- ADD THIS NEW KEY
 }
 
-def fetch_rss_feed(url: str, limit: int = 5) -> List[Dict]:
+def parse_feed_items(content: bytes, feed: Optional[str] = None, limit: Optional[int] = None,
+                     high_water_mark: Optional[datetime] = None) -> List[ContentItem]:
+    """
+    Turns raw RSS/Atom bytes into content items.
+    Entries published at or before `high_water_mark` are skipped, so a poller only
+    pays for what is new since its last visit.
+    """
+    parsed = feedparser.parse(content)
+    entries = parsed.entries if limit is None else parsed.entries[:limit]
+    items = []
+    for entry in entries:
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        published = datetime(*published[:6]) if published else None
+        if high_water_mark and published and published <= high_water_mark:
+            continue
+        items.append(ContentItem(
+            source="rss",
+            feed=feed,
+            title=entry.get("title", "Untitled"),
+            url=entry.get("link", ""),
+            summary=entry.get("summary", ""),
+            published=published,
+        ))
+    return items
+
+def fetch_rss_feed(url: str, limit: int = 5, feed: Optional[str] = None) -> List[ContentItem]:
     """Fetches and parses an RSS feed using our resilient session."""
     items = []
     try:
-        # Using feedparser's ability to take a file-like object
-        response = session.get(url, timeout=15)
-        response.raise_for_status()
-        feed = feedparser.parse(response.content)
-        
-        for entry in feed.entries[:limit]:
-            items.append({
-                "source": "rss",
-                "title": entry.title,
-                "url": entry.link,
-                "summary": entry.get("summary", ""),
-                "published": entry.get("published_parsed")
-            })
+        response = guarded_get(url, url)
+        items = [item for item in parse_feed_items(response.content, feed=feed, limit=limit) if item.url]
+    except SourceUnavailable as e:
+        logger.warning(f"Skipping RSS feed {url}: {e}")
     except Exception as e:
         logger.error(f"Failed to fetch RSS feed {url}: {e}")
     return items
 
-def fetch_arxiv() -> List[Dict]:
+def fetch_arxiv() -> List[ContentItem]:
     """Fetches latest from arXiv AI feed."""
-    return fetch_rss_feed(SOURCES["research"], limit=10)
+    return fetch_rss_feed(SOURCES["research"], limit=10, feed="research")
 
-def fetch_blogs() -> List[Dict]:
+def fetch_blogs() -> List[ContentItem]:
     """Fetches latest from configured blog RSS feeds."""
     all_blog_posts = []
     for url in SOURCES["blogs"]:
-        all_blog_posts.extend(fetch_rss_feed(url, limit=5))
+        all_blog_posts.extend(fetch_rss_feed(url, limit=5, feed="blogs"))
     return all_blog_posts
 
-def fetch_trending_github_repos() -> List[Dict]:
+def fetch_trending_github_repos(limit: int = 5) -> List[ContentItem]:
     """Fetches trending AI repositories directly from GitHub's API."""
     logger.info("Fetching trending GitHub repos from official API...")
     items = []
@@ -93,23 +163,25 @@ def fetch_trending_github_repos() -> List[Dict]:
         if github_token:
             headers['Authorization'] = f"token {github_token}"
         
-        response = session.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        for repo in response.json().get("items", [])[:5]:
-            items.append({
-                "source": "github",
-                "title": repo.get("full_name"),
-                "url": repo.get("html_url"),
-                "summary": repo.get("description", "No description provided."),
-            })
+        response = guarded_get(GITHUB_SOURCE_KEY, url, headers=headers)
+
+        for repo in response.json().get("items", [])[:limit]:
+            items.append(ContentItem(
+                source="github",
+                feed="github",
+                title=repo.get("full_name"),
+                url=repo.get("html_url"),
+                summary=repo.get("description") or "No description provided.",
+            ))
+    except SourceUnavailable as e:
+        logger.warning(f"Skipping GitHub repos: {e}")
     except Exception as e:
         logger.error(f"Failed to fetch GitHub repos: {e}")
     return items
 
 # modules/collector.py
 
-def collect_all_content() -> List[Dict]:
+def collect_all_content() -> List[ContentItem]:
     logger.info("Starting content collection...")
 
     arxiv_papers = fetch_arxiv()
@@ -125,22 +197,45 @@ def collect_all_content() -> List[Dict]:
     seen_urls: Set[str] = set()
     
     for item in all_items:
-        if item.get("url") and item["url"] not in seen_urls:
+        if item.url and item.canonical_url not in seen_urls:
             unique_items.append(item)
-            seen_urls.add(item["url"])
+            seen_urls.add(item.canonical_url)
             
     logger.info(f"Collected {len(unique_items)} unique items from all sources.")
     return unique_items
 
+def collect_weekly_content(days: int = 7) -> List[ContentItem]:
+    """
+    Reads the last `days` of items from the local store filled by the ingester.
+    Falls back to a live collection when the store has nothing for the window,
+    e.g. on a fresh deployment where the ingester has not run yet.
+    """
+    # Imported here so the live collector can still be used without a database
+    from modules.storage import get_collected_items
+
+    since = datetime.utcnow() - timedelta(days=days)
+    try:
+        items = get_collected_items(since=since)
+    except Exception as e:
+        logger.error(f"Could not read collected items from the store: {e}")
+        items = []
+
+    if not items:
+        logger.warning("Item store is empty for this week, falling back to live collection.")
+        return collect_all_content()
+
+    logger.info(f"Loaded {len(items)} items collected since {since:%Y-%m-%d} from the store.")
+    return items
+
 # modules/collector.py
 # modules/collector.py
 
-def fetch_jobs_rss() -> List[Dict]:
+def fetch_jobs_rss() -> List[ContentItem]:
     """Fetches latest from the remote jobs RSS feed."""
-    return fetch_rss_feed(SOURCES["jobs"], limit=5)
+    return fetch_rss_feed(SOURCES["jobs"], limit=5, feed="jobs")
 
 # Add this new function at the end of the file
-def fetch_ai_jobs() -> List[Dict]:
+def fetch_ai_jobs() -> List[ContentItem]:
     """Scrapes a job board for the latest AI/ML jobs suitable for students."""
     logger.info("Fetching AI jobs...")
     items = []
@@ -163,13 +258,14 @@ def fetch_ai_jobs() -> List[Dict]:
         # --- END OF UPDATED PART ---
             
             if title_element and company_element and link_element:
-                items.append({
-                    "source": "job_board",
-                    "title": title_element.get_text(strip=True),
-                    "company": company_element.get_text(strip=True),
-                    "url": "https://www.entrylevel.io" + link_element['href'],
-                    "description": f"An exciting opportunity at {company_element.get_text(strip=True)}."
-                })
+                items.append(ContentItem(
+                    source="job_board",
+                    feed="jobs",
+                    title=title_element.get_text(strip=True),
+                    company=company_element.get_text(strip=True),
+                    url="https://www.entrylevel.io" + link_element['href'],
+                    summary=f"An exciting opportunity at {company_element.get_text(strip=True)}."
+                ))
     except Exception as e:
         logger.error(f"Failed to fetch AI jobs: {e}")
     return items
\ No newline at end of file
@@ -0,0 +1,139 @@
+# modules/content.py
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+# Query parameters that only carry tracking state and never change the page itself. Matched by
+# exact name, so `reference` or `refresh` are kept; only utm_* is matched by prefix.
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "ref_url", "cmpid"})
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalizes a URL so the same article reached through different links maps to one key.
+    Lowercases the scheme and host, drops fragments, default ports and tracking params,
+    sorts the remaining query string and trims a trailing slash.
+    Relative or fragment-only URLs (like quote anchors) are returned unchanged.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+@dataclass(frozen=True, slots=True)
+class ContentItem:
+    """
+    One piece of newsletter content, shared by every pipeline stage.
+
+    `source`, `feed` and `host` are interned, since thousands of items share a handful
+    of values. `host` and `canonical_url` are derived from `url` once at construction
+    and carried over by dataclasses.replace(); pass them explicitly only when changing `url`.
+    """
+    source: str
+    title: str
+    url: str
+    summary: str = ""
+    feed: Optional[str] = None
+    published: Optional[datetime] = None
+    company: Optional[str] = None
+    author: Optional[str] = None
+    host: str = ""
+    canonical_url: str = ""
+
+    def __post_init__(self):
+        set_field = object.__setattr__
+        set_field(self, "source", _intern(self.source))
+        set_field(self, "feed", _intern(self.feed))
+        if isinstance(self.published, time.struct_time):
+            set_field(self, "published", datetime(*self.published[:6]))
+        if not self.canonical_url:
+            set_field(self, "canonical_url", canonicalize_url(self.url))
+        if not self.host:
+            set_field(self, "host", urlsplit(self.canonical_url).hostname or "")
+        set_field(self, "host", _intern(self.host))
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly form, e.g. for pipeline checkpoints."""
+        data = asdict(self)
+        data["published"] = self.published.isoformat() if self.published else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ContentItem":
+        published = data.get("published")
+        if isinstance(published, str):
+            published = datetime.fromisoformat(published)
+        return cls(**{**data, "published": published})
+
+class ContentBatch:
+    """
+    Column-oriented view of a list of items for vectorized filtering and scoring.
+
+    Hosts and sources are stored once in small lookup tables and referenced by integer
+    codes, so a predicate on the host runs once per distinct host rather than per item.
+    """
+    __slots__ = ("items", "hosts", "host_codes", "sources", "source_codes", "published")
+
+    def __init__(self, items: Sequence[ContentItem]):
+        self.items = list(items)
+        host_index: Dict[str, int] = {}
+        source_index: Dict[str, int] = {}
+        count = len(self.items)
+        self.host_codes = np.empty(count, dtype=np.int32)
+        self.source_codes = np.empty(count, dtype=np.int16)
+        self.published = np.full(count, np.nan, dtype=np.float64)
+        for position, item in enumerate(self.items):
+            self.host_codes[position] = host_index.setdefault(item.host, len(host_index))
+            self.source_codes[position] = source_index.setdefault(item.source, len(source_index))
+            if item.published is not None:
+                self.published[position] = item.published.timestamp()
+        self.hosts = list(host_index)
+        self.sources = list(source_index)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def host_mask(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Boolean mask of items whose host satisfies `predicate`."""
+        per_host = np.fromiter((predicate(host) for host in self.hosts), dtype=bool, count=len(self.hosts))
+        return per_host[self.host_codes] if len(self.items) else np.zeros(0, dtype=bool)
+
+    def url_mask(self, predicate: Callable[[str], bool]) -> np.ndarray:
+        """Boolean mask of items whose full URL satisfies `predicate`; evaluated per item."""
+        return np.fromiter((predicate(item.url or "") for item in self.items), dtype=bool, count=len(self.items))
+
+    def source_mask(self, source: str) -> np.ndarray:
+        if source not in self.sources:
+            return np.zeros(len(self.items), dtype=bool)
+        return self.source_codes == self.sources.index(source)
+
+    def host_values(self, values: Dict[str, float], default: float = 0.0) -> np.ndarray:
+        """Per-item array looked up from a per-host mapping, e.g. historical click rates."""
+        per_host = np.array([values.get(host, default) for host in self.hosts], dtype=np.float64)
+        return per_host[self.host_codes] if len(self.items) else np.zeros(0)
+
+    def select(self, mask: np.ndarray, order: Optional[np.ndarray] = None) -> List[ContentItem]:
+        """Items where `mask` is set, in original order or sorted by `order` (descending, stable)."""
+        positions = np.flatnonzero(mask)
+        if order is not None:
+            positions = positions[np.argsort(-order[positions], kind="stable")]
+        return [self.items[position] for position in positions]
@@ -0,0 +1,75 @@
+# modules/editions.py
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from modules.categorizer import DEFAULT_SECTION_LIMITS
+from modules.content import ContentItem
+
+DEFAULT_TEMPLATE = "email_templates/newsletter.html.j2"
+DEFAULT_EDITION = "weekly"
+
+@dataclass(frozen=True)
+class Edition:
+    """
+    One newsletter variant. Each edition picks the feeds it draws from (keys of
+    collector.SOURCES plus "github" and "x"), how many items go in each section, how many
+    "This week's themes" groups to show, the template and the Mailchimp list it is sent to.
+    """
+    name: str
+    title: str
+    sources: Tuple[str, ...]
+    section_limits: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_SECTION_LIMITS))
+    theme_limit: int = 3
+    template: str = DEFAULT_TEMPLATE
+    list_id: Optional[str] = None  # Falls back to settings.MAILCHIMP_LIST_ID
+
+    def accepts(self, item: ContentItem) -> bool:
+        """Items without a feed key (e.g. from older stores) are shared by every edition."""
+        return item.feed is None or item.feed in self.sources
+
+ALL_SOURCES = ("blogs", "research", "jobs", "github", "x")
+
+EDITIONS = {
+    "weekly": Edition(name="weekly", title="AI Weekly News", sources=ALL_SOURCES),
+    "india": Edition(
+        name="india",
+        title="AI Weekly News: India Edition",
+        sources=("blogs", "jobs", "github"),
+        section_limits={"Big Story of the Week": 1, "Indian_AI_News": 4, "Top GitHub Repo": 1,
+                        "AI_Job_Spotlight": 2, "Quote_of_the_Week": 1},
+        theme_limit=2,
+    ),
+    "research": Edition(
+        name="research",
+        title="AI Weekly News: Research Edition",
+        sources=("research", "github", "blogs"),
+        section_limits={"Big Story of the Week": 1, "Top Research Paper": 3, "Top GitHub Repo": 2,
+                        "Quote_of_the_Week": 1},
+    ),
+    "jobs": Edition(
+        name="jobs",
+        title="AI Weekly News: Jobs Edition",
+        sources=("jobs", "blogs"),
+        section_limits={"Big Story of the Week": 1, "AI_Job_Spotlight": 5, "Quote_of_the_Week": 1},
+        theme_limit=0,
+    ),
+}
+
+def get_editions(names: Optional[List[str]] = None) -> List[Edition]:
+    """
+    Returns the editions to generate. By default that is the main edition plus every
+    edition with a list ID in settings.MAILCHIMP_EDITION_LISTS.
+    """
+    if names is None:
+        names = [DEFAULT_EDITION] + [name for name in settings.MAILCHIMP_EDITION_LISTS if name != DEFAULT_EDITION]
+    unknown = [name for name in names if name not in EDITIONS]
+    if unknown:
+        raise ValueError(f"Unknown edition(s): {', '.join(unknown)}. Known: {', '.join(EDITIONS)}")
+
+    editions = []
+    for name in names:
+        edition = EDITIONS[name]
+        list_id = settings.MAILCHIMP_EDITION_LISTS.get(name, edition.list_id)
+        editions.append(Edition(**{**edition.__dict__, "list_id": list_id or settings.MAILCHIMP_LIST_ID}))
+    return editions
@@ -0,0 +1,139 @@
+# modules/email_payload.py
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+from bs4 import BeautifulSoup
+from premailer import transform
+
+# Email clients ignore interaction states and motion, so these never reach the inbox
+UNSAFE_PSEUDO_CLASSES = re.compile(r":(?:hover|focus|focus-within|focus-visible|active)\b")
+UNSAFE_PROPERTIES = {"transition", "transform", "animation", "will-change", "cursor"}
+
+CLASS_ATTRIBUTE = re.compile(r'\sclass="([^"]*)"')
+CLASS_SELECTOR = re.compile(r"\.([A-Za-z_][\w-]*)")
+STYLE_BLOCK = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.S | re.I)
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)  # Keeps Outlook conditional comments
+BLOCK_TAGS = ("html|head|body|meta|title|style|link|div|p|h[1-6]|table|thead|tbody|tr|td|th|ul|ol|li|br|hr|center")
+SPACE_AROUND_BLOCK_TAGS = re.compile(rf"\s*(</?(?:{BLOCK_TAGS})\b[^>]*>)\s*", re.I)
+
+class EmailTooLarge(Exception):
+    """The rendered email is over the size budget and no more sections may be dropped."""
+
+def _split_rules(css: str) -> List[str]:
+    """Splits a stylesheet into top-level blocks, keeping nested ones (e.g. @media) whole."""
+    blocks, depth, start = [], 0, 0
+    for position, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                blocks.append(css[start:position + 1].strip())
+                start = position + 1
+    return blocks
+
+def prune_css(css: str, used_classes: Set[str]) -> str:
+    """
+    Drops rules for classes that do not appear in the document, rules that only apply on
+    hover/focus/active, and declarations email clients ignore (transition, transform, ...).
+    At-rules are kept as they are.
+    """
+    rules = []
+    for block in _split_rules(CSS_COMMENT.sub("", css)):
+        if block.startswith("@"):
+            rules.append(block)
+            continue
+        selector_text, body = block[:-1].split("{", 1)
+        selectors = [
+            selector.strip() for selector in selector_text.split(",")
+            if selector.strip()
+            and not UNSAFE_PSEUDO_CLASSES.search(selector)
+            and set(CLASS_SELECTOR.findall(selector)) <= used_classes
+        ]
+        declarations = [
+            declaration.strip() for declaration in body.split(";")
+            if declaration.strip() and declaration.split(":", 1)[0].strip().lower() not in UNSAFE_PROPERTIES
+        ]
+        if selectors and declarations:
+            rules.append(f"{','.join(selectors)}{{{';'.join(declarations)}}}")
+    return "\n".join(rules)
+
+def _used_classes(html: str) -> Set[str]:
+    return {name for value in CLASS_ATTRIBUTE.findall(html) for name in value.split()}
+
+def inline_css(html: str) -> str:
+    """Prunes the <style> blocks against the document, then inlines what is left with premailer."""
+    used = _used_classes(html)
+    pruned = STYLE_BLOCK.sub(lambda match: match.group(1) + prune_css(match.group(2), used) + match.group(3), html)
+    return transform(pruned, disable_validation=True, allow_network=False,
+                     cssutils_logging_level=logging.CRITICAL)
+
+def _strip_unused_classes(html: str) -> str:
+    """After inlining, class attributes only matter for rules left in a <style> block."""
+    referenced = {name for _, css, _ in STYLE_BLOCK.findall(html) for name in CLASS_SELECTOR.findall(css)}
+
+    def keep(match: re.Match) -> str:
+        names = [name for name in match.group(1).split() if name in referenced]
+        return f' class="{" ".join(names)}"' if names else ""
+
+    return CLASS_ATTRIBUTE.sub(keep, html)
+
+def minify_html(html: str) -> str:
+    """Removes comments, unused classes and whitespace that cannot affect rendering."""
+    html = HTML_COMMENT.sub("", html)
+    html = _strip_unused_classes(html)
+    html = STYLE_BLOCK.sub(lambda match: "" if not match.group(2).strip() else match.group(0), html)
+    html = re.sub(r"\s+", " ", html)
+    html = SPACE_AROUND_BLOCK_TAGS.sub(r"\1", html)
+    return html.strip()
+
+def html_to_text(html: str) -> str:
+    """Builds the text/plain alternative: headings, paragraphs and links written out as URLs."""
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(["head", "style", "script", "img"]):
+        element.decompose()
+    for element in soup.find_all(style=re.compile(r"display:\s*none")):
+        element.decompose()
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        if link.find(re.compile(rf"^(?:{BLOCK_TAGS})$")):
+            # Card-style links wrap a title and summary; keep them on their own lines
+            link.replace_with(f"\n{link.get_text(chr(10), strip=True)}\n{href}\n")
+            continue
+        text = link.get_text(" ", strip=True)
+        link.replace_with(f"{text} ({href})" if text and text != href else href)
+    for heading in soup.find_all(re.compile(r"^h[1-3]$")):
+        text = heading.get_text(" ", strip=True).upper()
+        heading.replace_with(f"\n\n{text}\n{'-' * len(text)}\n")
+    for block in soup.find_all(re.compile(rf"^(?:{BLOCK_TAGS})$")):
+        block.insert_before("\n")
+        block.insert_after("\n")
+
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in soup.get_text().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+@dataclass
+class RenderedEmail:
+    """Final email payload plus what the size budget cost."""
+    html: str
+    text: str
+    dropped_sections: List[str] = field(default_factory=list)
+
+    @property
+    def html_bytes(self) -> int:
+        return len(self.html.encode("utf-8"))
+
+    @property
+    def text_bytes(self) -> int:
+        return len(self.text.encode("utf-8"))
+
+def size_report(html_bytes: int, text_bytes: int, max_bytes: Optional[int], dropped: List[str]) -> str:
+    report = f"HTML {html_bytes / 1024:.1f} KB, text {text_bytes / 1024:.1f} KB"
+    if max_bytes:
+        report += f", {html_bytes / max_bytes:.0%} of the {max_bytes / 1024:.0f} KB budget"
+    if dropped:
+        report += f"; dropped to fit: {', '.join(dropped)}"
+    return report
@@ -0,0 +1,144 @@
+# modules/ingester.py
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from modules.collector import SOURCES, GITHUB_SOURCE_KEY, guarded_get, parse_feed_items, fetch_trending_github_repos
+from modules.content import ContentItem
+from modules.source_health import SourceUnavailable
+from modules.storage import (
+    FeedState, upsert_collected_items, get_feed_states, save_feed_state, save_feed_states, get_known_canonical_urls,
+)
+from modules import x_source
+
+logger = logging.getLogger(__name__)
+
+# How often each kind of source is polled. Blogs move fastest, GitHub search the slowest.
+POLL_INTERVALS = {
+    "blogs": timedelta(minutes=30),
+    "research": timedelta(hours=1),
+    "jobs": timedelta(hours=2),
+    "github": timedelta(hours=6),
+    "x": timedelta(hours=1),
+}
+
+@dataclass(frozen=True)
+class FeedSpec:
+    """One pollable source: its state key, URL (if any), SOURCES group and interval."""
+    key: str
+    feed: str
+    interval: timedelta
+    url: Optional[str] = None
+
+@dataclass
+class PollResult:
+    """
+    What one poll fetched. The cursors that come with it, `validators` (a feed response's ETag and
+    Last-Modified) and `feed_states` (per-account X cursors), are saved only once the items are stored.
+    """
+    items: List[ContentItem]
+    validators: Optional[Tuple[Optional[str], Optional[str]]] = None
+    feed_states: List[FeedState] = field(default_factory=list)
+
+def build_feed_specs() -> List[FeedSpec]:
+    """Expands SOURCES (plus GitHub, and X when a bearer token is set) into one spec per feed URL."""
+    specs = []
+    for feed, urls in SOURCES.items():
+        for url in ([urls] if isinstance(urls, str) else urls):
+            specs.append(FeedSpec(key=url, feed=feed, interval=POLL_INTERVALS.get(feed, timedelta(hours=1)), url=url))
+    specs.append(FeedSpec(key=GITHUB_SOURCE_KEY, feed="github", interval=POLL_INTERVALS["github"]))
+    if settings.X_BEARER_TOKEN:
+        specs.append(FeedSpec(key=x_source.X_SOURCE_KEY, feed="x", interval=POLL_INTERVALS["x"]))
+    return specs
+
+def poll_rss(spec: FeedSpec, state: FeedState) -> PollResult:
+    """
+    Fetches a feed with a conditional GET and returns only entries newer than the
+    feed's high-water mark, with the response's validators for the next poll.
+    """
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+
+    response = guarded_get(spec.key, spec.url, headers=headers)
+    if response.status_code == 304:
+        logger.info(f"{spec.url} not modified since last poll.")
+        return PollResult([])
+
+    items = parse_feed_items(response.content, feed=spec.feed, high_water_mark=state.high_water_mark)
+    return PollResult([item for item in items if item.url],
+                      validators=(response.headers.get("ETag"), response.headers.get("Last-Modified")))
+
+def poll_github(spec: FeedSpec, state: FeedState) -> PollResult:
+    """GitHub search has no cursor, so every result is upserted and deduplicated by URL."""
+    return PollResult(fetch_trending_github_repos(limit=30))
+
+def poll_x(spec: FeedSpec, state: FeedState) -> PollResult:
+    """
+    Polls every curated X account from its own since_id. Per-account cursors live in their own
+    feed_state rows, returned for poll_feed to save; the spec's row only carries the schedule.
+    """
+    states = {key: account for key, account in get_feed_states().items()
+              if key.startswith(x_source.ACCOUNT_KEY_PREFIX)}
+    client = x_source.XClient(settings.X_BEARER_TOKEN)
+    items = x_source.poll_accounts(client, x_source.ACCOUNTS, x_source.LISTS, states, get_known_canonical_urls)
+    return PollResult(items, feed_states=list(states.values()))
+
+def poll_feed(spec: FeedSpec, state: FeedState, now: datetime) -> int:
+    """Polls one source, stores its items and advances its state. Returns the number of new items stored."""
+    try:
+        if spec.key == GITHUB_SOURCE_KEY:
+            result = poll_github(spec, state)
+        elif spec.key == x_source.X_SOURCE_KEY:
+            result = poll_x(spec, state)
+        else:
+            result = poll_rss(spec, state)
+        stored = upsert_collected_items(result.items)
+        # Cursors only move past stored items; if the upsert fails, the next poll fetches them again
+        save_feed_states(result.feed_states)
+    except SourceUnavailable as e:
+        logger.info(f"Skipping {spec.key}: {e}")
+        stored = 0
+    except Exception as e:
+        logger.error(f"Ingestion failed for {spec.key}: {e}")
+        stored = 0
+    else:
+        # Set only now: a 304 for a feed whose entries were never stored would skip them until it changes
+        if result.validators:
+            state.etag, state.last_modified = result.validators
+        published = [item.published for item in result.items if item.published]
+        if published:
+            state.high_water_mark = max([state.high_water_mark or datetime.min] + published)
+        state.items_seen = (state.items_seen or 0) + stored
+
+    state.last_polled_at = now
+    state.next_poll_at = now + spec.interval
+    save_feed_state(state)
+    return stored
+
+def run_due_feeds(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Polls every feed whose next poll time has passed. Safe to call as often as you like."""
+    now = now or datetime.utcnow()
+    states = get_feed_states()
+    results = {}
+    for spec in build_feed_specs():
+        state = states.get(spec.key) or FeedState(feed_key=spec.key, items_seen=0)
+        if state.next_poll_at and state.next_poll_at > now:
+            continue
+        results[spec.key] = poll_feed(spec, state, now)
+
+    if results:
+        logger.info(f"Ingested {sum(results.values())} items from {len(results)} due feeds.")
+    return results
+
+def run_forever(tick_seconds: int = 60) -> None:
+    """Simple scheduler loop for a dedicated worker process."""
+    logger.info("Starting continuous ingestion...")
+    while True:
+        run_due_feeds()
+        time.sleep(tick_seconds)
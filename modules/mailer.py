@@ -1,17 +1,20 @@
 # modules/mailer.py
 import requests
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Mailchimp accepts at most 500 members per batch subscribe call
+MAILCHIMP_BATCH_SIZE = 500
+
 class MailchimpMailer:
-    def __init__(self):
+    def __init__(self, list_id: Optional[str] = None):
         self.api_key = settings.MAILCHIMP_API_KEY
         self.server_prefix = settings.MAILCHIMP_SERVER_PREFIX
-        self.list_id = settings.MAILCHIMP_LIST_ID
+        self.list_id = list_id or settings.MAILCHIMP_LIST_ID
         self.api_url = f"https://{self.server_prefix}.api.mailchimp.com/3.0"
         self.headers = {
             "Content-Type": "application/json",
@@ -56,7 +59,30 @@ class MailchimpMailer:
             return False
         except Exception:
             return False
-            
+
+    def batch_subscribe(self, emails: List[str]) -> Dict[str, int]:
+        """
+        Adds many subscribers with Mailchimp's batch list endpoint, 500 members per call.
+        Existing list members are left untouched. Returns aggregated counts.
+        """
+        totals = {"new_members": 0, "errors": 0}
+        endpoint = f"lists/{self.list_id}"
+        for start in range(0, len(emails), MAILCHIMP_BATCH_SIZE):
+            chunk = emails[start:start + MAILCHIMP_BATCH_SIZE]
+            data = {
+                "members": [{"email_address": email, "status": "subscribed"} for email in chunk],
+                "update_existing": False,
+            }
+            try:
+                response = self._make_request("POST", endpoint, data)
+                totals["new_members"] += len(response.get("new_members", []))
+                totals["errors"] += response.get("error_count", 0)
+            except Exception:
+                logger.error(f"Mailchimp batch subscribe failed for {len(chunk)} emails.")
+                totals["errors"] += len(chunk)
+        logger.info(f"Mailchimp batch sync: {totals['new_members']} new members, {totals['errors']} errors.")
+        return totals
+
     def create_campaign(self, subject: str, preview_text: str) -> Optional[str]:
         """Creates a new campaign in Mailchimp and returns its ID."""
         logger.info("Creating Mailchimp campaign...")
@@ -77,10 +103,12 @@ class MailchimpMailer:
         logger.info(f"Campaign created with ID: {campaign_id}")
         return campaign_id
 
-    def set_campaign_content(self, campaign_id: str, html_content: str) -> bool:
-        """Sets the HTML content for a given campaign."""
+    def set_campaign_content(self, campaign_id: str, html_content: str, plain_text: Optional[str] = None) -> bool:
+        """Sets the HTML content, and optionally the text/plain alternative, for a given campaign."""
         logger.info(f"Setting content for campaign {campaign_id}...")
         data = {"html": html_content}
+        if plain_text:
+            data["plain_text"] = plain_text
         endpoint = f"campaigns/{campaign_id}/content"
         try:
             self._make_request("PUT", endpoint, data)
@@ -115,6 +143,6 @@ class MailchimpMailer:
         except Exception:
             return False
 
-def get_mailer():
-    """Factory function to get a mailer instance."""
-    return MailchimpMailer()
\ No newline at end of file
+def get_mailer(list_id: Optional[str] = None):
+    """Factory function to get a mailer instance, optionally for a specific audience list."""
+    return MailchimpMailer(list_id=list_id)
\ No newline at end of file
@@ -0,0 +1,135 @@
+# modules/source_health.py
+import json
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from modules.storage import SourceHealth, get_source_health, get_all_source_health, save_source_health
+
+logger = logging.getLogger(__name__)
+
+# Number of recent attempts kept for the success rate and latency percentiles
+WINDOW = 50
+# Consecutive failures that open the circuit
+FAILURE_THRESHOLD = 3
+# An open circuit waits this long before a probe, doubling with every further failure
+BASE_COOLDOWN = timedelta(minutes=30)
+MAX_COOLDOWN = timedelta(days=1)
+
+# Timeouts are derived from observed p95 latency once there are enough samples
+DEFAULT_TIMEOUT = 15.0
+MIN_TIMEOUT = 3.0
+MAX_TIMEOUT = 15.0
+MIN_SAMPLES = 5
+TIMEOUT_MULTIPLIER = 2.0
+
+class SourceUnavailable(Exception):
+    """Raised when a source is skipped because its circuit is open."""
+
+def load_health(source_key: str) -> SourceHealth:
+    """Returns the stored health for a source, or a fresh closed record."""
+    try:
+        health = get_source_health(source_key)
+    except Exception as e:
+        logger.error(f"Could not load health for {source_key}: {e}")
+        health = None
+    return health or SourceHealth(
+        source_key=source_key, state="closed", consecutive_failures=0, recent_outcomes="", recent_latencies="[]"
+    )
+
+def _latencies(health: SourceHealth) -> List[float]:
+    return json.loads(health.recent_latencies or "[]")
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def success_rate(health: SourceHealth) -> Optional[float]:
+    outcomes = health.recent_outcomes or ""
+    if not outcomes:
+        return None
+    return outcomes.count("1") / len(outcomes)
+
+def cooldown(health: SourceHealth) -> timedelta:
+    extra_failures = max(0, (health.consecutive_failures or 0) - FAILURE_THRESHOLD)
+    return min(BASE_COOLDOWN * (2 ** min(extra_failures, 16)), MAX_COOLDOWN)
+
+def adaptive_timeout(health: SourceHealth) -> float:
+    """Timeout of TIMEOUT_MULTIPLIER x p95 latency, clamped, or the default until enough samples exist."""
+    latencies = _latencies(health)
+    if len(latencies) < MIN_SAMPLES:
+        return DEFAULT_TIMEOUT
+    p95 = percentile(latencies, 95)
+    return round(min(MAX_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_MULTIPLIER)), 2)
+
+def allow_request(health: SourceHealth, now: Optional[datetime] = None) -> bool:
+    """
+    Circuit breaker gate. Closed and half-open sources are allowed; an open source
+    moves to half-open (a single probe) once its cooldown has elapsed.
+    """
+    if health.state != "open":
+        return True
+    now = now or datetime.utcnow()
+    if health.opened_at and now >= health.opened_at + cooldown(health):
+        health.state = "half_open"
+        return True
+    return False
+
+def _push_outcome(health: SourceHealth, success: bool) -> None:
+    health.recent_outcomes = ((health.recent_outcomes or "") + ("1" if success else "0"))[-WINDOW:]
+
+def record_latency(health: SourceHealth, latency: float) -> None:
+    """Adds a latency sample without an outcome, e.g. for a 5xx answer that is about to be retried."""
+    health.recent_latencies = json.dumps((_latencies(health) + [round(latency, 3)])[-WINDOW:])
+
+def record_success(health: SourceHealth, latency: float, now: Optional[datetime] = None) -> None:
+    now = now or datetime.utcnow()
+    _push_outcome(health, True)
+    record_latency(health, latency)
+    health.consecutive_failures = 0
+    health.state = "closed"
+    health.opened_at = None
+    health.last_success_at = now
+
+def record_failure(health: SourceHealth, error: str, now: Optional[datetime] = None) -> None:
+    """Failure latencies are not recorded: they mostly measure our own timeout."""
+    now = now or datetime.utcnow()
+    _push_outcome(health, False)
+    health.consecutive_failures = (health.consecutive_failures or 0) + 1
+    health.last_failure_at = now
+    health.last_error = error[:500]
+    if health.state == "half_open" or health.consecutive_failures >= FAILURE_THRESHOLD:
+        if health.state != "open":
+            logger.warning(f"Opening circuit for {health.source_key} after {health.consecutive_failures} failures.")
+        health.state = "open"
+        health.opened_at = now
+
+def save_health(health: SourceHealth) -> None:
+    """Persists health, never letting a storage problem break collection."""
+    try:
+        save_source_health(health)
+    except Exception as e:
+        logger.error(f"Could not save health for {health.source_key}: {e}")
+
+def get_health_report() -> List[Dict]:
+    """Summarized health of every known source, for the admin dashboard."""
+    report = []
+    for health in get_all_source_health():
+        latencies = _latencies(health)
+        rate = success_rate(health)
+        report.append({
+            "source": health.source_key,
+            "state": health.state,
+            "success_rate": None if rate is None else round(rate * 100),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "timeout": adaptive_timeout(health),
+            "consecutive_failures": health.consecutive_failures,
+            "last_error": health.last_error,
+        })
+    return report
@@ -1,15 +1,51 @@
 # modules/storage.py
+import csv
 import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+import functools
+import hashlib
+import os
+import zstandard
+from sqlalchemy import create_engine, event, select, func, bindparam, false, literal_column, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, LargeBinary, UniqueConstraint
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from contextlib import contextmanager
-from typing import List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set
+import io
 
 from config import settings
+from modules.content import ContentItem
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning: WAL lets readers run during writes, NORMAL sync is safe under WAL."""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+def create_db_engine(database_url: str) -> Engine:
+    """Builds an engine tuned for the backend: pragmas for SQLite, a sized pool for Postgres."""
+    if database_url.startswith("sqlite"):
+        db_engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+        return db_engine
+    return create_engine(
+        database_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
 
 # Setup SQLAlchemy
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {})
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -21,28 +57,159 @@ class Subscriber(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     subscribed_at = Column(DateTime, default=datetime.datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    __table_args__ = (Index("ix_subscribers_is_active_subscribed_at", "is_active", "subscribed_at"),)
 
 class Issue(Base):
     __tablename__ = "issues"
     id = Column(Integer, primary_key=True, index=True)
     subject = Column(String, nullable=False)
-    content_html = Column(Text, nullable=False)
+    body_hash = Column(String, ForeignKey("issue_bodies.content_hash"), nullable=True)  # The HTML, see IssueBody
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     sent_at = Column(DateTime, nullable=True)
     mailchimp_campaign_id = Column(String, nullable=True)
+    edition = Column(String, nullable=False, default="weekly", server_default="weekly")
+    tracking_key = Column(String, nullable=True)  # Ties open-pixel hits and tracked links to this issue
+    is_dry_run = Column(Boolean, nullable=False, default=False, server_default=false())
     items = relationship("NewsletterItem", back_populates="issue")
+    __table_args__ = (
+        Index("ix_issues_created_at", "created_at"),
+        Index("ix_issues_edition_created_at", "edition", "created_at"),
+        Index("ix_issues_tracking_key", "tracking_key"),
+        Index("ix_issues_body_hash", "body_hash"),
+    )
+
+class IssueBody(Base):
+    """
+    An issue's HTML as a zstd frame, keyed by the SHA-256 of the HTML, so identical renders
+    (repeated dry runs, editions that came out the same) are stored once.
+    """
+    __tablename__ = "issue_bodies"
+    content_hash = Column(String, primary_key=True)
+    body = Column(LargeBinary, nullable=False)
+    # Frames made with a dictionary can only be decompressed here, never sent to a browser as they are
+    dictionary_id = Column(Integer, ForeignKey("compression_dictionaries.id"), nullable=True)
+    size = Column(Integer, nullable=False)  # Uncompressed bytes
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class CompressionDictionary(Base):
+    """A zstd dictionary trained on past issues by tasks/train_issue_dictionary.py. `id` is zstd's own dictionary ID."""
+    __tablename__ = "compression_dictionaries"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
 class NewsletterItem(Base):
     __tablename__ = "newsletter_items"
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, ForeignKey("issues.id"))
     title = Column(String, nullable=False)
-    url = Column(String, unique=True, nullable=False)
+    url = Column(String, nullable=False)
     summary = Column(Text, nullable=False)
     category = Column(String, nullable=False) # e.g., Big Story, Research, Repo
     issue = relationship("Issue", back_populates="items")
+    __table_args__ = (
+        Index("ix_newsletter_items_issue_id_category", "issue_id", "category"),
+        UniqueConstraint("issue_id", "url", name="uq_newsletter_items_issue_url"),
+    )
+
+class CollectedItem(Base):
+    """An item seen by the ingester, keyed by its canonical URL."""
+    __tablename__ = "collected_items"
+    id = Column(Integer, primary_key=True, index=True)
+    canonical_url = Column(String, unique=True, nullable=False)
+    url = Column(String, nullable=False)
+    feed = Column(String, nullable=True)  # Key in SOURCES, e.g. blogs, research, jobs, github
+    source = Column(String, nullable=False)  # rss, github, ...
+    title = Column(String, nullable=False)
+    summary = Column(Text, nullable=False, default="")
+    company = Column(String, nullable=True)
+    published = Column(DateTime, nullable=False)  # Falls back to first-seen time when the feed has no date
+    first_seen_at = Column(DateTime, default=datetime.datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.datetime.utcnow)
+    __table_args__ = (Index("ix_collected_items_published", "published"),)
+
+class FeedState(Base):
+    """
+    Per-feed polling cursor: high-water mark, HTTP validators and schedule. X accounts also
+    keep the newest post ID seen (since_id) and their user ID, so neither is looked up again.
+    """
+    __tablename__ = "feed_state"
+    feed_key = Column(String, primary_key=True)
+    high_water_mark = Column(DateTime, nullable=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    last_polled_at = Column(DateTime, nullable=True)
+    next_poll_at = Column(DateTime, nullable=True)
+    items_seen = Column(Integer, default=0)
+    since_id = Column(String, nullable=True)
+    external_id = Column(String, nullable=True)
+
+class SourceHealth(Base):
+    """Rolling health of one upstream source, used by the circuit breaker in modules/source_health.py."""
+    __tablename__ = "source_health"
+    source_key = Column(String, primary_key=True)
+    state = Column(String, nullable=False, default="closed")  # closed, open or half_open
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    recent_outcomes = Column(String, nullable=False, default="")  # Most recent last, "1" = success
+    recent_latencies = Column(Text, nullable=False, default="[]")  # JSON list of seconds, most recent last
+    opened_at = Column(DateTime, nullable=True)
+    last_success_at = Column(DateTime, nullable=True)
+    last_failure_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+
+class PipelineCheckpoint(Base):
+    """Output of one pipeline stage for one run, stored as JSON so a failed run can resume."""
+    __tablename__ = "pipeline_checkpoints"
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String, nullable=False)
+    stage = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    __table_args__ = (UniqueConstraint("run_id", "stage", name="uq_pipeline_checkpoints_run_stage"),)
+
+class TrackedLink(Base):
+    """A rewritten newsletter link: /r/{item_id}/... redirects to `url`. Clicks are flushed in batches."""
+    __tablename__ = "tracked_links"
+    item_id = Column(String, primary_key=True)  # Hash of the canonical URL, see modules/tracking.py
+    url = Column(String, nullable=False)
+    host = Column(String, nullable=False)
+    tracking_key = Column(String, nullable=False)  # Issue the link was first sent in
+    clicks = Column(Integer, nullable=False, default=0, server_default="0")
+    last_clicked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    __table_args__ = (
+        Index("ix_tracked_links_tracking_key", "tracking_key"),
+        Index("ix_tracked_links_host", "host"),
+    )
+
+class IssueOpen(Base):
+    """Open-pixel hits per issue. Keyed by tracking key because opens can arrive before the issue row is saved."""
+    __tablename__ = "issue_opens"
+    tracking_key = Column(String, primary_key=True)
+    opens = Column(Integer, nullable=False, default=0)
+    last_opened_at = Column(DateTime, nullable=True)
+
+class Thumbnail(Base):
+    """Which cached image (see modules/thumbnails.py) an item's card shows. Several items may share a file."""
+    __tablename__ = "thumbnails"
+    canonical_url = Column(String, primary_key=True)
+    source_url = Column(String, nullable=False)  # The og:image/preview URL, or "generated"
+    filename = Column(String, nullable=False)  # Content hash of the encoded image, plus extension
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    __table_args__ = (Index("ix_thumbnails_filename", "filename"),)
 
-Base.metadata.create_all(bind=engine)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+def init_db(bind: Optional[Engine] = None) -> None:
+    """Brings the schema up to date by running all pending migrations."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    with (bind or engine).begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
 
 @contextmanager
 def get_db():
@@ -53,13 +220,6 @@ def get_db():
     finally:
         db.close()
 
-# --- New helper function ---
-def get_existing_urls(db_session) -> Set[str]:
-    """Fetches a set of all URLs currently in the newsletter_items table."""
-    urls = db_session.query(NewsletterItem.url).all()
-    return {url for (url,) in urls}
-
-
 # --- Database CRUD Functions ---
 
 def add_subscriber(email: str) -> Optional[Subscriber]:
@@ -91,48 +251,430 @@ def unsubscribe_subscriber(email: str) -> bool:
             return True
         return False
 
-# --- Improved save_issue function ---
-def save_issue(subject: str, content_html: str, items: list, mailchimp_id: Optional[str] = None) -> Issue:
+# --- Bulk subscriber operations (modules/subscriber_import.py) ---
+
+def bulk_insert_subscribers(emails: List[str], bind: Optional[Engine] = None) -> int:
+    """
+    Inserts a batch of already-validated emails in one statement, skipping ones that exist.
+    Uses COPY into a temp table on Postgres and a multi-row INSERT ... ON CONFLICT elsewhere.
+    Returns the number of rows actually inserted.
+    """
+    if not emails:
+        return 0
+    bind = bind or engine
+    now = datetime.datetime.utcnow()
+
+    if bind.dialect.name == "postgresql":
+        raw = bind.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS subscriber_import (email text) ON COMMIT DELETE ROWS")
+                # CSV, not the text format: quoted local parts may contain backslashes, which text COPY unescapes
+                data = io.StringIO()
+                csv.writer(data, lineterminator="\n").writerows([email] for email in emails)
+                data.seek(0)
+                cursor.copy_expert("COPY subscriber_import (email) FROM STDIN WITH (FORMAT csv)", data)
+                cursor.execute(
+                    "INSERT INTO subscribers (email, subscribed_at, is_active) "
+                    "SELECT email, %s, true FROM subscriber_import ON CONFLICT (email) DO NOTHING",
+                    (now,),
+                )
+                inserted = cursor.rowcount
+            raw.commit()
+        finally:
+            raw.close()
+        return inserted
+
+    # A single-row statement run with executemany compiles once and is cached, unlike a
+    # multi-VALUES insert whose SQL changes with every batch size
+    stmt = _dialect_insert(Subscriber.__table__).on_conflict_do_nothing(index_elements=["email"])
+    rows = [{"email": email, "subscribed_at": now, "is_active": True} for email in emails]
+    with bind.begin() as connection:
+        return connection.execute(stmt, rows).rowcount
+
+def get_max_subscriber_id(bind: Optional[Engine] = None) -> int:
+    with (bind or engine).connect() as connection:
+        return connection.execute(select(func.max(Subscriber.id))).scalar() or 0
+
+def iter_subscribers(after_id: int = 0, active_only: bool = True, page_size: int = 5000,
+                     bind: Optional[Engine] = None) -> Iterator[tuple]:
+    """
+    Yields (id, email, subscribed_at, is_active) rows in id order using keyset pagination,
+    so memory stays flat no matter how many subscribers there are.
+    """
+    bind = bind or engine
+    last_id = after_id
+    while True:
+        query = select(Subscriber.id, Subscriber.email, Subscriber.subscribed_at, Subscriber.is_active) \
+            .where(Subscriber.id > last_id).order_by(Subscriber.id).limit(page_size)
+        if active_only:
+            query = query.where(Subscriber.is_active == True)
+        with bind.connect() as connection:
+            rows = connection.execute(query).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+# --- Issues. The HTML is stored compressed and deduplicated in issue_bodies. ---
+
+# Issues are written once and read many times, so they are compressed hard
+ISSUE_ZSTD_LEVEL = 19
+
+@functools.lru_cache(maxsize=8)
+def _zstd_dictionary(dictionary_id: int) -> zstandard.ZstdCompressionDict:
+    """Dictionaries never change once stored, so each is loaded once per process."""
+    with get_db() as db:
+        data = db.execute(select(CompressionDictionary.data).where(CompressionDictionary.id == dictionary_id)).scalar_one()
+    return zstandard.ZstdCompressionDict(data)
+
+def _newest_dictionary_id(db) -> Optional[int]:
+    query = select(CompressionDictionary.id).order_by(CompressionDictionary.created_at.desc()).limit(1)
+    return db.execute(query).scalar()
+
+def compress_issue_html(html: str, dictionary_id: Optional[int] = None) -> bytes:
+    dictionary = _zstd_dictionary(dictionary_id) if dictionary_id is not None else None
+    return zstandard.ZstdCompressor(level=ISSUE_ZSTD_LEVEL, dict_data=dictionary, write_checksum=True).compress(html.encode("utf-8"))
+
+def decompress_issue_body(body: IssueBody) -> str:
+    dictionary = _zstd_dictionary(body.dictionary_id) if body.dictionary_id is not None else None
+    return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(body.body).decode("utf-8")
+
+def _store_issue_body(db, html: str) -> str:
+    """Stores the HTML unless an identical one already is, and returns its hash."""
+    content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    if db.get(IssueBody, content_hash) is None:
+        dictionary_id = _newest_dictionary_id(db) if settings.ISSUE_ZSTD_DICTIONARY else None
+        stmt = _dialect_insert(IssueBody.__table__).values(
+            content_hash=content_hash, body=compress_issue_html(html, dictionary_id), dictionary_id=dictionary_id,
+            size=len(html.encode("utf-8")), created_at=datetime.datetime.utcnow(),
+        )
+        db.execute(stmt.on_conflict_do_nothing(index_elements=["content_hash"]))
+    return content_hash
+
+def save_issue(subject: str, content_html: str, items: List[ContentItem], mailchimp_id: Optional[str] = None,
+               edition: str = "weekly", categories: Optional[Dict[str, str]] = None,
+               tracking_key: Optional[str] = None, is_dry_run: bool = False) -> Issue:
+    """
+    Saves an issue and its items. `categories` maps an item URL to the section it appeared in.
+    Dry runs are marked, so prune_dry_run_issues() can remove them later.
+    """
+    categories = categories or {}
     with get_db() as db:
         # First, create and save the main issue entry
         new_issue = Issue(
             subject=subject,
-            content_html=content_html,
+            body_hash=_store_issue_body(db, content_html),
             mailchimp_campaign_id=mailchimp_id,
+            edition=edition,
+            tracking_key=tracking_key,
+            is_dry_run=is_dry_run,
             sent_at=datetime.datetime.utcnow() if mailchimp_id else None
         )
         db.add(new_issue)
         db.flush()  # This assigns an ID to new_issue without committing the transaction
 
-        # Get a set of all URLs that are already in the database
-        existing_urls = get_existing_urls(db)
-
-        # Now, only add items with new URLs
-        for item_data in items:
-            # Skip items that are not dictionaries or are empty
-            if not isinstance(item_data, dict) or not item_data:
+        # Every issue records its own items; a URL is only stored once per issue
+        added_urls = set()
+        for item in items:
+            if not item.url or item.url in added_urls:
                 continue
-
-            item_url = item_data.get('url', '#')
-            
-            # If the URL is already in the database, skip this item
-            if item_url in existing_urls:
-                continue
-
-            # Gracefully get data, providing default values if keys are missing
-            db_item = NewsletterItem(
+            db.add(NewsletterItem(
                 issue_id=new_issue.id,
-                title=item_data.get('title', item_data.get('name', 'Untitled')),
-                url=item_url,
-                summary=item_data.get('summary', item_data.get('description', '')),
-                category=item_data.get('category', 'General')
-            )
-            db.add(db_item)
-        
+                title=item.title or "Untitled",
+                url=item.url,
+                summary=item.summary,
+                category=categories.get(item.url, "General"),
+            ))
+            added_urls.add(item.url)
+
         db.commit()
         db.refresh(new_issue)
         return new_issue
 
-def get_last_issue() -> Optional[Issue]:
+def get_last_issue_body(edition: Optional[str] = None) -> Optional[IssueBody]:
+    """The compressed HTML of the newest sent issue (dry runs are previews), without loading the issue itself."""
+    query = select(IssueBody).join(Issue, Issue.body_hash == IssueBody.content_hash).where(Issue.is_dry_run == False)
+    if edition is not None:
+        query = query.where(Issue.edition == edition)
+    with get_db() as db:
+        return db.execute(query.order_by(Issue.created_at.desc()).limit(1)).scalar()
+
+def prune_dry_run_issues(keep: int) -> int:
+    """
+    Deletes all but the newest `keep` dry runs of each edition, with their items, then every
+    body no issue uses.
+    Returns the number of issues deleted.
+    """
+    newest_first = select(Issue.id, Issue.edition).where(Issue.is_dry_run == True).order_by(Issue.created_at.desc())
+    with get_db() as db:
+        seen: Dict[str, int] = {}
+        stale = []
+        for issue_id, edition in db.execute(newest_first).all():
+            seen[edition] = seen.get(edition, 0) + 1
+            if seen[edition] > keep:
+                stale.append(issue_id)
+        for offset in range(0, len(stale), UPSERT_BATCH_SIZE):
+            batch = stale[offset:offset + UPSERT_BATCH_SIZE]
+            db.execute(NewsletterItem.__table__.delete().where(NewsletterItem.issue_id.in_(batch)))
+            db.execute(Issue.__table__.delete().where(Issue.id.in_(batch)))
+        used = select(Issue.body_hash).where(Issue.body_hash.is_not(None))
+        db.execute(IssueBody.__table__.delete().where(IssueBody.content_hash.not_in(used)))
+        db.commit()
+    return len(stale)
+
+def get_issue_html_samples(limit: int) -> List[bytes]:
+    """The HTML of the newest `limit` distinct sent issues, as training samples for a dictionary."""
+    query = select(IssueBody).join(Issue, Issue.body_hash == IssueBody.content_hash) \
+        .where(Issue.is_dry_run == False).order_by(Issue.created_at.desc()).limit(limit)
+    with get_db() as db:
+        bodies = {body.content_hash: body for body in db.execute(query).scalars()}
+        return [decompress_issue_body(body).encode("utf-8") for body in bodies.values()]
+
+def save_compression_dictionary(dictionary: zstandard.ZstdCompressionDict) -> int:
+    """Stores a trained dictionary; with ISSUE_ZSTD_DICTIONARY on, new issues are compressed with it."""
+    with get_db() as db:
+        db.merge(CompressionDictionary(id=dictionary.dict_id(), data=dictionary.as_bytes(),
+                                       created_at=datetime.datetime.utcnow()))
+        db.commit()
+    return dictionary.dict_id()
+
+# --- Collected item store (filled by modules/ingester.py) ---
+
+# Keeps multi-row inserts under SQLite's bound-parameter limit
+UPSERT_BATCH_SIZE = 500
+
+def _dialect_insert(table):
+    """Returns an INSERT construct that supports ON CONFLICT for the active database."""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+def upsert_collected_items(items: List[ContentItem]) -> int:
+    """
+    Inserts new items and refreshes title/summary of ones already stored, keyed by canonical URL.
+    The original `published` and `first_seen_at` are kept on conflict. Returns the number of
+    items inserted; refreshed ones are not counted.
+    """
+    now = datetime.datetime.utcnow()
+    rows = {}
+    for item in items:
+        if not item.url:
+            continue
+        rows[item.canonical_url] = {
+            "canonical_url": item.canonical_url,
+            "url": item.url,
+            "feed": item.feed,
+            "source": item.source,
+            "title": item.title or "Untitled",
+            "summary": item.summary or "",
+            "company": item.company,
+            "published": item.published or now,
+            "first_seen_at": now,
+            "last_seen_at": now,
+        }
+    if not rows:
+        return 0
+
+    values = list(rows.values())
+    postgres = engine.dialect.name == "postgresql"
+    inserted = 0
+    with get_db() as db:
+        for start in range(0, len(values), UPSERT_BATCH_SIZE):
+            batch = values[start:start + UPSERT_BATCH_SIZE]
+            stmt = _dialect_insert(CollectedItem.__table__).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["canonical_url"],
+                set_={
+                    "title": stmt.excluded.title,
+                    "summary": stmt.excluded.summary,
+                    "last_seen_at": stmt.excluded.last_seen_at,
+                },
+            )
+            if postgres:
+                # xmax is 0 on a freshly inserted row and set on one the conflict clause updated
+                inserted += sum(db.execute(stmt.returning(literal_column("(xmax = 0)"))).scalars())
+            else:
+                existing = select(func.count()).select_from(CollectedItem) \
+                    .where(CollectedItem.canonical_url.in_([row["canonical_url"] for row in batch]))
+                inserted += len(batch) - db.execute(existing).scalar()
+                db.execute(stmt)
+        db.commit()
+    return inserted
+
+def get_collected_items(since: datetime.datetime, until: Optional[datetime.datetime] = None) -> List[ContentItem]:
+    """Returns stored items published in [since, until), newest first."""
+    query = select(
+        CollectedItem.source, CollectedItem.feed, CollectedItem.title, CollectedItem.url, CollectedItem.summary,
+        CollectedItem.published, CollectedItem.company, CollectedItem.canonical_url,
+    ).where(CollectedItem.published >= since)
+    if until is not None:
+        query = query.where(CollectedItem.published < until)
+    with get_db() as db:
+        rows = db.execute(query.order_by(CollectedItem.published.desc())).all()
+    return [
+        ContentItem(source=row.source, feed=row.feed, title=row.title, url=row.url, summary=row.summary or "",
+                    published=row.published, company=row.company, canonical_url=row.canonical_url)
+        for row in rows
+    ]
+
+def get_feed_states() -> Dict[str, FeedState]:
+    with get_db() as db:
+        return {state.feed_key: state for state in db.query(FeedState).all()}
+
+def save_feed_state(state: FeedState) -> None:
+    save_feed_states([state])
+
+def save_feed_states(states: List[FeedState]) -> None:
+    with get_db() as db:
+        for state in states:
+            db.merge(state)
+        db.commit()
+
+def get_known_canonical_urls(canonical_urls: List[str]) -> Set[str]:
+    """The subset of `canonical_urls` already in the collected item store."""
+    known = set()
+    with get_db() as db:
+        for offset in range(0, len(canonical_urls), UPSERT_BATCH_SIZE):
+            batch = canonical_urls[offset:offset + UPSERT_BATCH_SIZE]
+            known.update(db.scalars(select(CollectedItem.canonical_url).where(CollectedItem.canonical_url.in_(batch))))
+    return known
+
+def get_checkpoint(run_id: str, stage: str) -> Optional[str]:
+    with get_db() as db:
+        row = db.query(PipelineCheckpoint.payload).filter(
+            PipelineCheckpoint.run_id == run_id, PipelineCheckpoint.stage == stage
+        ).first()
+        return row[0] if row else None
+
+def save_checkpoint(run_id: str, stage: str, payload: str) -> None:
+    stmt = _dialect_insert(PipelineCheckpoint.__table__).values(
+        run_id=run_id, stage=stage, payload=payload, created_at=datetime.datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["run_id", "stage"], set_={"payload": stmt.excluded.payload, "created_at": stmt.excluded.created_at}
+    )
+    with get_db() as db:
+        db.execute(stmt)
+        db.commit()
+
+def get_source_health(source_key: str) -> Optional[SourceHealth]:
+    with get_db() as db:
+        return db.get(SourceHealth, source_key)
+
+def get_all_source_health() -> List[SourceHealth]:
     with get_db() as db:
-        return db.query(Issue).order_by(Issue.created_at.desc()).first()
\ No newline at end of file
+        return db.query(SourceHealth).order_by(SourceHealth.source_key).all()
+
+def save_source_health(health: SourceHealth) -> None:
+    with get_db() as db:
+        db.merge(health)
+        db.commit()
+
+# --- Engagement tracking (buffered by modules/tracking.py) ---
+
+def save_tracked_links(links: List[Dict]) -> None:
+    """Registers redirect targets. A link already sent in an earlier issue keeps its counts and first issue."""
+    if not links:
+        return
+    with get_db() as db:
+        for start in range(0, len(links), UPSERT_BATCH_SIZE):
+            stmt = _dialect_insert(TrackedLink.__table__).values(links[start:start + UPSERT_BATCH_SIZE])
+            db.execute(stmt.on_conflict_do_nothing(index_elements=["item_id"]))
+        db.commit()
+
+def get_tracked_link_url(item_id: str) -> Optional[str]:
+    with get_db() as db:
+        return db.execute(select(TrackedLink.url).where(TrackedLink.item_id == item_id)).scalar()
+
+def get_tracked_links(tracking_keys: List[str]) -> Dict[str, str]:
+    """Maps item_id -> target URL for every link sent in the given issues."""
+    if not tracking_keys:
+        return {}
+    query = select(TrackedLink.item_id, TrackedLink.url).where(TrackedLink.tracking_key.in_(tracking_keys))
+    with get_db() as db:
+        return dict(db.execute(query).all())
+
+def get_recent_tracking_keys(limit: int = 10) -> List[str]:
+    query = select(Issue.tracking_key).where(Issue.tracking_key.is_not(None)) \
+        .order_by(Issue.created_at.desc()).limit(limit)
+    with get_db() as db:
+        return list(dict.fromkeys(db.execute(query).scalars()))
+
+def get_tracking_keys() -> Set[str]:
+    """Every tracking key an issue was sent or registered links with."""
+    query = select(Issue.tracking_key).where(Issue.tracking_key.is_not(None)).union(select(TrackedLink.tracking_key))
+    with get_db() as db:
+        return set(db.execute(query).scalars())
+
+def is_tracking_key_known(tracking_key: str) -> bool:
+    issue = select(Issue.id).where(Issue.tracking_key == tracking_key).limit(1)
+    link = select(TrackedLink.item_id).where(TrackedLink.tracking_key == tracking_key).limit(1)
+    with get_db() as db:
+        return db.execute(issue).first() is not None or db.execute(link).first() is not None
+
+def increment_link_clicks(counts: Dict[str, int], at: datetime.datetime) -> None:
+    """Adds buffered click counts in one executemany UPDATE."""
+    if not counts:
+        return
+    stmt = TrackedLink.__table__.update() \
+        .where(TrackedLink.item_id == bindparam("b_item_id")) \
+        .values(clicks=TrackedLink.clicks + bindparam("b_clicks"), last_clicked_at=at)
+    with engine.begin() as connection:
+        connection.execute(stmt, [{"b_item_id": item_id, "b_clicks": n} for item_id, n in counts.items()])
+
+def increment_issue_opens(counts: Dict[str, int], at: datetime.datetime) -> None:
+    """Adds buffered open counts, creating rows for issues seen for the first time."""
+    if not counts:
+        return
+    stmt = _dialect_insert(IssueOpen.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["tracking_key"],
+        set_={"opens": IssueOpen.__table__.c.opens + stmt.excluded.opens, "last_opened_at": stmt.excluded.last_opened_at},
+    )
+    with engine.begin() as connection:
+        connection.execute(stmt, [{"tracking_key": key, "opens": n, "last_opened_at": at} for key, n in counts.items()])
+
+def get_host_click_rates(since: datetime.datetime) -> Dict[str, float]:
+    """Average clicks per link for each host, over links sent since `since`."""
+    query = select(TrackedLink.host, func.avg(TrackedLink.clicks)) \
+        .where(TrackedLink.created_at >= since).group_by(TrackedLink.host)
+    with get_db() as db:
+        return {host: float(rate) for host, rate in db.execute(query).all()}
+
+# --- Thumbnails (files cached by modules/thumbnails.py) ---
+
+def get_thumbnails(canonical_urls: List[str]) -> Dict[str, str]:
+    """Maps canonical URL -> thumbnail filename for the items that have one."""
+    thumbnails = {}
+    with get_db() as db:
+        for offset in range(0, len(canonical_urls), UPSERT_BATCH_SIZE):
+            batch = canonical_urls[offset:offset + UPSERT_BATCH_SIZE]
+            query = select(Thumbnail.canonical_url, Thumbnail.filename).where(Thumbnail.canonical_url.in_(batch))
+            thumbnails.update(db.execute(query).all())
+    return thumbnails
+
+def save_thumbnails(rows: List[Dict]) -> None:
+    """Stores {canonical_url, source_url, filename} rows; an item that already had a thumbnail gets the new file."""
+    if not rows:
+        return
+    now = datetime.datetime.utcnow()
+    values = [{**row, "created_at": now} for row in rows]
+    with get_db() as db:
+        for start in range(0, len(values), UPSERT_BATCH_SIZE):
+            stmt = _dialect_insert(Thumbnail.__table__).values(values[start:start + UPSERT_BATCH_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["canonical_url"],
+                set_={"source_url": stmt.excluded.source_url, "filename": stmt.excluded.filename,
+                      "created_at": stmt.excluded.created_at},
+            )
+            db.execute(stmt)
+        db.commit()
+
+def delete_thumbnails(filenames: List[str]) -> None:
+    """Forgets every item pointing at evicted files, so they are fetched again when next needed."""
+    with get_db() as db:
+        for offset in range(0, len(filenames), UPSERT_BATCH_SIZE):
+            batch = filenames[offset:offset + UPSERT_BATCH_SIZE]
+            db.execute(Thumbnail.__table__.delete().where(Thumbnail.filename.in_(batch)))
+        db.commit()
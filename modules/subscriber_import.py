@@ -0,0 +1,137 @@
+# modules/subscriber_import.py
+import csv
+import io
+import logging
+import re
+import time
+from dataclasses import dataclass, asdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from email_validator import validate_email, EmailNotValidError
+from sqlalchemy.engine import Engine
+
+from modules.storage import bulk_insert_subscribers, iter_subscribers
+
+logger = logging.getLogger(__name__)
+
+# Rows validated and inserted per round trip; memory use is bounded by this, not by file size
+DEFAULT_CHUNK_SIZE = 5000
+
+@dataclass
+class ImportReport:
+    """Counts for one bulk import run."""
+    total: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), "rows_per_second": round(self.rows_per_second)}
+
+def iter_csv_emails(stream: TextIO) -> Iterator[str]:
+    """
+    Streams raw email values from a CSV. Uses the column named "email" when the first
+    row is a header, otherwise the first column. Blank rows are skipped.
+    """
+    reader = csv.reader(stream)
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [cell.strip().lower() for cell in first]
+    if "email" in header:
+        column = header.index("email")
+    else:
+        column = 0
+        if first and first[0].strip():
+            yield first[0].strip()
+    for row in reader:
+        if len(row) > column and row[column].strip():
+            yield row[column].strip()
+
+# Plain ASCII dot-atom addresses cover nearly every real list. They are accepted with a regex;
+# anything else (IDN, quoted local parts, odd lengths) goes through the full email_validator check.
+SIMPLE_EMAIL = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}"
+)
+
+def normalize_email(raw: str) -> Optional[str]:
+    """Returns the normalized address, or None when it is not a valid email. No DNS lookups."""
+    if len(raw) <= 254 and SIMPLE_EMAIL.fullmatch(raw):
+        local, domain = raw.rsplit("@", 1)
+        if len(local) <= 64:
+            return f"{local}@{domain.lower()}"
+    try:
+        return validate_email(raw, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return None
+
+def _chunks(values: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def import_subscribers(stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       bind: Optional[Engine] = None) -> ImportReport:
+    """Validates and inserts every email in a CSV stream, one chunk at a time."""
+    report = ImportReport()
+    start = time.perf_counter()
+    for chunk in _chunks(iter_csv_emails(stream), chunk_size):
+        report.total += len(chunk)
+        valid = []
+        seen = set()
+        for raw in chunk:
+            email = normalize_email(raw)
+            if email is None:
+                report.invalid += 1
+            elif email in seen:
+                report.duplicates += 1
+            else:
+                seen.add(email)
+                valid.append(email)
+        inserted = bulk_insert_subscribers(valid, bind=bind)
+        report.inserted += inserted
+        report.duplicates += len(valid) - inserted
+    report.elapsed = time.perf_counter() - start
+    logger.info(
+        f"Imported {report.total} rows: {report.inserted} inserted, {report.duplicates} duplicates, "
+        f"{report.invalid} invalid ({report.rows_per_second:,.0f} rows/s)."
+    )
+    return report
+
+def sync_new_subscribers_to_mailchimp(after_id: int) -> Dict[str, int]:
+    """Pushes every active subscriber with an id above `after_id` to Mailchimp in batches."""
+    from modules.mailer import get_mailer, MAILCHIMP_BATCH_SIZE
+
+    mailer = get_mailer()
+    totals = {"new_members": 0, "errors": 0}
+    batch = []
+    for row in iter_subscribers(after_id=after_id):
+        batch.append(row.email)
+        if len(batch) == MAILCHIMP_BATCH_SIZE:
+            for key, value in mailer.batch_subscribe(batch).items():
+                totals[key] += value
+            batch = []
+    if batch:
+        for key, value in mailer.batch_subscribe(batch).items():
+            totals[key] += value
+    return totals
+
+def export_subscribers_csv(active_only: bool = True) -> Iterator[str]:
+    """Yields the subscriber list as CSV text, a page at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["email", "subscribed_at", "is_active"])
+    for count, row in enumerate(iter_subscribers(active_only=active_only), start=1):
+        writer.writerow([row.email, row.subscribed_at.isoformat() if row.subscribed_at else "", row.is_active])
+        if count % 1000 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
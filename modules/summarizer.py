@@ -6,6 +6,7 @@ from sumy.summarizers.text_rank import TextRankSummarizer
 import logging
 
 from config import settings
+from modules.content import ContentItem
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,12 +53,12 @@ def summarize_with_fallback(text: str) -> str:
     summary = " ".join([str(sentence) for sentence in summary_sentences])
     return summary
 
-def get_summary(item: dict) -> str:
+def get_summary(item: ContentItem) -> str:
     """
     Gets a summary for a content item, trying Gemini first and then falling back.
     """
-    title = item.get('title', 'Untitled')
-    content = item.get('summary', '') # Use RSS summary as a base
+    title = item.title or 'Untitled'
+    content = item.summary # Use RSS summary as a base
     
     # Try Gemini first
     if GEMINI_AVAILABLE:
@@ -74,9 +75,11 @@ def get_summary(item: dict) -> str:
 
 if __name__ == '__main__':
     # For testing the summarizer module directly
-    sample_item = {
-        'title': 'Attention Is All You Need',
-        'summary': 'The dominant sequence transduction models are based on complex recurrent or convolutional neural networks that include an encoder and a decoder. The best performing models also connect the encoder and decoder through an attention mechanism. We propose a new simple network architecture, the Transformer, based solely on attention mechanisms, dispensing with recurrence and convolutions entirely. Experiments on two machine translation tasks show these models to be superior in quality while being more parallelizable and requiring significantly less time to train.'
-    }
+    sample_item = ContentItem(
+        source='rss',
+        url='https://arxiv.org/abs/1706.03762',
+        title='Attention Is All You Need',
+        summary='The dominant sequence transduction models are based on complex recurrent or convolutional neural networks that include an encoder and a decoder. The best performing models also connect the encoder and decoder through an attention mechanism. We propose a new simple network architecture, the Transformer, based solely on attention mechanisms, dispensing with recurrence and convolutions entirely. Experiments on two machine translation tasks show these models to be superior in quality while being more parallelizable and requiring significantly less time to train.'
+    )
     summary = get_summary(sample_item)
     print(f"Generated Summary:\n{summary}")
\ No newline at end of file
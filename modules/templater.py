@@ -1,33 +1,99 @@
 # modules/templater.py
 import jinja2
-from premailer import transform
-from typing import Dict
+from typing import Dict, List, Optional
 import datetime
+import logging
 
-def render_newsletter(content: Dict) -> str:
+from config import settings
+from modules.clustering import THEMES_SECTION, Theme
+from modules.content import ContentItem
+from modules.email_payload import EmailTooLarge, RenderedEmail, inline_css, minify_html, html_to_text
+from modules.tracking import tracked_url, open_pixel_url
+
+logger = logging.getLogger(__name__)
+
+# When an email is over budget, whole sections are removed in this order. The Big Story always stays.
+SECTION_DROP_ORDER = ("Quote_of_the_Week", THEMES_SECTION, "Indian_AI_News", "AI_Job_Spotlight", "Top GitHub Repo", "Top Research Paper")
+
+# Sections laid out as full cards, which show a thumbnail; list sections and the quote stay text-only
+CARD_SECTIONS = ("Big Story of the Week", "Top Research Paper", "Top GitHub Repo")
+
+def card_items(content: Dict[str, List[ContentItem]], themes: Optional[List[Theme]] = None) -> List[ContentItem]:
+    """The items rendered as cards: every item of CARD_SECTIONS and each theme's representative."""
+    items = [item for section in CARD_SECTIONS for item in content.get(section, [])]
+    return items + [theme.representative for theme in themes or []]
+
+def render_newsletter(content: Dict[str, List[ContentItem]], template_name: str = "email_templates/newsletter.html.j2",
+                      edition_title: str = "AI Weekly News", tracking_key: Optional[str] = None,
+                      themes: Optional[List[Theme]] = None, thumbnails: Optional[Dict[str, str]] = None) -> str:
     """
-    Renders the newsletter HTML from a Jinja2 template with inlined CSS.
+    Renders the newsletter HTML from a Jinja2 template with inlined, pruned CSS, minified.
     
     Args:
-        content: A dictionary with keys matching the newsletter sections.
+        content: Items per newsletter section, as returned by select_and_categorize.
+        template_name: Template path under ./templates, per edition.
+        edition_title: Heading shown at the top of the email.
+        tracking_key: Issue key for click/open tracking. Links are rewritten only when
+            it is given and tracking is enabled (settings.PUBLIC_BASE_URL).
+        themes: Groups of related items for the "This week's themes" section.
+        thumbnails: Card image URL per canonical URL (see modules/thumbnails.py). Cards
+            without one stay text-only.
     
     Returns:
         The full HTML string of the newsletter.
     """
     template_loader = jinja2.FileSystemLoader(searchpath="./templates")
     template_env = jinja2.Environment(loader=template_loader)
-    template = template_env.get_template("email_templates/newsletter.html.j2")
+    template = template_env.get_template(template_name)
     
     # Prepare data for the template
     template_data = {
         "issue_date": datetime.date.today().strftime("%B %d, %Y"),
-        "content": content
+        "edition_title": edition_title,
+        "content": content,
+        "themes": themes or [],
+        "thumbnail": lambda item: (thumbnails or {}).get(item.canonical_url),
+        "link": tracked_url if tracking_key else (lambda item: item.url),
+        "open_pixel_url": open_pixel_url(tracking_key) if tracking_key else None,
     }
     
     # Render the HTML
     html_body = template.render(template_data)
     
-    # Inline CSS for better email client compatibility
-    inlined_html = transform(html_body)
-    
-    return inlined_html
\ No newline at end of file
+    # Inline CSS for better email client compatibility, then strip what no client needs
+    return minify_html(inline_css(html_body))
+
+def render_email(content: Dict[str, List[ContentItem]], template_name: str = "email_templates/newsletter.html.j2",
+                 edition_title: str = "AI Weekly News", tracking_key: Optional[str] = None,
+                 max_bytes: Optional[int] = None, over_budget: Optional[str] = None,
+                 themes: Optional[List[Theme]] = None, thumbnails: Optional[Dict[str, str]] = None) -> RenderedEmail:
+    """
+    Renders the HTML and plain-text parts and enforces the size budget (settings.EMAIL_MAX_BYTES).
+    With the "drop" policy, low-priority sections are removed until the HTML fits;
+    with "fail", or when nothing is left to drop, EmailTooLarge is raised.
+    Themes are dropped as a whole, under the name THEMES_SECTION. Thumbnails are linked
+    images, so they don't count towards the budget.
+    """
+    max_bytes = settings.EMAIL_MAX_BYTES if max_bytes is None else max_bytes
+    over_budget = over_budget or settings.EMAIL_OVER_BUDGET
+    content = dict(content)
+    dropped = []
+    themes = list(themes or [])
+    droppable = [section for section in SECTION_DROP_ORDER
+                 if content.get(section) or (section == THEMES_SECTION and themes)]
+
+    while True:
+        html = render_newsletter(content, template_name, edition_title, tracking_key, themes, thumbnails)
+        size = len(html.encode("utf-8"))
+        if not max_bytes or size <= max_bytes:
+            return RenderedEmail(html=html, text=html_to_text(html), dropped_sections=dropped)
+        if over_budget != "drop" or not droppable:
+            raise EmailTooLarge(f"Email is {size} bytes, over the {max_bytes} byte budget"
+                                + (f" after dropping {', '.join(dropped)}" if dropped else ""))
+        section = droppable.pop(0)
+        logger.warning(f"Email is {size} bytes, over the {max_bytes} byte budget. Dropping section '{section}'.")
+        if section == THEMES_SECTION:
+            themes = []
+        else:
+            content[section] = []
+        dropped.append(section)
@@ -0,0 +1,263 @@
+# modules/thumbnails.py
+import datetime
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from config import settings
+from modules.content import ContentItem
+from modules.storage import delete_thumbnails, get_thumbnails, save_thumbnails
+
+logger = logging.getLogger(__name__)
+
+# Cards are 530px wide in the email; a little extra keeps the image sharp after the client scales it
+WIDTH, HEIGHT = 600, 314  # The 1.91:1 ratio og:image and GitHub previews are made for
+# JPEG rather than WebP: Outlook and older Apple Mail cannot show WebP in an email
+FORMAT = "JPEG"
+EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp"}
+MAX_BYTES = 20000
+QUALITIES = (80, 70, 60, 50, 40, 35)  # Tried in order until the image fits MAX_BYTES; the last one is kept regardless
+
+URL_PATH = "/static/thumbs"
+GENERATED = "generated"  # Stored as the source of fallback images
+FETCH_WORKERS = 8
+ENCODE_WORKERS = min(4, os.cpu_count() or 1)
+MAX_PAGE_BYTES = 512 * 1024  # og:image is in the <head>; no need to read whole articles
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+# Sent emails keep pointing at their thumbnails, so recently used ones are never evicted
+MIN_KEEP = datetime.timedelta(days=30)
+
+# Fallback backgrounds, picked by host so one site always gets the same colour
+PALETTE = ((30, 64, 175), (37, 99, 235), (79, 70, 229), (13, 148, 136), (190, 24, 93), (180, 83, 9), (71, 85, 105))
+
+def thumbnails_enabled() -> bool:
+    """Emails need absolute image URLs, so thumbnails are only added when PUBLIC_BASE_URL is set."""
+    return bool(settings.PUBLIC_BASE_URL)
+
+def thumbnail_url(filename: str) -> str:
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}{URL_PATH}/{filename}"
+
+def github_preview_url(item: ContentItem) -> Optional[str]:
+    """The social preview GitHub renders for a repository, or None when the item is not a repo page."""
+    if item.host != "github.com":
+        return None
+    parts = [part for part in urlparse(item.url).path.split("/") if part]
+    if len(parts) < 2:
+        return None
+    return f"https://opengraph.githubassets.com/1/{parts[0]}/{parts[1]}"
+
+def find_og_image(html: str, base_url: str) -> Optional[str]:
+    """The page's og:image (or twitter:image), resolved against the page URL."""
+    soup = BeautifulSoup(html, "html.parser")
+    for attr, name in (("property", "og:image:secure_url"), ("property", "og:image"),
+                       ("name", "twitter:image"), ("property", "twitter:image")):
+        tag = soup.find("meta", attrs={attr: name})
+        content = (tag.get("content") or "").strip() if tag else ""
+        if content:
+            url = urljoin(base_url, content)
+            if url.startswith(("http://", "https://")):
+                return url
+    return None
+
+def _label(item: ContentItem) -> str:
+    return (item.host or item.source or "?").removeprefix("www.")
+
+def generated_thumbnail(label: str, width: int = WIDTH, height: int = HEIGHT) -> Image.Image:
+    """A plain card with the site's initial and name, for items without an image."""
+    background = PALETTE[int(hashlib.md5(label.encode()).hexdigest(), 16) % len(PALETTE)]
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+    initial = label[:1].upper() or "?"
+    draw.text((width / 2, height / 2 - height // 12), initial, fill="white", anchor="mm",
+              font=ImageFont.load_default(size=height // 2))
+    draw.text((width / 2, height - height // 7), label[:48], fill=(226, 232, 240), anchor="mm",
+              font=ImageFont.load_default(size=height // 12))
+    return image
+
+def encode_thumbnail(data: Optional[bytes], label: str, fmt: str = FORMAT, width: int = WIDTH,
+                     height: int = HEIGHT, max_bytes: int = MAX_BYTES) -> bytes:
+    """
+    Crops and resizes an image to width x height and re-encodes it at the best quality that fits
+    `max_bytes`. Undecodable or missing data gets a generated image instead. Runs in a worker process.
+    """
+    image = None
+    if data:
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.draft("RGB", (width * 2, height * 2))  # JPEG only: decode at a reduced scale
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        except Exception as e:  # Truncated files, decompression bombs, formats Pillow can't read
+            logger.debug(f"Could not decode image for {label}: {e}")
+            image = None
+    if image is None:
+        image = generated_thumbnail(label, width, height)
+
+    encoded = b""
+    for quality in QUALITIES:
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, quality=quality, optimize=True, progressive=True)
+        encoded = buffer.getvalue()
+        if len(encoded) <= max_bytes:
+            break
+    return encoded
+
+class ThumbnailCache:
+    """
+    Encoded thumbnails on disk, named by a hash of their bytes: identical images are stored once
+    and a name never changes content, so they can be served as immutable. Least recently used
+    files are evicted past a size budget.
+    """
+
+    def __init__(self, directory: Optional[str] = None, fmt: str = FORMAT):
+        self.directory = directory or settings.THUMBNAIL_DIR
+        self.extension = EXTENSIONS[fmt]
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def has(self, filename: str) -> bool:
+        return os.path.isfile(self.path(filename))
+
+    def store(self, data: bytes) -> str:
+        filename = hashlib.sha256(data).hexdigest()[:16] + self.extension
+        path = self.path(filename)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)  # Readers never see a partial file
+        return filename
+
+    def touch(self, filenames: Iterable[str]) -> None:
+        """Marks files as used now; eviction goes by modification time."""
+        for filename in filenames:
+            try:
+                os.utime(self.path(filename))
+            except FileNotFoundError:
+                pass
+
+    def evict(self, max_bytes: int, keep_since: float) -> List[str]:
+        """Deletes the least recently used files not used since `keep_since` until the cache fits `max_bytes`."""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(self.extension)]
+        except FileNotFoundError:
+            return []
+        files = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.name) for entry in entries)
+        total = sum(size for _, size, _ in files)
+        evicted = []
+        for mtime, size, filename in files:
+            if total <= max_bytes or mtime >= keep_since:
+                break
+            os.remove(self.path(filename))
+            total -= size
+            evicted.append(filename)
+        return evicted
+
+class ThumbnailFetcher:
+    """Finds and downloads the source image for an item. Any failure means "no image", never an error."""
+
+    def __init__(self):
+        self.http = requests.Session()
+        self.http.headers["User-Agent"] = "Mozilla/5.0 (compatible; ai-weekly-news)"
+
+    def _get(self, url: str, max_bytes: int, content_type: str) -> Optional[bytes]:
+        with self.http.get(url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            if not response.headers.get("Content-Type", "").startswith(content_type):
+                return None
+            body = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                body.extend(chunk)
+                if len(body) >= max_bytes:
+                    # Pages are cut at the limit (the head is in there); an image that large is skipped
+                    return bytes(body[:max_bytes]) if content_type == "text/html" else None
+            return bytes(body)
+
+    def source_url(self, item: ContentItem) -> Optional[str]:
+        preview = github_preview_url(item)
+        if preview:
+            return preview
+        page = self._get(item.url, MAX_PAGE_BYTES, "text/html")
+        return find_og_image(page.decode("utf-8", errors="replace"), item.url) if page else None
+
+    def fetch(self, item: ContentItem) -> Tuple[str, Optional[bytes]]:
+        """(source URL or GENERATED, image bytes or None)."""
+        try:
+            source = self.source_url(item)
+            if source:
+                data = self._get(source, MAX_IMAGE_BYTES, "image/")
+                if data:
+                    return source, data
+        except requests.RequestException as e:
+            logger.info(f"No thumbnail image for {item.url}: {e}")
+        return GENERATED, None
+
+def ensure_thumbnails(items: Iterable[ContentItem], cache: Optional[ThumbnailCache] = None,
+                      fetcher: Optional[ThumbnailFetcher] = None) -> Dict[str, str]:
+    """
+    Maps each item's canonical URL to its thumbnail file, creating the missing ones.
+
+    Items with a stored thumbnail whose file is still cached are not fetched or encoded again.
+    The rest are fetched concurrently in threads and encoded in a process pool as their
+    downloads finish; items sharing a source image are encoded once. Ends with an eviction pass.
+    """
+    cache = cache or ThumbnailCache()
+    fetcher = fetcher or ThumbnailFetcher()
+    wanted = {item.canonical_url: item for item in items if item.canonical_url.startswith(("http://", "https://"))}
+    if not wanted:
+        return {}
+
+    stored = get_thumbnails(list(wanted))
+    thumbnails = {url: name for url, name in stored.items() if cache.has(name)}
+    missing = [item for url, item in wanted.items() if url not in thumbnails]
+
+    rows = []
+    if missing:
+        started = time.perf_counter()
+        encoded_sources: Dict[str, Future] = {}
+        pending = {}
+        context = multiprocessing.get_context("spawn")  # Forking a threaded web process is unsafe
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as fetch_pool, \
+                ProcessPoolExecutor(max_workers=ENCODE_WORKERS, mp_context=context) as encode_pool:
+            fetches = {fetch_pool.submit(fetcher.fetch, item): item for item in missing}
+            for future in as_completed(fetches):
+                item = fetches[future]
+                source, data = future.result()
+                # Every fallback is drawn for its own label; shared source images are encoded once
+                key = source if source != GENERATED else f"{GENERATED}:{_label(item)}"
+                if key not in encoded_sources:
+                    encoded_sources[key] = encode_pool.submit(encode_thumbnail, data, _label(item), FORMAT)
+                pending[item.canonical_url] = (source, encoded_sources[key])
+            for url, (source, future) in pending.items():
+                filename = cache.store(future.result())
+                thumbnails[url] = filename
+                rows.append({"canonical_url": url, "source_url": source, "filename": filename})
+        logger.info(f"Created {len(missing)} thumbnails ({len(encoded_sources)} images encoded) "
+                    f"in {time.perf_counter() - started:.1f}s; {len(wanted) - len(missing)} reused from the cache.")
+
+    save_thumbnails(rows)
+    cache.touch(thumbnails.values())
+    evicted = cache.evict(settings.THUMBNAIL_CACHE_MAX_MB * 1024 * 1024, time.time() - MIN_KEEP.total_seconds())
+    if evicted:
+        delete_thumbnails(evicted)
+        logger.info(f"Evicted {len(evicted)} least recently used thumbnails.")
+    return thumbnails
+
+def thumbnail_urls(items: Iterable[ContentItem]) -> Dict[str, str]:
+    """Canonical URL -> absolute image URL for the email, or nothing when thumbnails are disabled."""
+    if not thumbnails_enabled():
+        return {}
+    return {url: thumbnail_url(name) for url, name in ensure_thumbnails(items).items()}
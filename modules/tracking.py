@@ -0,0 +1,229 @@
+# modules/tracking.py
+import datetime
+import hashlib
+import logging
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+from config import settings
+from modules.content import ContentItem
+from modules.storage import (
+    save_tracked_links, get_tracked_link_url, get_tracked_links, get_recent_tracking_keys,
+    increment_link_clicks, increment_issue_opens, get_host_click_rates, get_tracking_keys, is_tracking_key_known,
+)
+
+logger = logging.getLogger(__name__)
+
+# Mailchimp replaces this merge tag with a per-recipient ID, so every subscriber gets their own links
+SUBSCRIBER_TOKEN = "*|UNIQID|*"
+
+# What issue_tracking_key() produces; open-pixel paths with anything else are not looked up
+TRACKING_KEY_PATTERN = re.compile(r"[0-9a-f]{16}")
+
+# 1x1 transparent GIF served by the open pixel
+PIXEL_GIF = bytes.fromhex("47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b")
+
+def item_id(item: ContentItem) -> str:
+    """Stable short ID for a link: the same canonical URL always gets the same ID."""
+    return hashlib.blake2b(item.canonical_url.encode(), digest_size=8).hexdigest()
+
+def issue_tracking_key(run_id: str, edition: str) -> str:
+    """Deterministic per run and edition, so a resumed run renders identical links."""
+    return hashlib.blake2b(f"{run_id}:{edition}".encode(), digest_size=8).hexdigest()
+
+def is_trackable(item: ContentItem) -> bool:
+    return item.canonical_url.startswith(("http://", "https://"))
+
+def tracking_enabled() -> bool:
+    return bool(settings.PUBLIC_BASE_URL)
+
+def tracked_url(item: ContentItem) -> str:
+    """The link to put in the email: a redirect through /r/ when tracking is on, otherwise the item URL."""
+    if not tracking_enabled() or not is_trackable(item):
+        return item.url
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/r/{item_id(item)}/{SUBSCRIBER_TOKEN}"
+
+def open_pixel_url(tracking_key: str) -> Optional[str]:
+    if not tracking_enabled():
+        return None
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/o/{tracking_key}/{SUBSCRIBER_TOKEN}.gif"
+
+def register_links(items: Iterable[ContentItem], tracking_key: str) -> Dict[str, str]:
+    """Stores redirect targets for an issue before it is sent, and warms the cache with them."""
+    links = {item_id(item): item for item in items if is_trackable(item)}
+    now = datetime.datetime.utcnow()
+    save_tracked_links([
+        {"item_id": link_id, "url": item.url, "host": item.host, "tracking_key": tracking_key, "clicks": 0,
+         "created_at": now}
+        for link_id, item in links.items()
+    ])
+    targets = {link_id: item.url for link_id, item in links.items()}
+    link_cache.update(targets)
+    tracking_keys.add(tracking_key)
+    return targets
+
+class LinkCache:
+    """Thread-safe LRU of item_id -> target URL. Hits never touch the database."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, link_id: str) -> Optional[str]:
+        with self._lock:
+            url = self._entries.get(link_id)
+            if url is not None:
+                self._entries.move_to_end(link_id)
+            return url
+
+    def update(self, targets: Dict[str, str]) -> None:
+        with self._lock:
+            for link_id, url in targets.items():
+                self._entries[link_id] = url
+                self._entries.move_to_end(link_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def load(self, link_id: str) -> Optional[str]:
+        """Cache miss path: one primary-key lookup, then cached."""
+        url = get_tracked_link_url(link_id)
+        if url is not None:
+            self.update({link_id: url})
+        return url
+
+    def preload(self, issues: int = 10) -> int:
+        """Loads the links of the most recent issues, which receive nearly all clicks."""
+        targets = get_tracked_links(get_recent_tracking_keys(issues))
+        self.update(targets)
+        return len(targets)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class TrackingKeys:
+    """
+    Thread-safe set of the tracking keys issues were sent with. Only opens for these are counted,
+    so made-up pixel URLs never grow the counters or create issue_opens rows.
+    """
+
+    def __init__(self):
+        self._keys: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __contains__(self, tracking_key: str) -> bool:
+        with self._lock:
+            return tracking_key in self._keys
+
+    def add(self, tracking_key: str) -> None:
+        with self._lock:
+            self._keys.add(tracking_key)
+
+    def load(self, tracking_key: str) -> bool:
+        """
+        Miss path, for issues sent by another process since startup: one indexed lookup for
+        well-formed keys, cached when found. Unknown keys are not remembered.
+        """
+        if not TRACKING_KEY_PATTERN.fullmatch(tracking_key) or not is_tracking_key_known(tracking_key):
+            return False
+        self.add(tracking_key)
+        return True
+
+    def preload(self) -> int:
+        keys = get_tracking_keys()
+        with self._lock:
+            self._keys.update(keys)
+            return len(self._keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+class EventBuffer:
+    """
+    In-process click and open counters. Recording is a dict increment under a lock;
+    flush() swaps the counters out and writes them in one batch per table.
+    """
+
+    def __init__(self):
+        self._clicks: Counter = Counter()
+        self._opens: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record_click(self, link_id: str) -> None:
+        with self._lock:
+            self._clicks[link_id] += 1
+
+    def record_open(self, tracking_key: str) -> None:
+        with self._lock:
+            self._opens[tracking_key] += 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._clicks.values()) + sum(self._opens.values())
+
+    def flush(self) -> int:
+        """Writes buffered counts. On a database error the counts are put back for the next flush."""
+        with self._lock:
+            clicks, self._clicks = self._clicks, Counter()
+            opens, self._opens = self._opens, Counter()
+        if not clicks and not opens:
+            return 0
+        now = datetime.datetime.utcnow()
+        written = 0
+        try:
+            increment_link_clicks(dict(clicks), now)
+            written, clicks = sum(clicks.values()), Counter()
+            increment_issue_opens(dict(opens), now)
+            written += sum(opens.values())
+        except Exception as e:
+            logger.error(f"Failed to flush tracking events, will retry: {e}")
+            with self._lock:
+                self._clicks.update(clicks)
+                self._opens.update(opens)
+        return written
+
+class Flusher:
+    """Daemon thread that flushes an EventBuffer every `interval` seconds, and once more on stop."""
+
+    def __init__(self, buffer: EventBuffer, interval: float):
+        self.buffer = buffer
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tracking-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.buffer.flush()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.buffer.flush()
+
+link_cache = LinkCache(settings.TRACKING_CACHE_SIZE)
+tracking_keys = TrackingKeys()
+events = EventBuffer()
+flusher = Flusher(events, settings.TRACKING_FLUSH_SECONDS)
+
+def get_click_scores() -> Dict[str, float]:
+    """
+    Average clicks per link by host over the last CLICK_SCORE_DAYS, used to rank items
+    from hosts readers actually click. Empty when there is no data yet.
+    """
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=settings.CLICK_SCORE_DAYS)
+    try:
+        return get_host_click_rates(since)
+    except Exception as e:
+        logger.warning(f"Could not load click scores, ranking without them: {e}")
+        return {}
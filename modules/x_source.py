@@ -0,0 +1,270 @@
+# modules/x_source.py
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from config import settings
+from modules.content import ContentItem
+from modules.storage import FeedState
+
+logger = logging.getLogger(__name__)
+
+# --- Curated accounts and lists (list members are polled like accounts) ---
+ACCOUNTS = (
+    "OpenAI", "GoogleDeepMind", "AnthropicAI", "huggingface", "AIatMeta", "MistralAI",
+    "karpathy", "AndrewYNg", "ylecun", "fchollet", "_akhaliq",
+)
+LISTS: Tuple[str, ...] = ()
+
+X_SOURCE_KEY = "x:timelines"
+ACCOUNT_KEY_PREFIX = "x:@"
+
+USERS_PER_LOOKUP = 100  # API maximum for /users/by
+TWEETS_PER_PAGE = 100
+# Caps one poll per account. With since_id that only matters after a long outage;
+# without one (first poll) it also bounds how far back we read.
+MAX_PAGES_PER_ACCOUNT = 3
+FIRST_POLL_WINDOW = timedelta(days=7)
+RATE_LIMIT_MARGIN = 1.0  # Seconds added to a reset time, for clock skew
+MAX_ATTEMPTS = 3
+
+# Links to these hosts are followed to their target; links back to X itself are not content
+SHORTENER_HOSTS = frozenset({"bit.ly", "buff.ly", "ow.ly", "tinyurl.com", "lnkd.in", "dlvr.it", "t.co", "goo.gl"})
+MAX_REDIRECTS = 5
+X_HOSTS = ("twitter.com", "x.com")
+TCO_LINK = re.compile(r"https?://t\.co/\S+")
+
+class RateLimitExhausted(RuntimeError):
+    """An endpoint still answered 429 after MAX_ATTEMPTS; the rest of the poll would only hit it again."""
+
+def account_key(username: str) -> str:
+    return f"{ACCOUNT_KEY_PREFIX}{username.lower()}"
+
+class RateLimiter:
+    """
+    Remembers each endpoint's remaining requests and reset time from the x-rate-limit-* headers
+    and sleeps before a request only when that budget is spent, and only until it resets.
+    """
+
+    def __init__(self, sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.time):
+        self.sleep = sleep
+        self.clock = clock
+        self._limits: Dict[str, Tuple[int, float]] = {}
+
+    def wait(self, endpoint: str) -> None:
+        remaining, reset = self._limits.get(endpoint, (1, 0.0))
+        delay = reset - self.clock()
+        if remaining <= 0 and delay > 0:
+            logger.info(f"X rate limit for {endpoint} spent, sleeping {delay + RATE_LIMIT_MARGIN:.0f}s.")
+            self.sleep(delay + RATE_LIMIT_MARGIN)
+            # The window has reset; the next response's headers say what the new budget is
+            self._limits.pop(endpoint, None)
+
+    def update(self, endpoint: str, headers) -> None:
+        try:
+            remaining = int(headers["x-rate-limit-remaining"])
+            reset = float(headers["x-rate-limit-reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self._limits[endpoint] = (remaining, reset)
+
+    def exhaust(self, endpoint: str, headers) -> None:
+        """After a 429: nothing is left until the reset time (or a minute, if the server gave none)."""
+        try:
+            reset = float(headers["x-rate-limit-reset"])
+        except (KeyError, TypeError, ValueError):
+            reset = self.clock() + 60
+        self._limits[endpoint] = (0, reset)
+
+class XClient:
+    """The few X API v2 endpoints the collector needs, with app-only (bearer token) auth."""
+
+    def __init__(self, bearer_token: str, base_url: Optional[str] = None, limiter: Optional[RateLimiter] = None):
+        self.base_url = (base_url or settings.X_API_BASE_URL).rstrip("/")
+        self.limiter = limiter or RateLimiter()
+        self.http = requests.Session()
+        self.http.headers.update({"Authorization": f"Bearer {bearer_token}", "User-Agent": "ai-weekly-news"})
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+        self.http.mount("http://", HTTPAdapter(max_retries=retries))
+        self.http.mount("https://", HTTPAdapter(max_retries=retries))
+        # Shorteners are third parties: they must never see the bearer token
+        self.links = requests.Session()
+        self.links.headers["User-Agent"] = "ai-weekly-news"
+        self._expanded: Dict[str, str] = {}
+
+    def get(self, endpoint: str, path: str, params: Optional[Dict] = None) -> Dict:
+        """GET with rate limiting. `endpoint` is the route template the limit applies to, e.g. "users/:id/tweets"."""
+        for _ in range(MAX_ATTEMPTS):
+            self.limiter.wait(endpoint)
+            response = self.http.get(f"{self.base_url}/{path}", params=params, timeout=15)
+            if response.status_code == 429:
+                self.limiter.exhaust(endpoint, response.headers)
+                continue
+            self.limiter.update(endpoint, response.headers)
+            response.raise_for_status()
+            return response.json()
+        raise RateLimitExhausted(f"X API rate limit for {endpoint} still exhausted after {MAX_ATTEMPTS} attempts")
+
+    def lookup_users(self, usernames: List[str]) -> Dict[str, str]:
+        """Username (lowercased) -> user ID, at most USERS_PER_LOOKUP names per request."""
+        ids = {}
+        for offset in range(0, len(usernames), USERS_PER_LOOKUP):
+            batch = usernames[offset:offset + USERS_PER_LOOKUP]
+            payload = self.get("users/by", "users/by", {"usernames": ",".join(batch)})
+            for user in payload.get("data", []):
+                ids[user["username"].lower()] = user["id"]
+            for error in payload.get("errors", []):
+                logger.warning(f"X user lookup: {error.get('detail') or error}")
+        return ids
+
+    def list_members(self, list_id: str) -> Dict[str, str]:
+        members, token = {}, None
+        while True:
+            params = {"max_results": 100, **({"pagination_token": token} if token else {})}
+            payload = self.get("lists/:id/members", f"lists/{list_id}/members", params)
+            for user in payload.get("data", []):
+                members[user["username"].lower()] = user["id"]
+            token = payload.get("meta", {}).get("next_token")
+            if not token:
+                return members
+
+    def user_tweets(self, user_id: str, since_id: Optional[str], now: datetime) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Original posts newer than `since_id`, newest first, plus the newest ID seen (the next since_id).
+        Without a since_id only the last FIRST_POLL_WINDOW is read.
+        """
+        params = {"max_results": TWEETS_PER_PAGE, "tweet.fields": "created_at,entities", "exclude": "retweets,replies"}
+        if since_id:
+            params["since_id"] = since_id
+        else:
+            params["start_time"] = (now - FIRST_POLL_WINDOW).strftime("%Y-%m-%dT%H:%M:%SZ")
+        tweets, newest_id = [], None
+        for _ in range(MAX_PAGES_PER_ACCOUNT):
+            payload = self.get("users/:id/tweets", f"users/{user_id}/tweets", params)
+            meta = payload.get("meta", {})
+            newest_id = newest_id or meta.get("newest_id")
+            tweets.extend(payload.get("data", []))
+            if not meta.get("next_token"):
+                break
+            params["pagination_token"] = meta["next_token"]
+        return tweets, newest_id
+
+    def expand_url(self, url: str) -> str:
+        """
+        Follows redirects while they point at a shortener (once per URL per client), without
+        requesting the final page. Anything that is not a short link is returned as is.
+        """
+        if url in self._expanded:
+            return self._expanded[url]
+        target = url
+        try:
+            for _ in range(MAX_REDIRECTS):
+                if (urlparse(target).hostname or "").lower() not in SHORTENER_HOSTS:
+                    break
+                response = self.links.head(target, allow_redirects=False, timeout=5)
+                if not response.is_redirect:
+                    break
+                target = urljoin(target, response.headers["Location"])
+        except requests.RequestException as e:
+            logger.warning(f"Could not expand {url}: {e}")
+        self._expanded[url] = target
+        return target
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+
+def _is_x_link(url: str) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return any(host == name or host.endswith("." + name) for name in X_HOSTS)
+
+def tweet_items(client: XClient, tweet: Dict, username: str) -> List[ContentItem]:
+    """One item per external link in the post. Posts without links are not newsletter material."""
+    text = " ".join(TCO_LINK.sub("", tweet.get("text", "")).split())
+    items = []
+    for entity in tweet.get("entities", {}).get("urls", []):
+        url = client.expand_url(entity.get("unwound_url") or entity.get("expanded_url") or entity.get("url", ""))
+        if not url.startswith(("http://", "https://")) or _is_x_link(url):
+            continue
+        items.append(ContentItem(
+            source="x",
+            feed="x",
+            title=entity.get("title") or text[:200] or url,
+            url=url,
+            summary=entity.get("description") or text,
+            published=_parse_time(tweet.get("created_at")),
+            author=f"@{username}",
+        ))
+    return items
+
+def poll_accounts(client: XClient, usernames: Iterable[str], list_ids: Iterable[str], states: Dict[str, FeedState],
+                  known_urls: Callable[[List[str]], Set[str]], now: Optional[datetime] = None) -> List[ContentItem]:
+    """
+    Fetches new linked posts for every account and list member.
+
+    `states` maps account_key() to that account's FeedState (since_id and cached user ID) and is
+    updated in place; missing accounts are added. User IDs are looked up in batches, once per
+    account. Links are expanded and deduplicated by canonical URL, within the batch and against
+    `known_urls` (canonical URLs already collected from any source). An account that fails is
+    skipped; an exhausted rate limit ends the poll with what was fetched so far.
+    """
+    now = now or datetime.utcnow()
+
+    def state_for(username: str) -> FeedState:
+        key = account_key(username)
+        if key not in states:
+            states[key] = FeedState(feed_key=key, items_seen=0)
+        return states[key]
+
+    accounts = {username.lower(): username for username in usernames}
+    items: Dict[str, ContentItem] = {}
+    try:
+        for list_id in list_ids:
+            try:
+                members = client.list_members(list_id)
+            except requests.RequestException as e:
+                logger.error(f"Could not fetch members of X list {list_id}: {e}")
+                continue
+            for username, user_id in members.items():
+                accounts.setdefault(username, username)
+                state_for(username).external_id = user_id
+
+        unresolved = [name for key, name in accounts.items() if not state_for(key).external_id]
+        if unresolved:
+            try:
+                for username, user_id in client.lookup_users(unresolved).items():
+                    state_for(username).external_id = user_id
+            except requests.RequestException as e:
+                logger.error(f"Could not look up X users, polling the known ones only: {e}")
+
+        for username in accounts:
+            state = state_for(username)
+            if not state.external_id:
+                continue
+            try:
+                tweets, newest_id = client.user_tweets(state.external_id, state.since_id, now)
+            except requests.RequestException as e:
+                logger.error(f"Could not fetch posts of @{username}: {e}")
+                continue
+            for tweet in tweets:
+                for item in tweet_items(client, tweet, accounts[username]):
+                    items.setdefault(item.canonical_url, item)
+            if newest_id:
+                state.since_id = newest_id
+            state.items_seen = (state.items_seen or 0) + len(tweets)
+            state.last_polled_at = now
+    except RateLimitExhausted as e:
+        # Keeps the IDs and posts fetched so far; the accounts not reached are polled next time
+        logger.warning(f"{e}; ending this X poll early.")
+
+    known = known_urls(list(items)) if items else set()
+    new_items = [item for canonical, item in items.items() if canonical not in known]
+    logger.info(f"X: {len(new_items)} new links from {len(accounts)} accounts ({len(items) - len(new_items)} already collected).")
+    return new_items
@@ -0,0 +1,15 @@
+# tasks/build_assets.py
+import argparse
+import logging
+
+from web.assets import STATIC_DIR, build_assets
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fingerprint and pre-compress the web app's CSS/JS assets.")
+    parser.add_argument("--static-dir", default=STATIC_DIR, help="Directory holding the source assets.")
+    args = parser.parse_args()
+
+    for logical, hashed in build_assets(args.static_dir).items():
+        print(f"{logical} -> {hashed}")
@@ -0,0 +1,35 @@
+# tasks/import_subscribers.py
+import argparse
+import logging
+import sys
+from modules.storage import init_db, get_max_subscriber_id
+from modules.subscriber_import import (
+    DEFAULT_CHUNK_SIZE, import_subscribers, export_subscribers_csv, sync_new_subscribers_to_mailchimp
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export newsletter subscribers as CSV.")
+    parser.add_argument("csv_path", help="CSV file to import, or the file to write with --export ('-' for stdout).")
+    parser.add_argument("--export", action="store_true", help="Export active subscribers instead of importing.")
+    parser.add_argument("--sync-mailchimp", action="store_true", help="Add newly imported subscribers to Mailchimp.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows validated and inserted per batch.")
+    args = parser.parse_args()
+
+    init_db()
+    if args.export:
+        out = sys.stdout if args.csv_path == "-" else open(args.csv_path, "w", encoding="utf-8", newline="")
+        with out:
+            for block in export_subscribers_csv():
+                out.write(block)
+        sys.exit(0)
+
+    last_id = get_max_subscriber_id()
+    with open(args.csv_path, encoding="utf-8-sig", newline="") as f:
+        report = import_subscribers(f, chunk_size=args.chunk_size)
+    print(f"Inserted: {report.inserted}  Duplicates: {report.duplicates}  Invalid: {report.invalid}  "
+          f"({report.rows_per_second:,.0f} rows/s)")
+    if args.sync_mailchimp and report.inserted:
+        totals = sync_new_subscribers_to_mailchimp(last_id)
+        print(f"Mailchimp: {totals['new_members']} new members, {totals['errors']} errors.")
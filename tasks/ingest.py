@@ -0,0 +1,20 @@
+# tasks/ingest.py
+import argparse
+import logging
+from modules.ingester import run_due_feeds, run_forever
+from modules.storage import init_db
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll content sources into the local item store.")
+    parser.add_argument("--loop", action="store_true", help="Keep polling forever, each feed on its own schedule.")
+    parser.add_argument("--tick", type=int, default=60, help="Seconds between schedule checks in --loop mode.")
+    args = parser.parse_args()
+
+    init_db()
+    if args.loop:
+        run_forever(tick_seconds=args.tick)
+    else:
+        results = run_due_feeds()
+        print(f"Polled {len(results)} feeds, stored {sum(results.values())} items.")
@@ -3,129 +3,291 @@ import argparse
 import logging
 import os
 import random
-from typing import Dict, List
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 import time
-from modules.collector import collect_all_content
+from dataclasses import replace
+from modules.content import ContentItem
+from modules.clustering import THEMES_SECTION, Theme, cluster_items, select_themes
+from modules.collector import collect_weekly_content
 from modules.summarizer import get_summary
 from modules.categorizer import select_and_categorize
-from modules.templater import render_newsletter
+from modules.templater import card_items, render_email
+from modules.email_payload import size_report
 from modules.mailer import get_mailer
-from modules.storage import save_issue
+from modules.storage import save_issue, init_db, prune_dry_run_issues
+from modules.editions import DEFAULT_EDITION, EDITIONS, Edition, get_editions
+from modules.checkpoints import Checkpointer, new_run_id
+from modules.tracking import get_click_scores, issue_tracking_key, register_links, tracking_enabled, tracking_keys
+from modules.thumbnails import thumbnail_urls
 from config import settings
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def generate_subject_line(big_story_title: str) -> str:
+def generate_subject_line(big_story_title: str, edition: Optional[Edition] = None,
+                          rng: Optional[random.Random] = None) -> str:
     """Generates a compelling subject line."""
+    if edition is not None and edition.name != DEFAULT_EDITION:
+        return f"{edition.title}: {big_story_title}"
     variants = [
         f"🤖 AI Weekly News: {big_story_title}",
         f"Your Weekly AI Briefing: {big_story_title} & More",
         f"This Week in AI: {big_story_title}",
     ]
-    return random.choice(variants)
+    return (rng or random).choice(variants)
 
-def orchestrate_newsletter_creation(dry_run: bool = True, send_test_email_first: bool = True, admin_email: str = None):
+# Editions share items; one at a time, the later ones reuse the thumbnails the first one created
+_thumbnail_lock = threading.Lock()
+
+def _items_from_json(data: List[Dict]) -> List[ContentItem]:
+    return [ContentItem.from_dict(item) for item in data]
+
+def _sections_from_json(data: Dict[str, List[Dict]]) -> Dict[str, List[ContentItem]]:
+    return {section: _items_from_json(items) for section, items in data.items()}
+
+def _themes_from_json(data: List[Dict]) -> List[Theme]:
+    return [Theme.from_dict(theme) for theme in data]
+
+def summary_candidates(themes: List[Theme], items: List[ContentItem], limit: int) -> List[ContentItem]:
     """
-    Full pipeline: Collect -> Summarize -> Categorize -> Render -> Send/Save
+    Items to send to Gemini. One representative per theme stands in for the whole group, so
+    distinct topics come first; the rest of the budget goes to the first remaining items.
     """
-    logging.info("Starting newsletter creation pipeline...")
+    candidates = {item.url: item for item in [theme.representative for theme in themes] + items if item.url}
+    return list(candidates.values())[:limit]
 
-    # 1. Collect
-    raw_content = collect_all_content()
-    if not raw_content:
-        logging.warning("No content collected. Aborting.")
-        return
+def _save_issue(subject: str, html_output: str, final_content: Dict[str, List[ContentItem]], edition: Edition,
+                tracking_key: Optional[str], campaign_id: Optional[str] = None, is_dry_run: bool = False):
+    categories = {}
+    unique_items = {}
+    for section, items in final_content.items():
+        for item in items:
+            if item.url and item.url not in unique_items:
+                unique_items[item.url] = item
+                categories[item.url] = section
+    save_issue(subject, html_output, list(unique_items.values()), mailchimp_id=campaign_id,
+               edition=edition.name, categories=categories, tracking_key=tracking_key, is_dry_run=is_dry_run)
+    if tracking_key:
+        tracking_keys.add(tracking_key)  # Opens are counted for this issue from now on
+    if is_dry_run:
+        pruned = prune_dry_run_issues(settings.DRY_RUN_ISSUES_KEPT)
+        if pruned:
+            logging.info(f"[{edition.name}] Pruned {pruned} old dry-run issue(s).")
 
-    # Shuffle the content to ensure a variety of items are summarized
-    random.shuffle(raw_content)
+def build_and_deliver_edition(edition: Edition, content: List[ContentItem], dry_run: bool, send_test_email_first: bool,
+                              admin_email: Optional[str], checkpoints: Checkpointer,
+                              click_scores: Optional[Dict[str, float]] = None,
+                              themes: Optional[List[Theme]] = None) -> bool:
+    """
+    Categorize -> Render -> Send/Save for one edition, from the shared summarized content and themes.
+    Every finished step is checkpointed under "<edition>:<step>" so a resumed run picks up where it failed.
+    Returns True when the edition was previewed or sent successfully.
+    """
+    def stage(name: str) -> str:
+        return f"{edition.name}:{name}"
+
+    # Seeded per edition so results don't depend on thread scheduling
+    rng = random.Random(f"{checkpoints.run_id}:{edition.name}")
+    # Dry runs are previews: plain links and no open pixel, so nothing they receive counts for an issue
+    tracking_key = None if dry_run else issue_tracking_key(checkpoints.run_id, edition.name)
+
+    # 4. Categorize and Select from this edition's sources
+    edition_items = [item for item in content if edition.accepts(item)]
+    final_content = checkpoints.run(stage("categorize"),
+                                    lambda: select_and_categorize(edition_items, edition.section_limits, rng, click_scores),
+                                    decode=_sections_from_json)
 
-    # 2. Summarize (only a subset to save API calls)
-    summarized_content = []
-    # Create a dictionary for quick lookups of summaries
-    summaries = {}
-    for item in raw_content[:6]: # Summarize only the first 6 items
-        try:
-            summary = get_summary(item)
-            # Store the summary with the URL as the key
-            if item.get("url"):
-                summaries[item["url"]] = summary
-            time.sleep(4)
-        except Exception as e:
-            logging.error(f"Could not get summary for '{item['title']}': {e}")
-    
-    # --- THIS IS THE CRITICAL FIX ---
-    # Now, add summaries to the full list of content
-    for item in raw_content:
-        if item.get("url") and item["url"] in summaries:
-            item["summary"] = summaries[item["url"]]
-    # --- END OF FIX ---
-
-    # 3. Categorize and Select from the FULL list of content
-    final_content = select_and_categorize(raw_content) # Use raw_content, not summarized_content
-    
     if not final_content or not any(final_content.values()):
-        logging.error("Categorization failed or resulted in no content. Aborting newsletter generation.")
-        return
+        logging.error(f"[{edition.name}] Categorization failed or resulted in no content. Skipping this edition.")
+        return False
 
-    # 4. Generate Subject Line
-    big_story_list = final_content.get("Big Story of the Week", [])
-    big_story = big_story_list[0] if big_story_list else {"title": "The Latest in AI"}
-    subject = generate_subject_line(big_story['title'])
-    preview_text = big_story.get('summary', 'Your weekly update on the world of Artificial Intelligence.')
+    # Themes show related items the fixed sections left out; derived from checkpointed inputs, so not stored
+    assigned_urls = {item.canonical_url for items in final_content.values() for item in items}
+    edition_themes = select_themes(themes or [], edition.theme_limit, edition.accepts, assigned_urls)
 
-    # 5. Render HTML
-    html_output = render_newsletter(final_content)
+    # 5-6. Generate Subject Line and Render HTML
+    def render() -> Dict:
+        big_story_list = final_content.get("Big Story of the Week", [])
+        big_story = big_story_list[0] if big_story_list else None
+        if tracking_key and tracking_enabled():
+            # Redirect targets must exist before the email can be opened
+            register_links([item for items in final_content.values() for item in items]
+                           + [item for theme in edition_themes for item in theme.items], tracking_key)
+        with _thumbnail_lock:
+            thumbnails = thumbnail_urls(card_items(final_content, edition_themes))
+        email = render_email(final_content, template_name=edition.template, edition_title=edition.title,
+                             tracking_key=tracking_key, themes=edition_themes, thumbnails=thumbnails)
+        return {
+            "subject": generate_subject_line(big_story.title if big_story else "The Latest in AI", edition, rng),
+            "preview_text": (big_story.summary if big_story else "")
+                            or 'Your weekly update on the world of Artificial Intelligence.',
+            "html": email.html,
+            "text": email.text,
+            "dropped_sections": email.dropped_sections,
+        }
+
+    rendered = checkpoints.run(stage("render"), render)
+    subject, preview_text, html_output = rendered["subject"], rendered["preview_text"], rendered["html"]
+    text_output = rendered.get("text")
+    dropped = rendered.get("dropped_sections", [])
+    logging.info(f"[{edition.name}] Email size: " + size_report(
+        len(html_output.encode("utf-8")), len((text_output or "").encode("utf-8")), settings.EMAIL_MAX_BYTES, dropped,
+    ))
+    # Sections dropped to fit the size budget were not sent, so they are not saved with the issue
+    final_content = {section: ([] if section in dropped else items) for section, items in final_content.items()}
+    if THEMES_SECTION not in dropped:
+        final_content[THEMES_SECTION] = [item for theme in edition_themes for item in theme.items]
 
     if dry_run:
-        if not os.path.exists("out"):
-            os.makedirs("out")
-        with open("out/last_preview.html", "w", encoding="utf-8") as f:
-            f.write(html_output)
-        logging.info("Dry run complete. Newsletter saved to out/last_preview.html")
-        
-        all_items = [item for sublist in final_content.values() for item in sublist]
-        unique_items = list({item['url']: item for item in all_items if item.get('url')}.values())
-        save_issue(subject, html_output, items=unique_items)
-        return
+        os.makedirs("out", exist_ok=True)
+        preview_paths = [f"out/preview_{edition.name}.html"]
+        if edition.name == DEFAULT_EDITION:
+            preview_paths.append("out/last_preview.html")
+        for path in preview_paths:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html_output)
+        if text_output:
+            with open(f"out/preview_{edition.name}.txt", "w", encoding="utf-8") as f:
+                f.write(text_output)
+        logging.info(f"[{edition.name}] Dry run complete. Newsletter saved to {preview_paths[-1]}")
+        if not checkpoints.done(stage("preview_saved")):
+            _save_issue(subject, html_output, final_content, edition, tracking_key, is_dry_run=True)
+            checkpoints.save(stage("preview_saved"), True)
+        return True
 
     # --- Live Send Logic ---
-    logging.info("Starting live send process...")
-    mailer = get_mailer()
+    def save_sent_issue(campaign_id: str) -> None:
+        # Checkpointed on its own: a save that failed after the send is retried on resume
+        if not checkpoints.done(stage("issue_saved")):
+            _save_issue(subject, html_output, final_content, edition, tracking_key, campaign_id)
+            checkpoints.save(stage("issue_saved"), True)
+
+    if checkpoints.done(stage("sent")):
+        save_sent_issue(checkpoints.get(stage("sent")))
+        logging.info(f"[{edition.name}] Already sent in this run. Nothing to do.")
+        return True
+
+    logging.info(f"[{edition.name}] Starting live send process to list {edition.list_id}...")
+    mailer = get_mailer(edition.list_id)
     
-    campaign_id = mailer.create_campaign(subject, preview_text)
+    campaign_id = checkpoints.run(stage("campaign"), lambda: mailer.create_campaign(subject, preview_text))
     if not campaign_id:
-        logging.error("Failed to create Mailchimp campaign. Aborting send.")
-        return
+        logging.error(f"[{edition.name}] Failed to create Mailchimp campaign. Aborting send.")
+        return False
 
-    if not mailer.set_campaign_content(campaign_id, html_output):
-        logging.error("Failed to set campaign content. Aborting send.")
-        return
+    if not checkpoints.done(stage("content_set")):
+        if not mailer.set_campaign_content(campaign_id, html_output, text_output):
+            logging.error(f"[{edition.name}] Failed to set campaign content. Aborting send.")
+            return False
+        checkpoints.save(stage("content_set"), True)
         
-    if not dry_run and send_test_email_first and admin_email:
+    if send_test_email_first and admin_email and not checkpoints.done(stage("test_sent")):
         if not mailer.send_test_email(campaign_id, admin_email):
-            logging.error(f"Failed to send test email to {admin_email}. Aborting live send.")
-            return
-        logging.info(f"Test email sent successfully to {admin_email}. Proceeding with main send in 10 seconds...")
+            logging.error(f"[{edition.name}] Failed to send test email to {admin_email}. Aborting live send.")
+            return False
+        checkpoints.save(stage("test_sent"), True)
+        logging.info(f"[{edition.name}] Test email sent successfully to {admin_email}. Proceeding with main send in 10 seconds...")
         time.sleep(10)
 
     if mailer.send_campaign(campaign_id):
-        logging.info("Campaign sent successfully!")
-        all_items = [item for sublist in final_content.values() for item in sublist]
-        unique_items = list({item['url']: item for item in all_items if item.get('url')}.values())
-        save_issue(subject, html_output, unique_items, mailchimp_id=campaign_id)
-    else:
-        logging.error("Failed to send campaign to the main list.")
+        checkpoints.save(stage("sent"), campaign_id)
+        logging.info(f"[{edition.name}] Campaign sent successfully!")
+        save_sent_issue(campaign_id)
+        return True
+    logging.error(f"[{edition.name}] Failed to send campaign to the main list.")
+    return False
+
+def orchestrate_newsletter_creation(dry_run: bool = True, send_test_email_first: bool = True, admin_email: str = None,
+                                    edition_names: Optional[List[str]] = None, run_id: Optional[str] = None) -> str:
+    """
+    Full pipeline: Collect -> Cluster -> Summarize (once) -> per edition, in parallel: Categorize -> Render -> Send/Save
+
+    Each stage's output is checkpointed under a run ID. Passing the `run_id` of an earlier,
+    failed run skips every stage that already completed and reproduces the same issue.
+    Returns the run ID.
+    """
+    resuming = run_id is not None
+    run_id = run_id or new_run_id()
+    checkpoints = Checkpointer(run_id)
+    logging.info(f"{'Resuming' if resuming else 'Starting'} newsletter creation pipeline, run ID {run_id}...")
+
+    if edition_names is None and resuming:
+        edition_names = checkpoints.get("editions")
+    editions = get_editions(edition_names)
+    if not editions:
+        logging.warning("No editions to build. Aborting.")
+        return run_id
+    checkpoints.save("editions", [edition.name for edition in editions])
+    rng = random.Random(run_id)
+
+    # 1. Collect (from the ingester's store, falling back to a live fetch)
+    def collect() -> Optional[List[ContentItem]]:
+        items = collect_weekly_content()
+        # Shuffle the content to ensure a variety of items are summarized
+        rng.shuffle(items)
+        return items or None
+
+    raw_content = checkpoints.run("collect", collect, decode=_items_from_json)
+    if not raw_content:
+        logging.warning("No content collected. Aborting.")
+        return run_id
+
+    # 2. Cluster everything collected into themes of related items
+    themes = checkpoints.run("themes", lambda: cluster_items(raw_content, seed=zlib.crc32(run_id.encode())),
+                             decode=_themes_from_json)
+
+    # 3. Summarize (only a subset to save API calls), shared by every edition.
+    # Summaries are checkpointed one by one, so a resumed run never repeats a Gemini call.
+    summaries = checkpoints.get("summaries") or {}
+    for item in summary_candidates(themes, raw_content, settings.SUMMARY_LIMIT):
+        if item.url in summaries:
+            continue
+        try:
+            summaries[item.url] = get_summary(item)
+            checkpoints.save("summaries", summaries)
+            time.sleep(4)
+        except Exception as e:
+            logging.error(f"Could not get summary for '{item.title}': {e}")
+    
+    # Now, add summaries to the full list of content and to the themes
+    def summarized(item: ContentItem) -> ContentItem:
+        return replace(item, summary=summaries[item.url]) if item.url in summaries else item
+
+    raw_content = [summarized(item) for item in raw_content]
+    themes = [replace(theme, items=[summarized(item) for item in theme.items]) for theme in themes]
+
+    # 4-7. Fan out per edition. Items are immutable, so every worker can share the same list.
+    click_scores = get_click_scores()
+    logging.info(f"Building {len(editions)} edition(s): {', '.join(edition.name for edition in editions)}")
+    with ThreadPoolExecutor(max_workers=len(editions)) as pool:
+        futures = {
+            pool.submit(build_and_deliver_edition, edition, raw_content,
+                        dry_run, send_test_email_first, admin_email, checkpoints, click_scores, themes): edition
+            for edition in editions
+        }
+        for future, edition in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"[{edition.name}] Edition failed: {e}. Resume with --resume {run_id}")
+    return run_id
         
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the AI Weekly Newsletter pipeline.")
     parser.add_argument("--dry-run", action="store_true", help="Generate HTML preview without sending emails.")
     parser.add_argument("--send", action="store_true", help="Send the newsletter to the mailing list.")
     parser.add_argument("--test-email", type=str, default=settings.ADMIN_EMAIL, help="Email address to send a test to before the main send.")
+    parser.add_argument("--edition", action="append", dest="editions", choices=list(EDITIONS),
+                        help="Only build this edition (repeatable). Defaults to every configured edition.")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume an earlier run, skipping the stages it completed.")
     args = parser.parse_args()
 
+    init_db()
     if args.send:
-        orchestrate_newsletter_creation(dry_run=False)
+        orchestrate_newsletter_creation(dry_run=False, edition_names=args.editions, run_id=args.resume)
     elif args.dry_run:
-        orchestrate_newsletter_creation(dry_run=True)
+        orchestrate_newsletter_creation(dry_run=True, edition_names=args.editions, run_id=args.resume)
     else:
         print("Please specify either --dry-run or --send.")
\ No newline at end of file
@@ -1,5 +1,5 @@
 # tasks/seed.py
-from modules.storage import add_subscriber, get_db
+from modules.storage import add_subscriber, get_db, init_db
 
 def seed_database():
     """Adds some initial data to the database for testing."""
@@ -18,4 +18,5 @@ def seed_database():
     print("Seeding complete.")
 
 if __name__ == "__main__":
+    init_db()
     seed_database()
\ No newline at end of file
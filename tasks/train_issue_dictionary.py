@@ -0,0 +1,37 @@
+# tasks/train_issue_dictionary.py
+import argparse
+import logging
+import sys
+
+import zstandard
+
+from modules.storage import ISSUE_ZSTD_LEVEL, get_issue_html_samples, init_db, save_compression_dictionary
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MIN_SAMPLES = 10  # zstd cannot train a useful dictionary from fewer
+
+def compressed_size(samples, dictionary=None) -> int:
+    compressor = zstandard.ZstdCompressor(level=ISSUE_ZSTD_LEVEL, dict_data=dictionary)
+    return sum(len(compressor.compress(sample)) for sample in samples)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train a zstd dictionary on past sent issues. New issues use it when ISSUE_ZSTD_DICTIONARY is on.")
+    parser.add_argument("--samples", type=int, default=200, help="Newest sent issues to train on.")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="Dictionary size in bytes.")
+    parser.add_argument("--dry-run", action="store_true", help="Report the gain without storing the dictionary.")
+    args = parser.parse_args()
+
+    init_db()
+    samples = get_issue_html_samples(args.samples)
+    if len(samples) < MIN_SAMPLES:
+        sys.exit(f"Only {len(samples)} sent issues stored; at least {MIN_SAMPLES} are needed to train a dictionary.")
+
+    dictionary = zstandard.train_dictionary(args.size, samples, level=ISSUE_ZSTD_LEVEL)
+    plain, with_dictionary = compressed_size(samples), compressed_size(samples, dictionary)
+    # Measured on the training set itself, so this is an upper bound on the gain for new issues
+    print(f"{len(samples)} issues, {sum(map(len, samples)):,} bytes: {plain:,} bytes compressed, "
+          f"{with_dictionary:,} with the dictionary ({1 - with_dictionary / plain:.0%} smaller).")
+    if not args.dry_run:
+        print(f"Stored dictionary {save_compression_dictionary(dictionary)}.")
@@ -0,0 +1,58 @@
+import gzip
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import web.app as web_app
+from web.assets import AssetFiles, PrerenderedPage, build_assets, load_manifest, negotiate
+
+@pytest.fixture
+def static_dir(tmp_path):
+    os.makedirs(tmp_path / "css")
+    (tmp_path / "css" / "style.css").write_text("body { color: #1a202c; }\n" * 50)
+    (tmp_path / "index.html").write_text("<html></html>")
+    return str(tmp_path)
+
+def test_build_fingerprints_and_compresses(static_dir):
+    manifest = build_assets(static_dir)
+    hashed = manifest["css/style.css"]
+    assert hashed.startswith("css/style.") and hashed.endswith(".css") and hashed != "css/style.css"
+    built = os.path.join(static_dir, "dist", hashed)
+    with open(built + ".gz", "rb") as f, open(built, "rb") as original:
+        assert gzip.decompress(f.read()) == original.read()
+    assert load_manifest(static_dir) == manifest
+    # Rebuilding unchanged sources gives the same names
+    assert build_assets(static_dir) == manifest
+
+def test_negotiate_prefers_brotli_and_honours_q0():
+    assert negotiate("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert negotiate("gzip, br;q=0", ["br", "gzip"]) == "gzip"
+    assert negotiate("identity", ["br", "gzip"]) is None
+
+def test_fingerprinted_assets_are_immutable_and_precompressed(static_dir):
+    hashed = build_assets(static_dir)["css/style.css"]
+    from fastapi import FastAPI
+    app = FastAPI()
+    app.mount("/static", AssetFiles(directory=static_dir), name="static")
+    client = TestClient(app)
+
+    response = client.get(f"/static/dist/{hashed}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert "immutable" in response.headers["cache-control"]
+    assert response.text.startswith("body")
+
+    response = client.get("/static/css/style.css", headers={"Accept-Encoding": "identity"})
+    assert response.headers["cache-control"] == "no-cache"
+
+def test_landing_page_is_prerendered_with_etag(monkeypatch):
+    monkeypatch.setattr(web_app, "_landing_page", PrerenderedPage("<html>landing</html>"))
+    client = TestClient(web_app.app)
+    response = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert response.text == "<html>landing</html>"
+    etag = response.headers["etag"]
+
+    response = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert client.head("/").status_code == 200
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+from benchmarks.bench_pipeline import STAGES, find_regressions, scaling_exponents
+from benchmarks.synthetic import StubGemini, render_feed
+from modules.collector import parse_feed_items
+
+def make_point(items, seconds, alloc=1.0):
+    return {"feeds": items // 10, "entries": 10, "items": items,
+            "stages": {stage: {"seconds": seconds, "alloc_peak_mb": alloc} for stage in STAGES}}
+
+def test_synthetic_feed_is_deterministic_and_parses():
+    now = datetime(2025, 1, 6, tzinfo=timezone.utc)
+    assert render_feed(3, 20, now) == render_feed(3, 20, now)
+    items = parse_feed_items(render_feed(3, 20, now), feed="blogs")
+    assert len(items) == 20
+    assert len({item.canonical_url for item in items}) == 20
+    assert all(item.published and item.published < now.replace(tzinfo=None) for item in items)
+
+def test_stub_gemini_output_depends_only_on_prompt():
+    gemini = StubGemini(latency=0)
+    assert gemini.generate_content("a").text == gemini.generate_content("a").text != gemini.generate_content("b").text
+    assert gemini.calls == 3
+
+def test_scaling_exponent_reads_linear_and_quadratic_growth():
+    linear = scaling_exponents([make_point(100, 0.1), make_point(1000, 1.0)])
+    quadratic = scaling_exponents([make_point(100, 0.1), make_point(1000, 10.0)])
+    assert linear["parse"] == 1.0
+    assert quadratic["parse"] == 2.0
+
+def test_regressions_need_relative_and_absolute_growth():
+    baseline = {"points": [make_point(1000, 1.0, alloc=10.0)]}
+    slower = {"points": [make_point(1000, 1.5, alloc=10.0)]}
+    noisy = {"points": [make_point(1000, 1.04, alloc=10.5)]}
+    assert len(find_regressions(baseline, slower, tolerance=0.25)) == len(STAGES)
+    assert find_regressions(baseline, noisy, tolerance=0.01) == []
+    assert find_regressions({"points": []}, slower, tolerance=0.25) == []
@@ -0,0 +1,60 @@
+import pytest
+from modules.categorizer import select_and_categorize
+from modules.content import ContentItem
+from modules.editions import EDITIONS, get_editions
+
+@pytest.fixture
+def items():
+    return [ContentItem(**item) for item in [
+        {"source": "rss", "feed": "blogs", "title": "OpenAI news", "url": "https://openai.com/blog/a", "summary": "a"},
+        {"source": "rss", "feed": "blogs", "title": "Mint 1", "url": "https://www.livemint.com/1", "summary": "b"},
+        {"source": "rss", "feed": "blogs", "title": "Mint 2", "url": "https://www.livemint.com/2", "summary": "c"},
+        {"source": "rss", "feed": "blogs", "title": "Mint 3", "url": "https://www.livemint.com/3", "summary": "d"},
+        {"source": "rss", "feed": "research", "title": "Paper 1", "url": "https://arxiv.org/abs/1", "summary": "e"},
+        {"source": "rss", "feed": "research", "title": "Paper 2", "url": "https://arxiv.org/abs/2", "summary": "f"},
+        {"source": "github", "feed": "github", "title": "org/repo", "url": "https://github.com/org/repo", "summary": "g"},
+        {"source": "rss", "feed": "jobs", "title": "Acme: ML Engineer", "url": "https://weworkremotely.com/1", "summary": "h"},
+    ]]
+
+def test_default_sections(items):
+    content = select_and_categorize(items)
+    assert [i.title for i in content["Big Story of the Week"]] == ["OpenAI news"]
+    assert len(content["Indian_AI_News"]) == 2
+    assert len(content["Top Research Paper"]) == 1
+    assert content["AI_Job_Spotlight"][0].company == "Acme"
+    assert content["AI_Job_Spotlight"][0].title == "ML Engineer"
+    assert len(content["Quote_of_the_Week"]) == 1
+
+def test_keywords_match_the_whole_url(items):
+    items[0] = ContentItem(source="rss", feed="blogs", title="Funding round",
+                           url="https://techcrunch.com/2026/10/19/openai-raises-more/", summary="a")
+    content = select_and_categorize(items)
+    assert [i.title for i in content["Big Story of the Week"]] == ["Funding round"]
+
+def test_sites_match_the_host_only(items):
+    items.append(ContentItem(source="rss", feed="blogs", title="Preprint culture",
+                             url="https://example.com/why-arxiv.org-matters", summary="i"))
+    content = select_and_categorize(items, {"Top Research Paper": 5})
+    assert [i.title for i in content["Top Research Paper"]] == ["Paper 1", "Paper 2"]
+
+def test_section_limits_reshape_the_newsletter(items):
+    content = select_and_categorize(items, {"Top Research Paper": 2, "Big Story of the Week": 1})
+    assert len(content["Top Research Paper"]) == 2
+    assert content["Indian_AI_News"] == []
+    assert content["AI_Job_Spotlight"] == []
+    assert content["Quote_of_the_Week"] == []
+
+def test_edition_only_accepts_its_sources(items):
+    jobs = EDITIONS["jobs"]
+    assert {item.feed for item in items if jobs.accepts(item)} == {"blogs", "jobs"}
+
+def test_get_editions_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        get_editions(["weekly", "nope"])
+    assert [edition.name for edition in get_editions()] == ["weekly"]
+
+def test_click_scores_rank_well_clicked_hosts_first(items):
+    items.append(ContentItem(source="rss", feed="research", title="Paper 3", url="https://papers.example.org/3"))
+    items.append(ContentItem(source="rss", feed="research", title="Paper 4", url="https://export.arxiv.org/abs/4"))
+    content = select_and_categorize(items, {"Top Research Paper": 2}, click_scores={"export.arxiv.org": 5.0})
+    assert [i.title for i in content["Top Research Paper"]] == ["Paper 4", "Paper 1"]
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+import tasks.run_weekly as run_weekly
+from modules.checkpoints import Checkpointer
+from modules.content import ContentItem
+
+ITEMS = [ContentItem(**item) for item in [
+    {"source": "rss", "feed": "blogs", "title": "OpenAI news", "url": "https://openai.com/blog/a", "summary": "a"},
+    {"source": "rss", "feed": "research", "title": "Paper", "url": "https://arxiv.org/abs/1", "summary": "b"},
+    {"source": "github", "feed": "github", "title": "org/repo", "url": "https://github.com/org/repo", "summary": "c"},
+]]
+
+@pytest.fixture
+def checkpoint_store(monkeypatch):
+    """Keeps checkpoints in a dict instead of the database."""
+    store = {}
+    monkeypatch.setattr("modules.checkpoints.get_checkpoint", lambda run_id, stage: store.get((run_id, stage)))
+    monkeypatch.setattr("modules.checkpoints.save_checkpoint",
+                        lambda run_id, stage, payload: store.__setitem__((run_id, stage), payload))
+    return store
+
+class FlakyMailer:
+    """Fails the first send_campaign call, like a Mailchimp outage mid-run."""
+    def __init__(self):
+        self.calls = []
+
+    def create_campaign(self, subject, preview_text):
+        self.calls.append("create")
+        return "campaign-1"
+
+    def set_campaign_content(self, campaign_id, html, plain_text=None):
+        self.calls.append("content")
+        return True
+
+    def send_campaign(self, campaign_id):
+        self.calls.append("send")
+        return self.calls.count("send") > 1
+
+def test_run_reuses_stored_stage(checkpoint_store):
+    checkpoints = Checkpointer("run-1")
+    assert checkpoints.run("collect", lambda: [1, 2]) == [1, 2]
+    assert checkpoints.run("collect", lambda: pytest.fail("stage should not run twice")) == [1, 2]
+
+def test_no_editions_means_no_run(checkpoint_store, monkeypatch):
+    monkeypatch.setattr(run_weekly, "collect_weekly_content", lambda: pytest.fail("nothing to collect for"))
+    run_id = run_weekly.orchestrate_newsletter_creation(dry_run=True, edition_names=[])
+    assert not Checkpointer(run_id).done("editions")
+
+def test_resume_skips_completed_stages(checkpoint_store, monkeypatch):
+    collected, summarized = [], []
+    mailer = FlakyMailer()
+    monkeypatch.setattr(run_weekly, "collect_weekly_content", lambda: collected.append(1) or list(ITEMS))
+    monkeypatch.setattr(run_weekly, "get_summary", lambda item: summarized.append(item.url) or "summary")
+    monkeypatch.setattr(run_weekly, "get_mailer", lambda list_id=None: mailer)
+    monkeypatch.setattr(run_weekly, "save_issue", lambda *args, **kwargs: None)
+    monkeypatch.setattr(run_weekly.time, "sleep", lambda seconds: None)
+
+    run_id = run_weekly.orchestrate_newsletter_creation(dry_run=False, edition_names=["weekly"])
+    first_html = checkpoint_store[(run_id, "weekly:render")]
+    assert not Checkpointer(run_id).done("weekly:sent")
+
+    run_weekly.orchestrate_newsletter_creation(dry_run=False, run_id=run_id)
+    assert len(collected) == 1
+    assert len(summarized) == len(ITEMS)
+    assert mailer.calls == ["create", "content", "send", "send"]
+    assert checkpoint_store[(run_id, "weekly:render")] == first_html
+    assert Checkpointer(run_id).get("weekly:sent") == "campaign-1"
+
+def test_resume_saves_an_issue_whose_save_failed_after_sending(checkpoint_store, monkeypatch):
+    mailer = FlakyMailer()
+    mailer.calls.append("send")  # The first send succeeds
+    saved = []
+
+    def save_issue(*args, **kwargs):
+        saved.append(kwargs["mailchimp_id"])
+        if len(saved) == 1:
+            raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(run_weekly, "collect_weekly_content", lambda: list(ITEMS))
+    monkeypatch.setattr(run_weekly, "get_summary", lambda item: "summary")
+    monkeypatch.setattr(run_weekly, "get_mailer", lambda list_id=None: mailer)
+    monkeypatch.setattr(run_weekly, "save_issue", save_issue)
+    monkeypatch.setattr(run_weekly.time, "sleep", lambda seconds: None)
+
+    run_id = run_weekly.orchestrate_newsletter_creation(dry_run=False, edition_names=["weekly"])
+    assert Checkpointer(run_id).get("weekly:sent") == "campaign-1"
+    assert not Checkpointer(run_id).done("weekly:issue_saved")
+
+    run_weekly.orchestrate_newsletter_creation(dry_run=False, run_id=run_id)
+    run_weekly.orchestrate_newsletter_creation(dry_run=False, run_id=run_id)
+    assert saved == ["campaign-1", "campaign-1"]
+    assert mailer.calls.count("send") == 2  # Never sent again
+
+def test_dry_runs_render_without_tracking(checkpoint_store, monkeypatch, tmp_path):
+    saved = []
+    (tmp_path / "templates").symlink_to(os.path.abspath("templates"))
+    monkeypatch.chdir(tmp_path)  # Previews are written to ./out
+    monkeypatch.setattr(run_weekly.settings, "PUBLIC_BASE_URL", "https://news.example.com")
+    monkeypatch.setattr(run_weekly, "collect_weekly_content", lambda: list(ITEMS))
+    monkeypatch.setattr(run_weekly, "get_summary", lambda item: "summary")
+    monkeypatch.setattr(run_weekly, "thumbnail_urls", lambda items: {})
+    monkeypatch.setattr(run_weekly, "register_links", lambda items, key: pytest.fail("previews register no links"))
+    monkeypatch.setattr(run_weekly, "save_issue", lambda *args, **kwargs: saved.append(kwargs["tracking_key"]))
+    monkeypatch.setattr(run_weekly, "prune_dry_run_issues", lambda keep: 0)
+    monkeypatch.setattr(run_weekly.time, "sleep", lambda seconds: None)
+
+    run_id = run_weekly.orchestrate_newsletter_creation(dry_run=True, edition_names=["weekly"])
+    html = checkpoint_store[(run_id, "weekly:render")]
+    assert "https://news.example.com/" not in html  # Neither redirect links nor an open pixel
+    assert "https://openai.com/blog/a" in html
+    assert saved == [None]
@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from modules.clustering import HashingVectorizer, THEMES_SECTION, Theme, cluster_items, select_themes
+from modules.content import ContentItem
+from modules.templater import render_email
+
+@pytest.fixture
+def items():
+    rng = random.Random(0)
+    filler = "company announced researchers released update startup funding open source tool".split()
+    items = []
+    for i in range(300):
+        topic = i % 5
+        words = [f"t{topic}w{word}" for word in range(10)]
+        items.append(ContentItem(source="rss", title=" ".join(rng.sample(words, 3) + rng.sample(filler, 2)),
+                                 summary=" ".join(rng.choices(words, k=5) + rng.choices(filler, k=8)),
+                                 url=f"https://news.example/{i}", feed=f"topic-{topic}"))
+    return items
+
+def test_vectors_are_unit_length_and_share_terms():
+    matrix = HashingVectorizer().fit_transform([
+        ContentItem(source="rss", title="Humanoid robot learns to fold laundry", url="https://a.example/1"),
+        ContentItem(source="rss", title="Robot folds laundry with humanoid hands", url="https://a.example/2"),
+        ContentItem(source="rss", title="EU passes the AI Act", url="https://a.example/3", summary="<p>Law</p>"),
+    ])
+    assert np.allclose(np.sqrt(matrix.multiply(matrix).sum(axis=1)), 1.0)
+    similarity = (matrix @ matrix.T).toarray()
+    assert similarity[0, 1] > 0.2
+    assert similarity[0, 2] == pytest.approx(0.0)
+
+def test_themes_recover_planted_topics(items):
+    themes = cluster_items(items, k=5, seed=1)
+    assert sum(len(theme.items) for theme in themes) == len(items)
+    for theme in themes:
+        topic, count = Counter(item.feed for item in theme.items).most_common(1)[0]
+        assert count / len(theme.items) > 0.9
+        assert theme.label.startswith(topic.replace("topic-", "t"))
+
+def test_clustering_is_deterministic_per_seed(items):
+    first = cluster_items(items, seed=7)
+    second = cluster_items(items, seed=7)
+    assert [theme.representative.url for theme in first] == [theme.representative.url for theme in second]
+
+def test_too_few_items_give_no_themes():
+    assert cluster_items([ContentItem(source="rss", title="Only one", url="https://a.example/1")]) == []
+
+def test_theme_round_trips_through_dict(items):
+    theme = cluster_items(items, k=5, seed=1)[0]
+    assert Theme.from_dict(theme.to_dict()) == theme
+
+def test_select_themes_skips_used_items_and_caps_related(items):
+    themes = cluster_items(items, k=5, seed=1)
+    used = {themes[0].representative.canonical_url}
+    selected = select_themes(themes, limit=2, exclude_urls=used)
+    assert len(selected) == 2
+    assert selected[0].representative.canonical_url not in used
+    assert all(len(theme.items) == 4 for theme in selected)
+    assert select_themes(themes, limit=3, accepts=lambda item: False) == []
+
+def test_themes_render_and_drop_first_with_the_quote(items):
+    themes = select_themes(cluster_items(items, k=5, seed=1), limit=2)
+    content = {"Big Story of the Week": [ContentItem(source="rss", title="Big", url="https://openai.com/a")]}
+    email = render_email(content, themes=themes, max_bytes=0)
+    assert "This Week's Themes" in email.html
+    assert themes[0].related[0].url in email.text
+
+    full_size = len(email.html.encode("utf-8"))
+    email = render_email(content, themes=themes, max_bytes=full_size - 1, over_budget="drop")
+    assert email.dropped_sections == [THEMES_SECTION]
+    assert "This Week's Themes" not in email.html
@@ -0,0 +1,31 @@
+import pytest
+from datetime import datetime
+from modules.collector import parse_feed_items
+from modules.content import canonicalize_url
+
+SAMPLE_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>New post</title><link>https://example.com/new</link><pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate></item>
+<item><title>Old post</title><link>https://example.com/old</link><pubDate>Mon, 30 Dec 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+@pytest.mark.parametrize("url,expected", [
+    ("HTTPS://Example.com/post/?utm_source=x&b=2&a=1#top", "https://example.com/post?a=1&b=2"),
+    ("http://example.com:80/", "http://example.com/"),
+    ("https://example.com/a?ref=feed", "https://example.com/a"),
+    ("https://example.com/a?ref_src=twsrc&fbclid=1&utm_medium=rss", "https://example.com/a"),
+    ("https://example.com/a?reference=2&refresh=1&refid=7&ref=x", "https://example.com/a?reference=2&refid=7&refresh=1"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+def test_parse_feed_items_skips_entries_before_high_water_mark():
+    """Only entries newer than the stored high-water mark should be returned."""
+    items = parse_feed_items(SAMPLE_FEED, feed="blogs", high_water_mark=datetime(2025, 1, 1))
+    assert [item.title for item in items] == ["New post"]
+    assert items[0].feed == "blogs"
+    assert items[0].published == datetime(2025, 1, 6, 10, 0)
+
+def test_parse_feed_items_without_high_water_mark_returns_all():
+    items = parse_feed_items(SAMPLE_FEED)
+    assert len(items) == 2
@@ -0,0 +1,41 @@
+import time
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+from modules.content import ContentBatch, ContentItem
+
+def test_item_precomputes_host_and_canonical_url():
+    item = ContentItem(source="rss", title="Post", url="https://Blog.Google/ai/post/?utm_source=rss",
+                       published=time.strptime("2025-01-06 10:00", "%Y-%m-%d %H:%M"))
+    assert item.host == "blog.google"
+    assert item.canonical_url == "https://blog.google/ai/post"
+    assert item.published == datetime(2025, 1, 6, 10, 0)
+
+def test_replace_keeps_derived_fields():
+    item = ContentItem(source="rss", title="Post", url="https://example.com/a")
+    summarized = replace(item, summary="short")
+    assert summarized.canonical_url == item.canonical_url
+    assert summarized.summary == "short"
+
+def test_dict_round_trip():
+    item = ContentItem(source="rss", feed="blogs", title="Post", url="https://example.com/a",
+                       published=datetime(2025, 1, 6, 10, 0), company="Acme")
+    assert ContentItem.from_dict(item.to_dict()) == item
+
+def test_quote_anchor_urls_are_left_alone():
+    assert ContentItem(source="quote", title="q", url="#/quote-1").canonical_url == "#/quote-1"
+
+def test_batch_masks_and_scores():
+    items = [
+        ContentItem(source="rss", title="a", url="https://arxiv.org/abs/1"),
+        ContentItem(source="github", title="b", url="https://github.com/org/repo"),
+        ContentItem(source="rss", title="c", url="https://arxiv.org/abs/2"),
+    ]
+    batch = ContentBatch(items)
+    assert batch.hosts == ["arxiv.org", "github.com"]
+    assert batch.host_mask(lambda host: host == "arxiv.org").tolist() == [True, False, True]
+    assert batch.url_mask(lambda url: url.endswith("/2")).tolist() == [False, False, True]
+    assert batch.source_mask("github").tolist() == [False, True, False]
+    scores = batch.host_values({"github.com": 2.0}, default=1.0)
+    assert [item.title for item in batch.select(np.ones(3, dtype=bool), order=scores)] == ["b", "a", "c"]
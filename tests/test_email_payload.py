@@ -0,0 +1,56 @@
+import pytest
+from modules.content import ContentItem
+from modules.email_payload import EmailTooLarge, html_to_text, minify_html, prune_css
+from modules.templater import render_email
+
+@pytest.fixture
+def content():
+    return {
+        "Big Story of the Week": [ContentItem(source="rss", title="Big", url="https://openai.com/a", summary="big " * 20)],
+        "Indian_AI_News": [ContentItem(source="rss", title=f"Mint {i}", url=f"https://www.livemint.com/{i}",
+                                       summary="news " * 20) for i in range(2)],
+        "Quote_of_the_Week": [ContentItem(source="quote", title="AI is the new electricity.", author="Andrew Ng",
+                                          url="#/quote-1")],
+    }
+
+def test_prune_css_drops_hover_transitions_and_unused_classes():
+    css = """
+        .card { padding: 24px; transition: transform 0.2s ease; }
+        .card:hover { transform: translateY(-4px); }
+        .unused { color: red; }
+        .list-item:last-child, .card a:focus { border-bottom: none; }
+        @media (max-width: 600px) { .card { padding: 12px; } }
+    """
+    assert prune_css(css, {"card", "list-item"}).splitlines() == [
+        ".card{padding: 24px}",
+        ".list-item:last-child{border-bottom: none}",
+        "@media (max-width: 600px) { .card { padding: 12px; } }",
+    ]
+
+def test_minify_keeps_inline_spacing():
+    html = "<div>\n  <!-- note -->\n  <p>Hello   <a href='#'>world</a> |\n <a href='#'>again</a></p>\n</div>"
+    assert minify_html(html) == "<div><p>Hello <a href='#'>world</a> | <a href='#'>again</a></p></div>"
+
+def test_plain_text_part_lists_links():
+    text = html_to_text('<h2>Top</h2><p><a href="https://a.example">Read</a></p><div style="display:none">hidden</div>')
+    assert "TOP\n---" in text
+    assert "Read (https://a.example)" in text
+    assert "hidden" not in text
+
+def test_render_email_has_no_hover_rules_and_a_text_part(content):
+    email = render_email(content, max_bytes=0)
+    assert ":hover" not in email.html
+    assert "transition" not in email.html
+    assert "AI is the new electricity." in email.text
+    assert email.dropped_sections == []
+
+def test_over_budget_drops_low_priority_sections_first(content):
+    full = render_email(content, max_bytes=0)
+    email = render_email(content, max_bytes=full.html_bytes - 1, over_budget="drop")
+    assert email.dropped_sections == ["Quote_of_the_Week"]
+    assert "Big" in email.text
+
+def test_over_budget_fails_with_fail_policy(content):
+    full = render_email(content, max_bytes=0)
+    with pytest.raises(EmailTooLarge):
+        render_email(content, max_bytes=full.html_bytes - 1, over_budget="fail")
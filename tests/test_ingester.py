@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import modules.ingester as ingester
+import modules.storage as storage
+import modules.x_source as x_source
+from modules.content import ContentItem
+from modules.ingester import FeedSpec, PollResult, poll_feed
+from modules.storage import FeedState, create_db_engine, get_feed_states, init_db, upsert_collected_items
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Points the storage module at a fresh, migrated SQLite database."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'collected.db'}")
+    init_db(bind=engine)
+    monkeypatch.setattr(storage, "engine", engine)
+    monkeypatch.setattr(storage, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return engine
+
+def items(*paths: str):
+    return [ContentItem(source="rss", feed="blogs", title=path, url=f"https://example.com{path}") for path in paths]
+
+def locked(rows):
+    raise RuntimeError("database is locked")
+
+def test_upsert_counts_only_new_items(db, monkeypatch):
+    assert upsert_collected_items(items("/1", "/2", "/2?utm_source=rss")) == 2  # Same canonical URL twice
+    assert upsert_collected_items(items("/1", "/2")) == 0
+    monkeypatch.setattr(storage, "UPSERT_BATCH_SIZE", 2)
+    assert upsert_collected_items(items("/1", "/3", "/2", "/4", "/5")) == 3
+
+def test_items_seen_grows_by_new_items_only(db, monkeypatch):
+    monkeypatch.setattr(ingester, "poll_rss", lambda spec, state: PollResult(items("/1", "/2")))
+    monkeypatch.setattr(ingester, "save_feed_state", lambda state: None)
+    spec = FeedSpec(key="https://example.com/feed", feed="blogs", interval=timedelta(minutes=30),
+                    url="https://example.com/feed")
+    state = FeedState(feed_key=spec.key, items_seen=0)
+
+    assert poll_feed(spec, state, datetime(2026, 10, 19)) == 2
+    assert poll_feed(spec, state, datetime(2026, 10, 19, 1)) == 0  # Refreshed, not seen again
+    assert state.items_seen == 2
+
+def test_x_cursors_are_saved_only_once_items_are_stored(db, monkeypatch):
+    def poll_accounts(client, usernames, list_ids, states, known_urls):
+        states["x:@openai"] = FeedState(feed_key="x:@openai", since_id="12", external_id="1")
+        return items("/x1")
+
+    monkeypatch.setattr(x_source, "poll_accounts", poll_accounts)
+    monkeypatch.setattr(ingester, "upsert_collected_items", locked)
+    spec = FeedSpec(key=x_source.X_SOURCE_KEY, feed="x", interval=timedelta(hours=1))
+    state = FeedState(feed_key=spec.key, items_seen=0)
+
+    assert poll_feed(spec, state, datetime(2026, 10, 19)) == 0
+    assert "x:@openai" not in get_feed_states()  # The posts are fetched again next time
+
+    monkeypatch.setattr(ingester, "upsert_collected_items", upsert_collected_items)
+    assert poll_feed(spec, state, datetime(2026, 10, 19, 1)) == 1
+    assert get_feed_states()["x:@openai"].since_id == "12"
+
+def test_feed_validators_are_kept_when_storing_fails(db, monkeypatch):
+    saved = []
+    monkeypatch.setattr(ingester, "poll_rss", lambda spec, state: PollResult(items("/1"), validators=('"v2"', None)))
+    monkeypatch.setattr(ingester, "upsert_collected_items", locked)
+    monkeypatch.setattr(ingester, "save_feed_state", lambda state: saved.append((state.etag, state.last_modified)))
+    spec = FeedSpec(key="https://example.com/feed", feed="blogs", interval=timedelta(minutes=30),
+                    url="https://example.com/feed")
+    state = FeedState(feed_key=spec.key, items_seen=0, etag='"v1"', last_modified="Mon, 19 Oct 2026 08:00:00 GMT")
+
+    poll_feed(spec, state, datetime(2026, 10, 19))
+    assert saved == [('"v1"', "Mon, 19 Oct 2026 08:00:00 GMT")]  # The next GET is not answered with a 304
+
+    monkeypatch.setattr(ingester, "upsert_collected_items", lambda rows: len(rows))
+    poll_feed(spec, state, datetime(2026, 10, 19, 1))
+    assert saved[-1] == ('"v2"', None)
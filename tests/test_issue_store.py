@@ -0,0 +1,107 @@
+import pytest
+import zstandard
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+import modules.storage as storage
+import web.app as web_app
+from modules.content import ContentItem
+from modules.storage import (
+    Issue, IssueBody, NewsletterItem, create_db_engine, get_issue_html_samples, get_last_issue_body, init_db,
+    decompress_issue_body, prune_dry_run_issues, save_compression_dictionary, save_issue,
+)
+
+def issue_html(n: int) -> str:
+    cards = "".join(f'<div class="card" style="padding:24px"><p><a href="https://example.com/{n}/{i}">Story {n}.{i}</a>'
+                    f"</p><p>Summary of story {i} in issue {n}.</p></div>" for i in range(8))
+    return f"<!DOCTYPE html><html><body><h1>AI Weekly #{n}</h1>{cards}</body></html>"
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Points the storage module at a fresh, migrated SQLite database."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'issues.db'}")
+    init_db(bind=engine)
+    monkeypatch.setattr(storage, "engine", engine)
+    monkeypatch.setattr(storage, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    storage._zstd_dictionary.cache_clear()
+    yield engine
+    storage._zstd_dictionary.cache_clear()
+
+def count(engine, model) -> int:
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(model)).scalar()
+
+def test_identical_renders_are_stored_once_and_read_back(db):
+    html = issue_html(1)
+    first = save_issue("Preview", html, [], is_dry_run=True)
+    second = save_issue("Sent", html, [], mailchimp_id="c1")
+    assert first.body_hash == second.body_hash
+    assert first.is_dry_run and not second.is_dry_run
+    assert count(db, IssueBody) == 1
+
+    save_issue("Later preview", issue_html(2), [], is_dry_run=True)
+    body = get_last_issue_body("weekly")  # Dry runs never replace the last sent issue
+    assert body.size == len(html.encode())
+    assert len(body.body) < body.size
+    assert decompress_issue_body(body) == html
+    assert zstandard.ZstdDecompressor().decompress(body.body).decode() == html  # A plain zstd frame
+
+def test_pruning_keeps_the_newest_dry_runs_per_edition(db):
+    for n in range(4):
+        save_issue(f"Dry {n}", issue_html(n), [ContentItem(source="rss", title="t", url=f"https://e.com/{n}")],
+                   is_dry_run=True)
+    save_issue("Research dry run", issue_html(10), [], edition="research", is_dry_run=True)
+    save_issue("Sent", issue_html(3), [], mailchimp_id="c1")  # Same body as the newest dry run
+
+    assert prune_dry_run_issues(keep=1) == 3
+    with db.connect() as connection:
+        subjects = set(connection.execute(select(Issue.subject)).scalars())
+        urls = set(connection.execute(select(NewsletterItem.url)).scalars())
+    assert subjects == {"Dry 3", "Research dry run", "Sent"}
+    assert urls == {"https://e.com/3"}
+    assert count(db, IssueBody) == 2  # Issues 3 (shared with the send) and 10
+    assert prune_dry_run_issues(keep=1) == 0
+    assert decompress_issue_body(get_last_issue_body("weekly")) == issue_html(3)
+
+def test_issues_sharing_items_each_keep_them(db):
+    shared = ContentItem(source="rss", title="Shared", url="https://e.com/shared")
+    weekly = save_issue("Weekly", issue_html(1), [shared, shared], mailchimp_id="c1",
+                        categories={shared.url: "Big Story"})
+    research = save_issue("Research", issue_html(2), [shared], mailchimp_id="c2", edition="research",
+                          categories={shared.url: "Research"})
+    with db.connect() as connection:
+        rows = connection.execute(select(NewsletterItem.issue_id, NewsletterItem.category)).all()
+    assert sorted(rows) == [(weekly.id, "Big Story"), (research.id, "Research")]
+
+def test_new_issues_use_the_trained_dictionary_when_enabled(db, monkeypatch):
+    for n in range(40):
+        save_issue(f"Sent {n}", issue_html(n), [], mailchimp_id=f"c{n}")
+    samples = get_issue_html_samples(100)
+    assert len(samples) == 40
+    dictionary_id = save_compression_dictionary(zstandard.train_dictionary(4096, samples))
+
+    monkeypatch.setattr(storage.settings, "ISSUE_ZSTD_DICTIONARY", True)
+    save_issue("With dictionary", issue_html(99), [], mailchimp_id="c99")
+    body = get_last_issue_body("weekly")
+    assert body.dictionary_id == dictionary_id
+    assert decompress_issue_body(body) == issue_html(99)
+
+def test_last_streams_stored_zstd_frames(db, monkeypatch):
+    html = issue_html(7)
+    save_issue("Sent", html, [], mailchimp_id="c1")
+    client = TestClient(web_app.app)
+
+    monkeypatch.setattr(web_app, "decompress_issue_body", lambda body: pytest.fail("zstd clients get the stored frame"))
+    response = client.get("/last", headers={"Accept-Encoding": "zstd, gzip"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.text == html  # Decoded by the test client
+    etag = response.headers["etag"]
+    assert client.get("/last", headers={"Accept-Encoding": "zstd", "If-None-Match": etag}).status_code == 304
+
+    monkeypatch.setattr(web_app, "decompress_issue_body", decompress_issue_body)
+    response = client.get("/last", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == html
+    assert response.headers["etag"] != etag
+    assert client.get("/last", params={"edition": "research"}).status_code == 404
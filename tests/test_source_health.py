@@ -0,0 +1,102 @@
+import pytest
+import requests
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import modules.collector as collector
+from modules.source_health import (
+    FAILURE_THRESHOLD, DEFAULT_TIMEOUT, MIN_TIMEOUT, allow_request, adaptive_timeout,
+    record_failure, record_success, success_rate,
+)
+from modules.storage import SourceHealth
+
+@pytest.fixture
+def health():
+    return SourceHealth(source_key="https://example.com/rss", state="closed", consecutive_failures=0,
+                        recent_outcomes="", recent_latencies="[]")
+
+def test_circuit_opens_after_consecutive_failures(health):
+    now = datetime(2025, 1, 1)
+    for _ in range(FAILURE_THRESHOLD):
+        assert allow_request(health, now)
+        record_failure(health, "timeout", now)
+    assert health.state == "open"
+    assert not allow_request(health, now + timedelta(minutes=1))
+    assert success_rate(health) == 0
+
+def test_open_circuit_probes_after_cooldown_and_closes_on_success(health):
+    now = datetime(2025, 1, 1)
+    for _ in range(FAILURE_THRESHOLD):
+        record_failure(health, "timeout", now)
+    later = now + timedelta(days=2)
+    assert allow_request(health, later)
+    assert health.state == "half_open"
+    record_success(health, 0.4, later)
+    assert health.state == "closed"
+    assert health.consecutive_failures == 0
+
+def test_failed_probe_reopens_circuit(health):
+    now = datetime(2025, 1, 1)
+    for _ in range(FAILURE_THRESHOLD):
+        record_failure(health, "timeout", now)
+    later = now + timedelta(days=2)
+    allow_request(health, later)
+    record_failure(health, "still down", later)
+    assert health.state == "open"
+    assert health.opened_at == later
+
+def test_timeout_adapts_to_observed_latency(health):
+    assert adaptive_timeout(health) == DEFAULT_TIMEOUT
+    for _ in range(10):
+        record_success(health, 0.2)
+    assert adaptive_timeout(health) == MIN_TIMEOUT
+    for _ in range(10):
+        record_success(health, 3.0)
+    assert adaptive_timeout(health) == 6.0
+
+class SlowSource:
+    """Answers with the given statuses, each after `seconds` on a fake clock; gives up at the request timeout."""
+
+    def __init__(self, statuses, seconds):
+        self.statuses = list(statuses)
+        self.seconds = seconds
+        self.clock = 0.0
+        self.timeouts = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.timeouts.append(timeout)
+        if self.seconds > timeout:
+            self.clock += timeout
+            raise requests.ReadTimeout(f"read timed out after {timeout}s")
+        self.clock += self.seconds
+        response = requests.Response()
+        response.status_code, response.url = self.statuses.pop(0), url
+        return response
+
+    def sleep(self, seconds):
+        self.clock += seconds
+
+@pytest.fixture
+def guarded(health, monkeypatch):
+    def install(source):
+        monkeypatch.setattr(collector, "guarded_session", source)
+        monkeypatch.setattr(collector, "time", SimpleNamespace(monotonic=lambda: source.clock, sleep=source.sleep))
+        monkeypatch.setattr(collector, "load_health", lambda key: health)
+        monkeypatch.setattr(collector, "save_health", lambda health: None)
+        return source
+    return install
+
+def test_retries_are_recorded_as_latency_samples(health, guarded):
+    source = guarded(SlowSource([503, 502, 200], seconds=1.0))
+    assert collector.guarded_get("feed", "https://example.com/rss").status_code == 200
+    assert health.recent_latencies == "[1.0, 1.0, 1.0]"
+    assert health.recent_outcomes == "1"
+    assert source.clock == 3.0 + 0.5 + 1.0  # Three answers and two backoffs
+
+def test_retries_share_one_timeout_budget(health, guarded):
+    source = guarded(SlowSource([503, 503, 503], seconds=6.0))
+    with pytest.raises(requests.RequestException):
+        collector.guarded_get("feed", "https://example.com/rss")
+    assert source.clock <= DEFAULT_TIMEOUT  # Not one full timeout per attempt
+    assert len(source.timeouts) == 3 and source.timeouts[-1] < DEFAULT_TIMEOUT
+    assert health.recent_outcomes == "0"
@@ -0,0 +1,68 @@
+import csv
+import io
+from types import SimpleNamespace
+
+import pytest
+from modules.storage import bulk_insert_subscribers, create_db_engine, init_db, iter_subscribers
+from modules.subscriber_import import import_subscribers, iter_csv_emails
+
+@pytest.fixture
+def bench_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    init_db(bind=engine)
+    return engine
+
+def test_iter_csv_emails_uses_email_column():
+    stream = io.StringIO("name,Email\nAda,ada@example.com\nAlan,\nGrace,grace@example.com\n")
+    assert list(iter_csv_emails(stream)) == ["ada@example.com", "grace@example.com"]
+
+def test_iter_csv_emails_without_header_uses_first_column():
+    stream = io.StringIO("ada@example.com\ngrace@example.com\n")
+    assert list(iter_csv_emails(stream)) == ["ada@example.com", "grace@example.com"]
+
+def test_import_reports_inserted_duplicate_and_invalid(bench_engine):
+    csv_text = "email\na@example.com\nb@example.com\na@example.com\nnot-an-email\nc@example.com\n"
+    report = import_subscribers(io.StringIO(csv_text), chunk_size=2, bind=bench_engine)
+    assert (report.total, report.inserted, report.duplicates, report.invalid) == (5, 3, 1, 1)
+
+    # Importing the same file again only finds duplicates
+    again = import_subscribers(io.StringIO(csv_text), bind=bench_engine)
+    assert again.inserted == 0
+    assert again.duplicates == 4
+    assert [row.email for row in iter_subscribers(bind=bench_engine)] == ["a@example.com", "b@example.com", "c@example.com"]
+
+class CopyRecorder:
+    """Stands in for a psycopg2 connection and cursor, parsing COPY data the way Postgres would in CSV mode."""
+
+    def __init__(self):
+        self.copied = []
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.rowcount = len(self.copied)
+
+    def copy_expert(self, sql, data):
+        assert "FORMAT csv" in sql
+        self.copied = [row[0] for row in csv.reader(data)]
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_postgres_copy_keeps_backslashes_and_quotes_intact():
+    emails = ['"a\\b"@example.com', '"tab\there"@example.com', '"say \\"hi\\""@example.com', "plain@example.com"]
+    connection = CopyRecorder()
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), raw_connection=lambda: connection)
+    assert bulk_insert_subscribers(emails, bind=bind) == 4
+    assert connection.copied == emails
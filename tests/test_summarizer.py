@@ -1,20 +1,23 @@
 # tests/test_summarizer.py
 import pytest
 from unittest.mock import patch
+from modules.content import ContentItem
 from modules.summarizer import get_summary, summarize_with_fallback
 
 @pytest.fixture
 def sample_item():
-    return {
-        'title': 'Test Article',
-        'summary': 'This is a long test article text. It contains several sentences. The purpose is to test the summarization logic. We hope it works well.'
-    }
+    return ContentItem(
+        source='rss',
+        url='https://example.com/test-article',
+        title='Test Article',
+        summary='This is a long test article text. It contains several sentences. The purpose is to test the summarization logic. We hope it works well.'
+    )
 
 def test_fallback_summarizer(sample_item):
     """Tests the TextRank fallback summarizer directly."""
-    summary = summarize_with_fallback(sample_item['summary'])
+    summary = summarize_with_fallback(sample_item.summary)
     assert isinstance(summary, str)
-    assert len(summary) < len(sample_item['summary'])
+    assert len(summary) < len(sample_item.summary)
     assert len(summary) > 0
 
 @patch('modules.summarizer.GEMINI_AVAILABLE', False)
@@ -0,0 +1,136 @@
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+
+import modules.thumbnails as thumbnails
+from modules.content import ContentItem
+from modules.thumbnails import (
+    HEIGHT, MAX_BYTES, WIDTH, ThumbnailCache, encode_thumbnail, ensure_thumbnails, find_og_image, github_preview_url,
+)
+from web.assets import ThumbnailFiles
+
+def photo_bytes(width=1200, height=800) -> bytes:
+    """A gradient with a few shapes on it, about as hard to compress as a typical hero image."""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for n in range(12):
+        box = (n * 90, (n * 53) % height, n * 90 + 200, (n * 53) % height + 150)
+        draw.ellipse(box, fill=((n * 40) % 256, (n * 90) % 256, (n * 20) % 256), outline="white", width=4)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@pytest.fixture(scope="module")
+def photo():
+    return photo_bytes()
+
+@pytest.fixture
+def site(photo):
+    """Articles with and without og:image, and the image they point to. Records every path requested."""
+    requests_seen = []
+    pages = {
+        "/a": '<html><head><meta property="og:image" content="/img/hero.png"></head><body>A</body></html>',
+        "/b": "<html><head><title>No image</title></head><body>B</body></html>",
+        "/c": '<html><head><meta name="twitter:image" content="/img/hero.png"></head><body>C</body></html>',
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            if self.path in pages:
+                body, content_type = pages[self.path].encode(), "text/html; charset=utf-8"
+            elif self.path == "/img/hero.png":
+                body, content_type = photo, "image/png"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests_seen
+    server.shutdown()
+
+@pytest.fixture
+def table(monkeypatch):
+    """The thumbnails table, in memory."""
+    rows = {}
+    monkeypatch.setattr(thumbnails, "get_thumbnails",
+                        lambda urls: {url: rows[url]["filename"] for url in urls if url in rows})
+    monkeypatch.setattr(thumbnails, "save_thumbnails", lambda new: rows.update({row["canonical_url"]: row for row in new}))
+    monkeypatch.setattr(thumbnails, "delete_thumbnails", lambda names: [
+        rows.pop(url) for url in [url for url, row in rows.items() if row["filename"] in names]
+    ])
+    return rows
+
+def test_source_image_is_found_in_page_or_github():
+    html = '<head><meta property="og:image" content="/cover.png"><meta name="twitter:image" content="/x.png"></head>'
+    assert find_og_image(html, "https://example.com/post/1") == "https://example.com/cover.png"
+    assert find_og_image("<head></head>", "https://example.com/") is None
+    repo = ContentItem(source="github", title="repo", url="https://github.com/huggingface/transformers/tree/main")
+    assert github_preview_url(repo) == "https://opengraph.githubassets.com/1/huggingface/transformers"
+    assert github_preview_url(ContentItem(source="github", title="org", url="https://github.com/openai")) is None
+
+def test_encoding_fits_the_budget_and_falls_back_to_a_generated_image(photo):
+    encoded = encode_thumbnail(photo, "example.com")
+    assert len(encoded) <= MAX_BYTES
+    assert Image.open(io.BytesIO(encoded)).size == (WIDTH, HEIGHT)
+
+    fallback = encode_thumbnail(b"not an image", "example.com")
+    assert Image.open(io.BytesIO(fallback)).size == (WIDTH, HEIGHT)
+    assert encode_thumbnail(None, "example.com") == fallback
+    assert encode_thumbnail(None, "other.org") != fallback
+
+def test_thumbnails_are_created_once_and_reused(site, table, tmp_path):
+    base_url, requests_seen = site
+    items = [ContentItem(source="rss", title=path, url=f"{base_url}{path}") for path in ("/a", "/b", "/c")]
+    cache = ThumbnailCache(str(tmp_path))
+
+    first = ensure_thumbnails(items, cache)
+    assert set(first) == {item.canonical_url for item in items}
+    assert first[items[0].canonical_url] == first[items[2].canonical_url]  # Same og:image, one file
+    assert first[items[1].canonical_url] != first[items[0].canonical_url]  # Generated fallback
+    assert table[items[1].canonical_url]["source_url"] == thumbnails.GENERATED
+    assert requests_seen.count("/img/hero.png") == 2  # Fetched per item, encoded and stored once
+    assert sorted(os.listdir(tmp_path)) == sorted(set(first.values()))
+
+    requests_seen.clear()
+    assert ensure_thumbnails(items, cache) == first
+    assert requests_seen == []
+
+    # A file that is gone from the cache is made again
+    os.remove(cache.path(first[items[1].canonical_url]))
+    assert ensure_thumbnails(items, cache) == first
+    assert requests_seen == ["/b"]
+
+def test_eviction_drops_least_recently_used_files_past_the_budget(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    names = [cache.store(bytes([n]) * 1000) for n in range(3)]
+    for age, name in zip((300, 200, 100), names):
+        os.utime(cache.path(name), (time.time() - age, time.time() - age))
+    cache.touch([names[0]])
+
+    assert cache.evict(max_bytes=1000, keep_since=time.time() - 150) == [names[1]]  # names[2] is too recent
+    assert sorted(os.listdir(tmp_path)) == sorted([names[0], names[2]])
+
+def test_thumbnails_are_served_as_immutable(tmp_path):
+    name = ThumbnailCache(str(tmp_path)).store(b"\xff\xd8jpeg")
+    app = FastAPI()
+    app.mount("/static/thumbs", ThumbnailFiles(directory=str(tmp_path)))
+    response = TestClient(app).get(f"/static/thumbs/{name}")
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "immutable" in response.headers["cache-control"]
@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import modules.tracking as tracking
+from modules.content import ContentItem
+from modules.templater import render_newsletter
+from modules.tracking import EventBuffer, LinkCache, TrackingKeys, issue_tracking_key, item_id
+
+ITEM = ContentItem(source="rss", title="Post", url="https://example.com/post?utm_source=rss", summary="s")
+KEY = issue_tracking_key("run1", "weekly")
+
+@pytest.fixture
+def base_url(monkeypatch):
+    monkeypatch.setattr(tracking.settings, "PUBLIC_BASE_URL", "https://news.example.com/")
+
+def test_item_id_is_stable_across_tracking_params():
+    assert item_id(ITEM) == item_id(ContentItem(source="rss", title="Post", url="https://example.com/post"))
+    assert len(item_id(ITEM)) == 16
+
+def test_links_are_left_alone_without_base_url(monkeypatch):
+    monkeypatch.setattr(tracking.settings, "PUBLIC_BASE_URL", None)
+    assert tracking.tracked_url(ITEM) == ITEM.url
+
+def test_render_rewrites_links_and_adds_pixel(base_url):
+    html = render_newsletter({"Big Story of the Week": [ITEM]}, tracking_key="issue1")
+    assert f"https://news.example.com/r/{item_id(ITEM)}/*|UNIQID|*" in html
+    assert "https://news.example.com/o/issue1/*|UNIQID|*.gif" in html
+    assert ITEM.url not in html
+
+def test_link_cache_evicts_least_recently_used():
+    cache = LinkCache(maxsize=2)
+    cache.update({"a": "https://a", "b": "https://b"})
+    cache.get("a")
+    cache.update({"c": "https://c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == "https://a"
+
+def test_flush_batches_counts_and_retries_after_failure(monkeypatch):
+    written = []
+    buffer = EventBuffer()
+    for _ in range(3):
+        buffer.record_click("a")
+    buffer.record_open("issue1")
+
+    def failing(counts, at):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(tracking, "increment_link_clicks", failing)
+    assert buffer.flush() == 0
+    assert buffer.pending() == 4
+
+    monkeypatch.setattr(tracking, "increment_link_clicks", lambda counts, at: written.append(counts))
+    monkeypatch.setattr(tracking, "increment_issue_opens", lambda counts, at: written.append(counts))
+    assert buffer.flush() == 4
+    assert written == [{"a": 3}, {"issue1": 1}]
+    assert buffer.pending() == 0
+
+def test_click_and_open_endpoints_answer_from_memory(monkeypatch):
+    from web.app import app
+    monkeypatch.setattr(tracking.link_cache, "load", lambda link_id: pytest.fail("cache hit expected"))
+    buffer = EventBuffer()
+    monkeypatch.setattr("web.app.events", buffer)
+    keys = TrackingKeys()
+    keys.add(KEY)
+    monkeypatch.setattr("web.app.tracking_keys", keys)
+    monkeypatch.setattr(tracking, "is_tracking_key_known", lambda key: pytest.fail("known key expected"))
+    tracking.link_cache.update({"abc": "https://example.com/post"})
+
+    client = TestClient(app)
+    response = client.get("/r/abc/subscriber1", follow_redirects=False)
+    assert response.status_code == 302
+    assert response.headers["location"] == "https://example.com/post"
+
+    response = client.get(f"/o/{KEY}/subscriber1.gif")
+    assert response.headers["content-type"] == "image/gif"
+    assert "no-store" in response.headers["cache-control"]
+    assert buffer.pending() == 2
+
+def test_opens_are_only_counted_for_known_issues(monkeypatch):
+    from web.app import app
+    lookups = []
+    buffer = EventBuffer()
+    monkeypatch.setattr("web.app.events", buffer)
+    monkeypatch.setattr("web.app.tracking_keys", TrackingKeys())
+    monkeypatch.setattr(tracking, "is_tracking_key_known", lambda key: lookups.append(key) or key == KEY)
+    client = TestClient(app)
+
+    for path in ("not-a-key", "0123456789abcdef", "A" * 16, "a" * 500):
+        response = client.get(f"/o/{path}/subscriber1.gif")
+        assert response.content == tracking.PIXEL_GIF
+    assert buffer.pending() == 0
+    assert lookups == ["0123456789abcdef"]  # Malformed keys are rejected without a lookup
+
+    # A key sent by another process is looked up once, then answered from memory
+    client.get(f"/o/{KEY}/subscriber1.gif")
+    client.get(f"/o/{KEY}/subscriber2.gif")
+    assert lookups == ["0123456789abcdef", KEY]
+    assert buffer.pending() == 2
@@ -0,0 +1,184 @@
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+import modules.x_source as x_source
+from modules.storage import FeedState
+from modules.x_source import RateLimiter, XClient, account_key, poll_accounts
+
+NOW = datetime(2025, 1, 6, 12, 0)
+
+class StubX:
+    """A tiny in-memory X API v2: users, their posts (newest first) and rate-limit headers."""
+
+    def __init__(self):
+        self.users = {"openai": "1", "karpathy": "2"}
+        self.tweets = {"1": [], "2": []}
+        self.requests = []
+        self.rate_limited = set()  # Paths that answer 429 once
+        self.remaining = None
+
+    def post(self, user_id, tweet_id, url, text="New post"):
+        self.tweets[user_id].insert(0, {
+            "id": tweet_id, "text": f"{text} https://t.co/{tweet_id}", "created_at": "2025-01-06T10:00:00.000Z",
+            "entities": {"urls": [{"url": f"https://t.co/{tweet_id}", "expanded_url": url}]},
+        })
+
+    def handle(self, path, query):
+        self.requests.append((path, query))
+        if path in self.rate_limited:
+            self.rate_limited.discard(path)
+            return 429, {}, {"x-rate-limit-remaining": "0", "x-rate-limit-reset": "1000"}
+        headers = {}
+        if self.remaining is not None:
+            headers = {"x-rate-limit-remaining": str(self.remaining), "x-rate-limit-reset": "2000"}
+        if path == "/2/users/by":
+            names = query["usernames"][0].split(",")
+            return 200, {"data": [{"id": self.users[n.lower()], "username": n} for n in names if n.lower() in self.users]}, headers
+        user_id = path.split("/")[3]
+        since_id = int(query.get("since_id", ["0"])[0])
+        newer = [t for t in self.tweets[user_id] if int(t["id"]) > since_id]
+        start = int(query.get("pagination_token", ["0"])[0])
+        page = newer[start:start + 2]
+        meta = {"result_count": len(page)}
+        if newer:
+            meta["newest_id"] = newer[0]["id"]
+        if start + 2 < len(newer):
+            meta["next_token"] = str(start + 2)
+        return 200, {"data": page, "meta": meta}, headers
+
+@pytest.fixture
+def stub():
+    api = StubX()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            status, payload, headers = api.handle(parsed.path, parse_qs(parsed.query))
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_HEAD(self):
+            # Acts as a link shortener: /s/<slug> redirects to the article
+            self.send_response(301)
+            self.send_header("Location", f"https://example.com/articles/{self.path.rsplit('/', 1)[-1]}")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield api
+    server.shutdown()
+
+@pytest.fixture
+def sleeps():
+    return []
+
+@pytest.fixture
+def client(stub, sleeps):
+    return XClient("token", base_url=f"{stub.base_url}/2", limiter=RateLimiter(sleep=sleeps.append, clock=lambda: 900.0))
+
+def poll(client, states, known=()):
+    return poll_accounts(client, ["OpenAI", "karpathy"], [], states, lambda urls: set(known) & set(urls), now=NOW)
+
+def test_user_ids_are_looked_up_in_batches_and_cached(stub, client, monkeypatch):
+    monkeypatch.setattr(x_source, "USERS_PER_LOOKUP", 1)
+    states = {}
+    poll(client, states)
+    lookups = [query for path, query in stub.requests if path == "/2/users/by"]
+    assert [query["usernames"] for query in lookups] == [["OpenAI"], ["karpathy"]]
+    assert states[account_key("OpenAI")].external_id == "1"
+
+    stub.requests.clear()
+    poll(client, states)
+    assert not any(path == "/2/users/by" for path, _ in stub.requests)
+
+def test_only_posts_newer_than_since_id_are_fetched(stub, client):
+    for tweet_id in (10, 11, 12):
+        stub.post("1", str(tweet_id), f"https://example.com/{tweet_id}")
+    states = {}
+    first = poll(client, states)
+    assert sorted(item.url for item in first) == [f"https://example.com/{i}" for i in (10, 11, 12)]
+    assert states[account_key("openai")].since_id == "12"
+    first_timeline = [query for path, query in stub.requests if path == "/2/users/1/tweets"]
+    assert "start_time" in first_timeline[0] and len(first_timeline) == 2  # Two pages of two
+
+    stub.requests.clear()
+    stub.post("1", "13", "https://example.com/13")
+    second = poll(client, states)
+    assert [item.url for item in second] == ["https://example.com/13"]
+    timeline = [query for path, query in stub.requests if path == "/2/users/1/tweets"]
+    assert timeline[0]["since_id"] == ["12"] and len(timeline) == 1
+
+def test_sleeps_only_until_the_rate_limit_resets(stub, client, sleeps):
+    stub.rate_limited.add("/2/users/1/tweets")
+    poll(client, {})
+    assert sleeps == [100.0 + x_source.RATE_LIMIT_MARGIN]  # Reset at 1000, clock at 900
+
+    sleeps.clear()
+    stub.remaining = 5
+    poll(client, {})
+    assert sleeps == []
+
+def test_links_are_expanded_and_deduplicated(stub, client, monkeypatch):
+    monkeypatch.setattr(x_source, "SHORTENER_HOSTS", frozenset({"127.0.0.1"}))
+    stub.post("1", "20", f"{stub.base_url}/s/gpt", text="Launching today")
+    stub.post("2", "21", "https://example.com/articles/gpt?utm_source=twitter", text="Worth reading")
+    stub.post("2", "22", "https://x.com/karpathy/status/1")
+    stub.post("2", "23", "https://example.com/already-collected")
+
+    items = poll(client, {}, known={"https://example.com/already-collected"})
+    assert [item.url for item in items] == ["https://example.com/articles/gpt"]
+    assert items[0].author == "@OpenAI"
+    assert items[0].title == "Launching today"
+    assert items[0].feed == "x"
+
+def test_state_rows_round_trip_as_feed_state(stub, client):
+    states = {account_key("openai"): FeedState(feed_key=account_key("openai"), since_id="5", external_id="1")}
+    poll(client, states)
+    timeline = [query for path, query in stub.requests if path == "/2/users/1/tweets"]
+    assert timeline[0]["since_id"] == ["5"]
+    assert not any(query.get("usernames") == ["OpenAI"] for path, query in stub.requests if path == "/2/users/by")
+
+def failing_for(client, monkeypatch, user_id, error):
+    fetch = client.user_tweets
+
+    def user_tweets(account_id, since_id, now):
+        if account_id == user_id:
+            raise error
+        return fetch(account_id, since_id, now)
+
+    monkeypatch.setattr(client, "user_tweets", user_tweets)
+
+def test_a_failing_account_is_skipped(stub, client, monkeypatch):
+    stub.post("1", "10", "https://example.com/10")
+    stub.post("2", "20", "https://example.com/20")
+    failing_for(client, monkeypatch, "1", requests.ConnectionError("connection reset"))
+    states = {}
+    assert [item.url for item in poll(client, states)] == ["https://example.com/20"]
+    assert states[account_key("openai")].since_id is None
+    assert states[account_key("karpathy")].since_id == "20"
+
+def test_an_exhausted_rate_limit_ends_the_poll_with_what_was_fetched(stub, client, monkeypatch):
+    stub.post("1", "10", "https://example.com/10")
+    stub.post("2", "20", "https://example.com/20")
+    failing_for(client, monkeypatch, "2", x_source.RateLimitExhausted("X API rate limit for users/:id/tweets"))
+    states = {}
+    assert [item.url for item in poll(client, states)] == ["https://example.com/10"]
+    assert states[account_key("openai")].since_id == "10"
+    assert states[account_key("karpathy")].external_id == "2"  # Not looked up again next time
+    assert states[account_key("karpathy")].since_id is None
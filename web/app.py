@@ -1,12 +1,19 @@
 # web/app.py
-from fastapi import FastAPI, Request, Form, HTTPException, Depends, status
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, Form, HTTPException, Depends, status, UploadFile, File
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
+import io
+import os
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from modules.mailer import get_mailer
-from modules.storage import add_subscriber, get_all_active_subscribers, get_last_issue, Subscriber as DBSubscriber, get_db
+from modules.source_health import get_health_report
+from modules.tracking import PIXEL_GIF, link_cache, tracking_keys, events, flusher
+from web.assets import REVALIDATE_CACHE, AssetFiles, PrerenderedPage, ThumbnailFiles, accepted_encodings, asset_url_for, load_manifest
+from modules.editions import DEFAULT_EDITION
+from modules.storage import add_subscriber, get_all_active_subscribers, get_last_issue_body, decompress_issue_body, init_db, get_max_subscriber_id, Subscriber as DBSubscriber, get_db
+from modules.subscriber_import import import_subscribers, export_subscribers_csv, sync_new_subscribers_to_mailchimp
 from web.models import Subscriber, Issue
 from config import settings
 from tasks.run_weekly import orchestrate_newsletter_creation
@@ -15,9 +22,46 @@ from fastapi import BackgroundTasks
 
 app = FastAPI(title="AI Newsletter Service")
 
-# Mount static files (for CSS, JS, etc.) and templates
-app.mount("/static", StaticFiles(directory="web/static"), name="static")
+# Mount static files (for CSS, JS, etc.) and templates.
+# Fingerprinted assets from `python -m tasks.build_assets` are served pre-compressed and cached forever,
+# and so are card thumbnails, which are named by content hash too. The more specific mount goes first.
+os.makedirs(settings.THUMBNAIL_DIR, exist_ok=True)
+app.mount("/static/thumbs", ThumbnailFiles(directory=settings.THUMBNAIL_DIR), name="thumbs")
+app.mount("/static", AssetFiles(directory="web/static"), name="static")
 templates = Jinja2Templates(directory="web/static")
+asset_manifest = load_manifest()
+templates.env.globals["asset_url"] = lambda path: asset_url_for(asset_manifest, path)
+
+_landing_page: Optional[PrerenderedPage] = None
+
+def get_landing_page() -> PrerenderedPage:
+    """The landing page without a success/error message never changes, so it is rendered once."""
+    global _landing_page
+    if _landing_page is None:
+        html = templates.get_template("index.html").render(success=None, error=None)
+        _landing_page = PrerenderedPage(html)
+    return _landing_page
+
+@app.on_event("startup")
+def run_migrations():
+    """Applies pending database migrations before serving requests."""
+    init_db()
+
+@app.on_event("startup")
+def prerender_pages():
+    get_landing_page()
+
+@app.on_event("startup")
+def start_tracking():
+    """Warms the redirect cache with recent issues' links, loads known tracking keys and starts the event flusher."""
+    link_cache.preload()
+    tracking_keys.preload()
+    flusher.start()
+
+@app.on_event("shutdown")
+def stop_tracking():
+    """Writes any buffered clicks and opens before the process exits."""
+    flusher.stop()
 
 # --- Helper Functions ---
 def verify_admin_token(token: str):
@@ -29,8 +73,8 @@ def verify_admin_token(token: str):
 
 @app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
 async def read_root(request: Request):
-    # Always pass success and error so the template always renders correctly
-    return templates.TemplateResponse("index.html", {"request": request, "success": None, "error": None})
+    # Served from pre-rendered bytes; clients revalidate with the ETag and usually get a 304
+    return get_landing_page().response(request)
 
 # web/app.py
 
@@ -53,12 +97,50 @@ async def handle_subscribe(request: Request, email: str = Form(...)):
     return templates.TemplateResponse("index.html", {"request": request, "success": f"Thanks for subscribing, {email}!"})
     
 @app.get("/last", response_class=HTMLResponse)
-async def view_last_issue():
-    """Displays the HTML of the most recently sent newsletter."""
-    issue = get_last_issue()
-    if not issue:
+async def view_last_issue(request: Request, edition: str = DEFAULT_EDITION):
+    """
+    Displays the HTML of the most recently sent newsletter for an edition. Issues are stored as
+    zstd frames, which clients that accept zstd get as they are; everyone else gets them decompressed.
+    """
+    body = await run_in_threadpool(get_last_issue_body, edition)
+    if not body:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No issues found.")
-    return HTMLResponse(content=issue.content_html)
+    # Frames made with a trained dictionary can't be decoded by browsers
+    as_stored = body.dictionary_id is None and "zstd" in accepted_encodings(request.headers.get("accept-encoding"))
+    etag = f'"{body.content_hash[:16]}-zstd"' if as_stored else f'"{body.content_hash[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE, "Vary": "Accept-Encoding"}
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if as_stored:
+        headers["Content-Encoding"] = "zstd"
+        return Response(content=body.body, headers=headers, media_type="text/html; charset=utf-8")
+    return HTMLResponse(content=decompress_issue_body(body), headers=headers)
+
+# --- Tracking Routes ---
+# Both answer from memory: redirect targets come from the LRU link cache and events
+# go into in-process counters that the flusher writes to the database in batches.
+
+@app.get("/r/{item_id}/{subscriber_token}")
+async def track_click(item_id: str, subscriber_token: str):
+    """Counts a click on a newsletter link and redirects to the original URL."""
+    url = link_cache.get(item_id)
+    if url is None:
+        url = await run_in_threadpool(link_cache.load, item_id)
+        if url is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown link.")
+    events.record_click(item_id)
+    return RedirectResponse(url=url, status_code=status.HTTP_302_FOUND)
+
+@app.get("/o/{tracking_key}/{subscriber_token}.gif")
+async def track_open(tracking_key: str, subscriber_token: str):
+    """
+    Open pixel: counts an open for a known issue and returns a 1x1 GIF that clients must not cache.
+    Unknown keys get the same GIF, uncounted.
+    """
+    if tracking_key in tracking_keys or await run_in_threadpool(tracking_keys.load, tracking_key):
+        events.record_open(tracking_key)
+    return Response(content=PIXEL_GIF, media_type="image/gif",
+                    headers={"Cache-Control": "no-store, no-cache, must-revalidate, max-age=0"})
 
 # --- Admin Routes ---
 
@@ -77,6 +159,7 @@ async def admin_dashboard(request: Request, token: str):
         {
             "request": request, 
             "subscribers": subscribers,
+            "source_health": get_health_report(),
             "token": token
         }
     )
@@ -91,6 +174,31 @@ async def trigger_dry_run(token: str = Form(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.post("/admin/subscribers/import")
+def bulk_import_subscribers(background_tasks: BackgroundTasks, token: str = Form(...), file: UploadFile = File(...),
+                            sync_mailchimp: bool = Form(False)):
+    """
+    Imports subscribers from an uploaded CSV, streaming it in chunks so memory stays bounded.
+    Declared without async so the import runs in the threadpool instead of blocking the event loop.
+    """
+    verify_admin_token(token)
+    last_id = get_max_subscriber_id()
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    report = import_subscribers(stream)
+    if sync_mailchimp and report.inserted:
+        background_tasks.add_task(sync_new_subscribers_to_mailchimp, last_id)
+    return {**report.as_dict(), "mailchimp_sync_queued": bool(sync_mailchimp and report.inserted)}
+
+@app.get("/admin/subscribers/export")
+async def bulk_export_subscribers(token: str):
+    """Streams all active subscribers as a CSV download."""
+    verify_admin_token(token)
+    return StreamingResponse(
+        export_subscribers_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=subscribers.csv"},
+    )
+
 # # Add these imports at the top of web/app.py
 # from fastapi import BackgroundTasks
 
@@ -119,4 +227,15 @@ async def trigger_weekly_job(token: str, background_tasks: BackgroundTasks):
     background_tasks.add_task(run_newsletter_task)
     
     # Immediately return a response to the scheduler
-    return {"message": "Weekly newsletter job has been triggered successfully in the background."}
\ No newline at end of file
+    return {"message": "Weekly newsletter job has been triggered successfully in the background."}
+
+@app.post("/tasks/ingest")
+async def trigger_ingest(token: str, background_tasks: BackgroundTasks):
+    """
+    Polls every content source that is due, storing new items for the weekly run.
+    Called frequently by the scheduler; feeds that are not due yet are skipped.
+    """
+    verify_admin_token(token)
+    from modules.ingester import run_due_feeds
+    background_tasks.add_task(run_due_feeds)
+    return {"message": "Ingestion has been triggered in the background."}
\ No newline at end of file
@@ -0,0 +1,184 @@
+# web/assets.py
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = "web/static"
+DIST_DIR = "dist"  # Under STATIC_DIR, written by tasks/build_assets.py
+MANIFEST_NAME = "manifest.json"
+FINGERPRINTED_EXTENSIONS = (".css", ".js")
+
+# Fingerprinted files never change under the same name, so browsers may keep them for a year
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Everything else is revalidated with its ETag on every use
+REVALIDATE_CACHE = "no-cache"
+
+# Pre-compressed variants, in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime=0 keeps the output identical between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def compressed_variants(data: bytes) -> Dict[str, bytes]:
+    """Every pre-compressed form of `data` this build can produce, keyed by file suffix."""
+    variants = {".gz": gzip_bytes(data)}
+    if BROTLI_AVAILABLE:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return variants
+
+def build_assets(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """
+    Copies every CSS/JS file under `static_dir` to dist/ with a content hash in its name,
+    writes .gz (and .br when brotli is installed) next to it, and records the mapping
+    in dist/manifest.json. Returns the manifest.
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [name for name in dirs if os.path.join(root, name) != dist_dir]
+        for name in sorted(files):
+            if not name.endswith(FINGERPRINTED_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+            stem, extension = os.path.splitext(logical)
+            hashed = f"{stem}.{content_hash(data)}{extension}"
+            target = os.path.join(dist_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+            for suffix, compressed in compressed_variants(data).items():
+                if len(compressed) < len(data):
+                    with open(target + suffix, "wb") as f:
+                        f.write(compressed)
+            manifest[logical] = hashed
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    logger.info(f"Built {len(manifest)} fingerprinted assets into {dist_dir} (brotli: {BROTLI_AVAILABLE}).")
+    return manifest
+
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """The build manifest, or an empty one when the build step has not run (assets are then served unhashed)."""
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("No asset manifest found; run `python -m tasks.build_assets`. Serving unhashed assets.")
+        return {}
+
+def asset_url_for(manifest: Dict[str, str], path: str) -> str:
+    hashed = manifest.get(path)
+    return f"/static/{DIST_DIR}/{hashed}" if hashed else f"/static/{path}"
+
+def accepted_encodings(accept_encoding: Optional[str]) -> List[str]:
+    """Encodings the client accepts, ignoring ones explicitly refused with q=0."""
+    accepted = []
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if token and quality.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.append(token.strip().lower())
+    return accepted
+
+def negotiate(accept_encoding: Optional[str], available: List[str]) -> Optional[str]:
+    """Picks the preferred encoding that is both accepted and available."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, _ in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles that serves fingerprinted files from dist/ with immutable caching and picks a
+    pre-compressed .br/.gz variant from Accept-Encoding. Nothing is compressed per request.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not path.startswith(DIST_DIR + "/") or path.endswith(MANIFEST_NAME):
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("Cache-Control", REVALIDATE_CACHE)
+            return response
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        for encoding, suffix in ENCODINGS:
+            if negotiate(accept_encoding, [encoding]) != encoding:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None:
+                return FileResponse(
+                    full_path,
+                    stat_result=stat_result,
+                    media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                    headers={"Content-Encoding": encoding, "Cache-Control": IMMUTABLE_CACHE,
+                             "Vary": "Accept-Encoding"},
+                )
+
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+class ThumbnailFiles(StaticFiles):
+    """Card thumbnails (modules/thumbnails.py). Named by a hash of their bytes, so never revalidated."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        return response
+
+class PrerenderedPage:
+    """An HTML page rendered once and kept as bytes (plus gzip/brotli forms) with a strong ETag."""
+
+    def __init__(self, html: str):
+        self.body = html.encode("utf-8")
+        self.hash = content_hash(self.body)
+        compressed = compressed_variants(self.body)
+        self.variants: Dict[str, bytes] = {
+            encoding: compressed[suffix] for encoding, suffix in ENCODINGS if suffix in compressed
+        }
+
+    def response(self, request: Request) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding"), list(self.variants))
+        # Each encoding is its own representation, so each gets its own ETag
+        etag = f'"{self.hash}-{encoding}"' if encoding else f'"{self.hash}"'
+        headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE, "Vary": "Accept-Encoding"}
+        if etag in (request.headers.get("if-none-match") or ""):
+            return Response(status_code=304, headers=headers)
+        body = self.body
+        if encoding:
+            body = self.variants[encoding]
+            headers["Content-Encoding"] = encoding
+        # The server drops the body of HEAD responses and keeps Content-Length
+        return Response(content=body, headers=headers, media_type="text/html; charset=utf-8")